@@ -16,7 +16,10 @@ import pytest
 # ##-- end 3rd party imports
 
 import bibble._interface as API
+from bibtexparser import model
 from bibble.library import BibbleLib
+from bibble.model import MetaBlock
+from bibble.fields._interface import AccumulationBlock
 
 # ##-- types
 # isort: off
@@ -58,6 +61,49 @@ class TestBibbleLib:
     def test_sanity(self):
         assert(True is not False)
 
+    def test_ctor(self):
+        match BibbleLib():
+            case BibbleLib():
+                assert(True)
+            case x:
+                assert(False), x
+
+    def test_meta_index_on_add(self):
+        meta  = MetaBlock()
+        accum = AccumulationBlock(name="test", data=set(), fields=set())
+        lib   = BibbleLib([model.Entry("article", "first", []), accum, meta])
+        assert(lib.find_meta(MetaBlock) is accum)
+        assert(lib.find_meta(AccumulationBlock) is accum)
+        assert(MetaBlock.find_in(lib) is accum)
+        assert(AccumulationBlock.find_in(lib) is accum)
+
+    def test_meta_index_missing(self):
+        lib = BibbleLib([model.Entry("article", "first", [])])
+        assert(MetaBlock.find_in(lib) is None)
+
+    def test_meta_index_on_remove(self):
+        first  = MetaBlock(val=1)
+        second = MetaBlock(val=2)
+        lib    = BibbleLib([first, second])
+        lib.remove(first)
+        assert(MetaBlock.find_in(lib) is second)
+        lib.remove([second])
+        assert(MetaBlock.find_in(lib) is None)
+
+    def test_meta_index_on_replace(self):
+        first  = MetaBlock(val=1)
+        second = MetaBlock(val=2)
+        lib    = BibbleLib([first, second])
+        lib.replace(first, (replacement:=MetaBlock(val=3)))
+        assert(MetaBlock.find_in(lib) is replacement)
+
+    def test_meta_index_matches_scan(self):
+        blocks = [MetaBlock(val=1), AccumulationBlock(name="test", data=set(), fields=set()), MetaBlock(val=2)]
+        lib    = BibbleLib(blocks)
+        lib.remove(blocks[0])
+        scanned = [x for x in lib.blocks if isinstance(x, MetaBlock)]
+        assert(lib._meta_index[MetaBlock] == scanned)
+
     @pytest.mark.skip
     def test_todo(self):
         pass
@@ -95,3 +95,69 @@ class TestFailureBlock:
             case x:
                  assert(False), x
 
+
+class TestCowEntry:
+
+    def test_sanity(self):
+        assert(True is not False) # noqa: PLR0133
+
+    def test_ctor(self):
+        match bmodel.CowEntry.of(model.Entry("test", "blah", [])):
+            case bmodel.CowEntry():
+                assert(True)
+            case x:
+                assert(False), x
+
+    def test_shares_fields_until_modified(self):
+        entry = model.Entry("test", "blah", [model.Field("title", "a")])
+        view  = bmodel.CowEntry.of(entry)
+        assert(view.fields is entry.fields)
+        view.set_field(model.Field("title", "b"))
+        assert(view.fields is not entry.fields)
+        assert(entry['title'] == "a")
+        assert(view['title'] == "b")
+
+    def test_reads_dont_copy(self):
+        entry = model.Entry("test", "blah", [model.Field("title", "a")])
+        view  = bmodel.CowEntry.of(entry)
+        assert(view['title'] == "a")
+        assert(view.get("title") is entry.fields[0])
+        assert("title" in view)
+        assert(view.fields_dict['title'].value == "a")
+        assert(view.fields is entry.fields)
+
+    def test_setitem_and_delitem_copy(self):
+        entry = model.Entry("test", "blah", [model.Field("title", "a"), model.Field("year", "2000")])
+        view  = bmodel.CowEntry.of(entry)
+        view['title'] = "b"
+        del view['year']
+        assert(entry['title'] == "a")
+        assert("year" in entry)
+        assert("year" not in view)
+
+    def test_set_same_field_doesnt_copy(self):
+        field = model.Field("title", "a")
+        entry = model.Entry("test", "blah", [field])
+        view  = bmodel.CowEntry.of(entry)
+        view.set_field(field)
+        assert(view.fields is entry.fields)
+
+    def test_key_change_is_local(self):
+        entry    = model.Entry("test", "blah", [])
+        view     = bmodel.CowEntry.of(entry)
+        view.key = "other"
+        assert(entry.key == "blah")
+
+    def test_parser_metadata_is_local(self):
+        entry = model.Entry("test", "blah", [])
+        view  = bmodel.CowEntry.of(entry)
+        view.set_parser_metadata("test", True)
+        assert(entry.get_parser_metadata("test") is None)
+
+    def test_equality(self):
+        entry = model.Entry("test", "blah", [model.Field("title", "a")])
+        view  = bmodel.CowEntry.of(entry)
+        assert(view == entry)
+        assert(entry == view)
+        view['title'] = "b"
+        assert(view != entry)
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+bibble._bench : Benchmarks of bibble's readers, writers and middlewares,
+run on synthetic bibliographies.
+
+Run with 'python -m bibble._bench --help'.
+"""
+
+from .generator import GenConfig_d, generate_bib
+from .benchmarks import BenchContext, BenchResult_d, run_benchmarks, BENCHMARKS
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Run the benchmarks, appending the results as json lines:
+
+python -m bibble._bench --entries 5000 --out .temp/bench.jsonl 'mw\\.' 'io\\.'
+"""
+
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import argparse
+import json
+import logging as logmod
+import pathlib as pl
+import sys
+
+# ##-- end stdlib imports
+
+from .benchmarks import BENCHMARKS, run_benchmarks
+from .generator import GenConfig_d
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Body:
+
+def main(argv:list[str]|None=None) -> int:
+    defaults = GenConfig_d()
+    parser   = argparse.ArgumentParser(prog="python -m bibble._bench", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help="Regexes of the benchmarks to run, default all")
+    parser.add_argument("--out", type=pl.Path, default=None, help="The jsonlines file to append to, default stdout")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    for key in GenConfig_d.__slots__:
+        default = getattr(defaults, key)
+        parser.add_argument(f"--{key}", type=type(default), default=default)
+
+    args = parser.parse_args(argv)
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    logmod.basicConfig(level=logmod.WARNING, format="%(message)s")
+    logmod.getLogger("bibble._bench").setLevel(logmod.INFO)
+    config  = GenConfig_d(**{x:getattr(args, x) for x in GenConfig_d.__slots__})
+    names   = "|".join(f"(?:{x})" for x in args.names) or None
+    results = run_benchmarks(config, names=names, repeats=args.repeats)
+    lines   = "".join(json.dumps(x) + "\n" for x in results)
+    match args.out:
+        case None:
+            sys.stdout.write(lines)
+        case pl.Path() as target:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with target.open("a") as f:
+                f.write(lines)
+
+    return 0
+
+##-- ifmain
+if __name__ == "__main__":
+    sys.exit(main())
+##-- end ifmain
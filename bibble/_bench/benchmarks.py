@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of the readers, writers and middlewares, on synthetic bibliographies.
+
+Each benchmark is a setup function, registered in BENCHMARKS by name,
+which takes a BenchContext and returns the function to time.
+Setup (parsing, copying the library, preparing field values) is not timed.
+
+Middlewares are benchmarked in isolation, by calling their transform
+on an already parsed (and, if needed, prepared) library.
+PairStacks are benchmarked through a Reader or Writer, as they are used.
+"""
+
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import itertools as itz
+import logging as logmod
+import os
+import pathlib as pl
+import platform
+import re
+import tempfile
+import time
+import tracemalloc
+import types
+from copy import deepcopy
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+from bibtexparser import model
+from bibtexparser.library import Library
+from jgdv.files.tags import SubstitutionFile
+
+# ##-- end 3rd party imports
+
+# ##-- 1st party imports
+import bibble
+import bibble._interface as API
+from bibble import bidi, failure, fields, files, latex, metadata, people
+from bibble.io import JinjaWriter, Reader, RstWriter, Writer
+from bibble.util import PairStack
+from .generator import GenConfig_d, generate_bib
+
+# ##-- end 1st party imports
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+    type Middleware = API.Middleware
+    type BenchFn    = Callable[[], Any]
+    type SetupFn    = Callable[[BenchContext], BenchFn]
+    type MwFactory  = Callable[[BenchContext], Middleware]
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+READ_DIR   : Final[str]                 = "read"
+WRITE_DIR  : Final[str]                 = "write"
+BENCHMARKS : Final[dict[str, SetupFn]]  = {}
+# Body:
+
+class BenchContext:
+    """ The shared inputs of a benchmark run:
+    the generated text, its parse (with no middlewares),
+    and a root directory in which the generated 'file' paths exist.
+
+    Prepared libraries are cached by name, so each is only prepared once.
+    """
+    config    : GenConfig_d
+    text      : str
+    library   : Library
+    root      : pl.Path
+    _prepared : dict[str, Library]
+
+    def __init__(self, config:GenConfig_d, *, root:pl.Path) -> None:
+        self.config    = config
+        self.root      = root
+        self.text      = generate_bib(config)
+        self.library   = Reader([]).read(self.text)
+        self._prepared = {}
+        self._make_files()
+
+    @property
+    def entries(self) -> int:
+        return len(self.library.entries)
+
+    def fresh(self, *, prep:Maybe[str]=None, stack:Maybe[list[Middleware]]=None) -> Library:
+        """ A copy of the parsed library, optionally first run through a read stack.
+        The prepared library is cached under the name 'prep'.
+        """
+        match prep, stack:
+            case None, _:
+                return deepcopy(self.library)
+            case str(), _ if prep in self._prepared:
+                pass
+            case str(), list():
+                self._prepared[prep] = Reader(stack).read(self.text)
+            case _:
+                raise ValueError("A prepared library needs a stack", prep)
+
+        return deepcopy(self._prepared[prep])
+
+    def _make_files(self) -> None:
+        for entry in self.library.entries:
+            match entry.get("file"):
+                case model.Field(value=str() as val):
+                    target = self.root / val
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    target.touch()
+                case _:
+                    pass
+
+class BenchResult_d:
+    """ The measurements of one benchmark.
+    Times are the best and mean of the repeats,
+    peak_mem is the peak traced allocation of a separate, traced, run.
+    """
+    __slots__ = ("name", "entries", "repeats", "best_s", "mean_s", "entries_per_s", "peak_mem")
+
+    name          : str
+    entries       : int
+    repeats       : int
+    best_s        : float
+    mean_s        : float
+    entries_per_s : float
+    peak_mem      : int
+
+    def __init__(self, *, name:str, entries:int, times:list[float], peak_mem:int) -> None:
+        self.name          = name
+        self.entries       = entries
+        self.repeats       = len(times)
+        self.best_s        = min(times)
+        self.mean_s        = sum(times) / len(times)
+        self.entries_per_s = entries / self.best_s if self.best_s > 0 else 0.0
+        self.peak_mem      = peak_mem
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} : {self.name} : {self.entries_per_s:.0f} entries/s>"
+
+    def to_dict(self) -> dict:
+        return {x:getattr(self, x) for x in self.__slots__}
+
+##--| Registration
+
+def benchmark(name:str) -> Callable[[SetupFn], SetupFn]:
+    """ Register a benchmark's setup function """
+
+    def register(fn:SetupFn) -> SetupFn:
+        if name in BENCHMARKS:
+            raise KeyError("Duplicate benchmark name", name)
+        BENCHMARKS[name] = fn
+        return fn
+
+    return register
+
+def _register_middleware(name:str, factory:MwFactory, *, direction:str=READ_DIR, prep:Maybe[Callable[[BenchContext], list[Middleware]]]=None) -> None:
+    """ Register a benchmark of a single middleware's transform.
+    'prep' builds a read stack to run on the library first,
+    for middlewares which expect already transformed values.
+    """
+
+    def setup(ctx:BenchContext) -> BenchFn:
+        mw = factory(ctx)
+        match prep:
+            case None:
+                library = ctx.fresh()
+            case x:
+                library = ctx.fresh(prep=name, stack=x(ctx))
+
+        match mw, direction:
+            case API.BidirectionalMiddleware_p(), "read":
+                return ftz.partial(mw.read_transform, library)
+            case API.BidirectionalMiddleware_p(), "write":
+                return ftz.partial(mw.write_transform, library)
+            case _:
+                return ftz.partial(mw.transform, library)
+
+    benchmark(f"mw.{name}")(setup)
+
+def _subs(*pairs:tuple[str, str]) -> SubstitutionFile:
+    subs = SubstitutionFile()
+    for key, val in pairs:
+        subs.update((key, [val]))
+    else:
+        return subs
+
+##--| IO
+
+@benchmark("io.read")
+def _bench_read(ctx:BenchContext) -> BenchFn:
+    reader = Reader([])
+    return ftz.partial(reader.read, ctx.text)
+
+@benchmark("io.write")
+def _bench_write(ctx:BenchContext) -> BenchFn:
+    writer = Writer([])
+    return ftz.partial(writer.write, ctx.fresh())
+
+@benchmark("io.stream_write")
+def _bench_stream_write(ctx:BenchContext) -> BenchFn:
+    writer = Writer([])
+    return ftz.partial(writer.write_to, ctx.fresh(), ctx.root / "write_to.bib")
+
+@benchmark("io.cached_write")
+def _bench_cached_write(ctx:BenchContext) -> BenchFn:
+    """ A write where every entry is already in the render cache """
+    writer = Writer([], render_cache=True)
+    lib    = ctx.fresh()
+    writer.write(lib)
+    return ftz.partial(writer.write, lib)
+
+@benchmark("io.jinja")
+def _bench_jinja(ctx:BenchContext) -> BenchFn:
+    writer = JinjaWriter(PairStack())
+    return ftz.partial(writer.write, ctx.fresh())
+
+@benchmark("io.batch_jinja")
+def _bench_batch_jinja(ctx:BenchContext) -> BenchFn:
+    writer = JinjaWriter(PairStack(), batch=True)
+    return ftz.partial(writer.write, ctx.fresh())
+
+@benchmark("io.rst")
+def _bench_rst(ctx:BenchContext) -> BenchFn:
+    writer = RstWriter([])
+    return ftz.partial(writer.write, ctx.fresh())
+
+@benchmark("io.parallel_rst")
+def _bench_parallel_rst(ctx:BenchContext) -> BenchFn:
+    writer = RstWriter([], render_workers=max(2, os.cpu_count() or 1))
+    return ftz.partial(writer.write, ctx.fresh())
+
+##--| Middlewares
+
+_register_middleware("LatexReader",        lambda ctx: latex.LatexReader())
+_register_middleware("LatexWriter",        lambda ctx: latex.LatexWriter(), direction=WRITE_DIR)
+_register_middleware("NameReader",         lambda ctx: people.NameReader(parts=True, authors=True))
+_register_middleware("NameReader.fsm",     lambda ctx: people.NameReader(parts=True, authors=True, splitter="fsm"))
+_register_middleware("NameWriter",         lambda ctx: people.NameWriter(parts=True, authors=True),
+                     direction=WRITE_DIR, prep=lambda ctx: [people.NameReader(parts=True, authors=True)])
+_register_middleware("NameSubstitutor",    lambda ctx: people.NameSubstitutor(subs=_subs(("Kalo, Sa", "Kalo, Sabel"))),
+                     prep=lambda ctx: [people.NameReader(parts=False, authors=True)])
+_register_middleware("TagsReader",         lambda ctx: metadata.TagsReader())
+_register_middleware("TagsWriter",         lambda ctx: metadata.TagsWriter(),
+                     direction=WRITE_DIR, prep=lambda ctx: [metadata.TagsReader()])
+_register_middleware("KeyLocker",          lambda ctx: metadata.KeyLocker())
+_register_middleware("IsbnValidator",      lambda ctx: metadata.IsbnValidator())
+_register_middleware("IsbnWriter",         lambda ctx: metadata.IsbnWriter(),
+                     direction=WRITE_DIR, prep=lambda ctx: [metadata.IsbnValidator()])
+_register_middleware("EntrySorter",        lambda ctx: metadata.EntrySorter())
+_register_middleware("DataInsertMW",       lambda ctx: metadata.DataInsertMW(benchmark=True))
+_register_middleware("PathReader",         lambda ctx: files.PathReader(lib_root=ctx.root))
+_register_middleware("PathWriter",         lambda ctx: files.PathWriter(lib_root=ctx.root),
+                     direction=WRITE_DIR, prep=lambda ctx: [files.PathReader(lib_root=ctx.root)])
+_register_middleware("TitleCleaner",       lambda ctx: fields.TitleCleaner())
+_register_middleware("TitleSplitter",      lambda ctx: fields.TitleSplitter())
+_register_middleware("CleanUrls",          lambda ctx: fields.CleanUrls())
+_register_middleware("FieldSorter",        lambda ctx: fields.FieldSorter(first=["author", "title", "year"], last=["file"]))
+_register_middleware("FieldAccumulator",   lambda ctx: fields.FieldAccumulator(name="all-tags", fields=["tags"]),
+                     prep=lambda ctx: [metadata.TagsReader()])
+_register_middleware("FieldSubstitutor",   lambda ctx: fields.FieldSubstitutor(fields=["tags"], subs=_subs(("kalo", "kalo_sa"))),
+                     prep=lambda ctx: [metadata.TagsReader()])
+_register_middleware("DuplicateKeyHandler", lambda ctx: failure.DuplicateKeyHandler())
+_register_middleware("FailureLogHandler",  lambda ctx: failure.FailureLogHandler())
+_register_middleware("BraceWrapper.read",  lambda ctx: bidi.BraceWrapper())
+_register_middleware("BraceWrapper.write", lambda ctx: bidi.BraceWrapper(), direction=WRITE_DIR)
+
+##--| PairStacks
+
+def _names_stack(ctx:BenchContext) -> PairStack:
+    return PairStack().add(bidi.BidiNames(parts=True, authors=True))
+
+def _tags_stack(ctx:BenchContext) -> PairStack:
+    return PairStack().add(bidi.BidiTags())
+
+def _latex_stack(ctx:BenchContext) -> PairStack:
+    return PairStack().add(bidi.BidiLatex(), bidi.BraceWrapper())
+
+def _full_stack(ctx:BenchContext) -> PairStack:
+    """ A typical stack, as used to maintain a bibliography """
+    return PairStack().add(bidi.BidiLatex(),
+                           bidi.BidiIsbn(),
+                           bidi.BidiNames(parts=True, authors=True),
+                           bidi.BidiTags(),
+                           bidi.BidiPaths(lib_root=ctx.root),
+                           read=[metadata.DataInsertMW(), failure.DuplicateKeyHandler()],
+                           write=[fields.FieldSorter(first=["author", "title", "year"]), bidi.BraceWrapper()],
+                           )
+
+def _register_stack(name:str, factory:Callable[[BenchContext], PairStack]) -> None:
+    """ Register benchmarks of reading with a stack, and writing what it read """
+
+    def read_setup(ctx:BenchContext) -> BenchFn:
+        reader = Reader(factory(ctx))
+        return ftz.partial(reader.read, ctx.text)
+
+    def write_setup(ctx:BenchContext) -> BenchFn:
+        stack   = factory(ctx)
+        library = ctx.fresh(prep=f"stack.{name}", stack=stack.read_stack())
+        writer  = Writer(stack)
+        return ftz.partial(writer.write, library)
+
+    benchmark(f"stack.{name}.read")(read_setup)
+    benchmark(f"stack.{name}.write")(write_setup)
+
+_register_stack("names", _names_stack)
+_register_stack("tags",  _tags_stack)
+_register_stack("latex", _latex_stack)
+_register_stack("full",  _full_stack)
+
+##--| Running
+
+def _measure(ctx:BenchContext, name:str, setup:SetupFn, *, repeats:int) -> BenchResult_d:
+    times = []
+    for _ in range(repeats):
+        fn    = setup(ctx)
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    # Memory is measured separately, as tracing slows the timed runs
+    fn = setup(ctx)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchResult_d(name=name, entries=ctx.entries, times=times, peak_mem=peak)
+
+def run_benchmarks(config:GenConfig_d, *, names:Maybe[re.Pattern|str]=None, repeats:int=3) -> list[dict]:
+    """ Run the benchmarks whose names match the 'names' regex (or all of them),
+    returning a list of result dicts.
+    Each result includes the generator config, and the versions being measured.
+    Benchmarks which fail are logged, and left out of the results.
+    """
+    match names:
+        case None:
+            selected = list(BENCHMARKS.items())
+        case str() | re.Pattern():
+            selected = [(k, v) for k,v in BENCHMARKS.items() if re.search(names, k)]
+        case x:
+            raise TypeError(type(x))
+
+    common = {
+        "timestamp"   : datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+        "bibble"      : bibble.__version__,
+        "python"      : platform.python_version(),
+        "generator"   : config.to_dict(),
+    }
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        ctx = BenchContext(config, root=pl.Path(root))
+        for name, setup in selected:
+            logging.info("Benchmarking: %s", name)
+            try:
+                result = _measure(ctx, name, setup, repeats=repeats)
+            except Exception as err:
+                logging.warning("Benchmark Failed: %s : %s", name, err)
+                continue
+
+            results.append(common | result.to_dict())
+        else:
+            return results
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+A deterministic generator of synthetic bibtex,
+for benchmarking readers, writers and middlewares at scale.
+
+The same GenConfig_d always produces the same text.
+"""
+
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import itertools as itz
+import logging as logmod
+import pathlib as pl
+import random
+import re
+import time
+import types
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+ENTRY_TYPES  : Final[tuple[str, ...]] = ("book", "article", "inproceedings", "incollection", "online", "misc")
+SYLLABLES    : Final[tuple[str, ...]] = ("ka", "lo", "mer", "tin", "sa", "ve", "ron", "di", "an", "bel", "cu", "os", "ter", "ni", "gar", "pe")
+VON_PARTS    : Final[tuple[str, ...]] = ("von", "van der", "de", "della")
+LATEX_SUBS   : Final[tuple[tuple[str, str], ...]] = (
+    ("o", r"{\"o}"), ("e", r"{\'e}"), ("a", r"{\`a}"), ("u", r"{\"u}"), ("n", r"{\~n}"), ("c", r"{\c{c}}"),
+)
+FAILURE_TMPL : Final[str]             = "@{type}{{{key},\n  title = {{{title}}},\n  title = {{{title}}},\n  tags = {{{tags}}},\n}}\n"
+# Body:
+
+class GenConfig_d:
+    """ The shape of a synthetic bibliography.
+
+    - entries    : the number of entries.
+    - authors    : the mean number of authors per entry.
+    - tags       : the mean number of tags per entry.
+    - latex      : the fraction of titles and names with latex escapes.
+    - paths      : the fraction of entries with a 'file' field.
+    - isbns      : the fraction of entries with an isbn, of which 1 in 10 are invalid.
+    - urls       : the fraction of entries with a url or doi.
+    - duplicates : the fraction of entries which reuse an earlier entry's key.
+    - failures   : the fraction of entries which fail to parse (from duplicated fields).
+    """
+    __slots__ = ("entries", "seed", "authors", "tags", "latex", "paths", "isbns", "urls", "duplicates", "failures")
+
+    entries    : int
+    seed       : int
+    authors    : float
+    tags       : float
+    latex      : float
+    paths      : float
+    isbns      : float
+    urls       : float
+    duplicates : float
+    failures   : float
+
+    def __init__(self, *, entries:int=1_000, seed:int=0, authors:float=2.5, tags:float=4.0, latex:float=0.2, paths:float=0.3, isbns:float=0.3, urls:float=0.3, duplicates:float=0.01, failures:float=0.01) -> None:
+        self.entries    = entries
+        self.seed       = seed
+        self.authors    = authors
+        self.tags       = tags
+        self.latex      = latex
+        self.paths      = paths
+        self.isbns      = isbns
+        self.urls       = urls
+        self.duplicates = duplicates
+        self.failures   = failures
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} : {self.entries} entries : seed {self.seed}>"
+
+    def to_dict(self) -> dict:
+        return {x:getattr(self, x) for x in self.__slots__}
+
+class _BibGenerator:
+    """ Generates the text of a bibliography, one entry at a time, from a single seeded rng """
+    _config : GenConfig_d
+    _rng    : random.Random
+    _keys   : list[str]
+    _tags   : list[str]
+
+    def __init__(self, config:GenConfig_d) -> None:
+        self._config = config
+        self._rng    = random.Random(config.seed)
+        self._keys   = []
+        # A fixed vocabulary, so tags repeat across entries
+        self._tags   = [self._word(2, 3) for _ in range(max(10, config.entries // 10))]
+
+    def generate(self) -> str:
+        conf   = self._config
+        result = [f"% Synthetic bibliography: {conf.entries} entries, seed {conf.seed}\n\n"]
+        for i in range(conf.entries):
+            result.append(self._entry(i))
+            result.append("\n")
+        else:
+            return "".join(result)
+
+    def _entry(self, i:int) -> str:
+        rng   = self._rng
+        conf  = self._config
+        etype = rng.choice(ENTRY_TYPES)
+        title = self._title()
+        match rng.random():
+            case x if bool(self._keys) and x < conf.duplicates:
+                key = rng.choice(self._keys)
+            case _:
+                key = f"{self._word(1, 2)}_{i}"
+                self._keys.append(key)
+
+        if rng.random() < conf.failures:
+            return FAILURE_TMPL.format(type=etype, key=key, title=title, tags=rng.choice(self._tags))
+
+        fields = [("title", title),
+                  ("author", " and ".join(self._name() for _ in range(self._count(conf.authors)))),
+                  ("year", str(rng.randint(1900, 2025))),
+                  ("tags", ",".join(rng.sample(self._tags, min(len(self._tags), self._count(conf.tags))))),
+                  ]
+        match etype:
+            case "article":
+                fields.append(("journal", self._title(2, 4)))
+            case "inproceedings" | "incollection":
+                fields.append(("booktitle", self._title(3, 6)))
+            case _:
+                fields.append(("publisher", self._title(1, 3)))
+
+        if rng.random() < conf.isbns:
+            fields.append(("isbn", self._isbn(valid=rng.random() > 0.1)))
+        if rng.random() < conf.urls:
+            fields.append(rng.choice([("url", f"https://example.com/{key}"),
+                                      ("doi", f"https://doi.org/10.{rng.randint(1000, 9999)}/{key}")]))
+        if rng.random() < conf.paths:
+            fields.append(("file", f"{self._word(1, 2)}/{key}.pdf"))
+
+        lines = [f"@{etype}{{{key},"]
+        lines += [f"  {k:<10} = {{{v}}}," for k,v in fields]
+        lines.append("}\n")
+        return "\n".join(lines)
+
+    def _count(self, mean:float) -> int:
+        """ A count around the mean, of at least 1 for positive means """
+        if mean <= 0:
+            return 0
+        return max(1, round(self._rng.uniform(0.5, 1.5) * mean))
+
+    def _word(self, low:int=1, high:int=3) -> str:
+        return "".join(self._rng.choice(SYLLABLES) for _ in range(self._rng.randint(low, high)))
+
+    def _latexify(self, word:str) -> str:
+        if self._rng.random() >= self._config.latex:
+            return word
+
+        for char, escape in LATEX_SUBS:
+            if char in word:
+                return word.replace(char, escape, 1)
+        else:
+            return word
+
+    def _title(self, low:int=3, high:int=9) -> str:
+        words = [self._word() for _ in range(self._rng.randint(low, high))]
+        words[0] = self._latexify(words[0].capitalize())
+        return " ".join(words)
+
+    def _name(self) -> str:
+        rng   = self._rng
+        first = self._latexify(self._word().capitalize())
+        last  = self._latexify(self._word(2, 3).capitalize())
+        match rng.random():
+            case x if x < 0.5:
+                return f"{last}, {first}"
+            case x if x < 0.6:
+                return f"{rng.choice(VON_PARTS)} {last}, {first}"
+            case x if x < 0.7:
+                return f"{last}, Jr, {first}"
+            case _:
+                return f"{first} {last}"
+
+    def _isbn(self, *, valid:bool) -> str:
+        digits = [9, 7, 8] + [self._rng.randint(0, 9) for _ in range(9)]
+        check  = (10 - sum(x * (3 if i % 2 else 1) for i, x in enumerate(digits)) % 10) % 10
+        if not valid:
+            check = (check + 1) % 10
+        return "".join(str(x) for x in [*digits, check])
+
+##--|
+
+def generate_bib(config:Maybe[GenConfig_d]=None, **kwargs:Any) -> str:
+    """ Generate the text of a synthetic bibliography.
+    Takes a GenConfig_d, or its kwargs.
+    """
+    match config:
+        case None:
+            config = GenConfig_d(**kwargs)
+        case GenConfig_d() if not bool(kwargs):
+            pass
+        case x:
+            raise TypeError("Pass either a GenConfig_d or its kwargs", x)
+
+    return _BibGenerator(config).generate()
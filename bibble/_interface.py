@@ -76,6 +76,9 @@ logging = logmod.getLogger(__name__)
 # Vars:
 ALLOW_INPLACE_MOD_K : Final[str] = "allow_inplace_modification"
 ALLOW_PARALLEL_K    : Final[str] = "allow_parallel_execution"
+PARALLEL_POOL_K     : Final[str] = "parallel_pool"
+PARALLEL_WORKERS_K  : Final[str] = "parallel_workers"
+PARALLEL_SHARD_K    : Final[str] = "parallel_shard_size"
 LOGGER_K            : Final[str] = "logger"
 KEEP_MATH_K         : Final[str] = "keep_math"
 ENCLOSE_URLS_K      : Final[str] = "enclose_urls"
@@ -125,6 +128,12 @@ class Library_p(Protocol):
 
     def comments(self) -> list[CommentBlock]: ...
 
+@runtime_checkable
+class MetaIndexed_p(Protocol):
+    """ A Library which indexes its MetaBlocks by type """
+
+    def find_meta(self, cls:type) -> Maybe[Block]: ...
+
 @runtime_checkable
 class Middleware_p(Protocol):
     """ A Middleware is something with a 'transform' method """
@@ -198,7 +207,7 @@ class Reader_p(Protocol):
 
     def read(self, source:str|pl.Path, *, into:Maybe[Library]=None, append:Maybe[list[Middleware]]=None) -> Maybe[Library]: ...
 
-    def read_dir(self, source:pl.Path, *, ext:str, into:Maybe[Library]=None, append:Maybe[list[Middleware]]=None) -> Maybe[Library]: ...
+    def read_dir(self, source:pl.Path, *, ext:str, into:Maybe[Library]=None, append:Maybe[list[Middleware]]=None, workers:Maybe[int]=None) -> Maybe[Library]: ...
 
 @runtime_checkable
 class Writer_p(Protocol):
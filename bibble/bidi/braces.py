@@ -109,22 +109,20 @@ class BraceWrapper(IdenBidiMiddleware):
             return value
 
     def write_transform_Entry(self, entry:Entry, *args, **kwargs) -> list[Entry]:
-        for field in entry.fields:
-            field.value = self._wrap(field.value, maybe_int_rule=field.key in ENTRY_POTENTIALLY_INT_FIELDS)
-        else:
-            return [entry]
+        # Fields are replaced, not modified, as they may be shared with a library snapshot
+        entry.fields = [model.Field(x.key,
+                                    self._wrap(x.value, maybe_int_rule=x.key in ENTRY_POTENTIALLY_INT_FIELDS),
+                                    start_line=x.start_line)
+                        for x in entry.fields]
+        return [entry]
 
     def write_transform_String(self, string:String, *args, **kwargs) -> list[String]:
         string.value = self._wrap(string.value, maybe_int_rule=STRINGS_CAN_BE_UNESCAPED_INTS)
         return [string]
 
     def read_transform_Entry(self, entry: Entry, library: Library) -> list[Entry]:
-        for field in entry.fields:
-            field.value = self._unwrap(field.value)
-        else:
-            return [entry]
-
-        Never()
+        entry.fields = [model.Field(x.key, self._unwrap(x.value), start_line=x.start_line) for x in entry.fields]
+        return [entry]
 
     def read_transform_String(self, string: String, library: Library) -> list[String]:
         string.value = self._unwrap(string.value)
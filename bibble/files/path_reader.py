@@ -98,13 +98,13 @@ class PathReader(IdenBlockMiddleware):
         base = pl.Path(field.value)
         match base.parts[0]:
             case "/":
-                field.value = base
+                path = base
             case "~":
-                field.value = base.expanduser().resolve()
+                path = base.expanduser().resolve()
             case _:
-                field.value = self._lib_root / base
+                path = self._lib_root / base
 
-        if not field.value.exists():
-            return ValueError(f"File does not exist: {field.value}")
+        if not path.exists():
+            return ValueError(f"File does not exist: {path}")
 
-        return [field]
+        return [model.Field(field.key, path, start_line=field.start_line)]
@@ -131,12 +131,12 @@ class PathWriter(IdenBlockMiddleware):
             case pl.Path() as val:
                 try:
                     as_str = val.relative_to(self._lib_root)
-                    field.value = as_str
+                    field  = model.Field(field.key, as_str, start_line=field.start_line)
                 except ValueError:
                     if self._suppress_relative_fail(val):
                         pass
                     else:
-                        field.value = str(val)
+                        entry.set_field(model.Field(field.key, str(val), start_line=field.start_line))
                         return ValueError(f"Failed to Relativize path {entry.key}: {val}")
 
         return [field]
@@ -3,3 +3,5 @@ from .writer import BibbleWriter as Writer
 from .reader import BibbleReader as Reader
 from .rst_writer import RstWriter
 from .jinja_writer import JinjaWriter
+from .read_cache import ReadCache
+from .render_cache import RenderCache
@@ -11,6 +11,8 @@ from __future__ import annotations
 # ##-- stdlib imports
 import logging as logmod
 import pathlib as pl
+import io
+import pickle
 import warnings
 # ##-- end stdlib imports
 
@@ -22,8 +24,10 @@ import pytest
 ##--|
 import bibble._interface as API
 from .. import JinjaWriter
+from .. import _interface as API_W
 from bibtexparser import Library, model
 from bibble.bidi import BraceWrapper
+from bibble.model import MetaBlock
 ##--|
 
 # ##-- types
@@ -98,6 +102,88 @@ class TestJinjaWriter:
                  assert(False), x
 
 
+    def test_write_to_matches_write(self, lib):
+        writer = JinjaWriter([], templates=TEST_TEMPLATES)
+        writer.update_templates({"entry": "just_title_entry.jinja", "lib": None})
+        sink   = io.StringIO()
+        writer.write_to(lib, sink)
+        assert(sink.getvalue().strip() == "Testing Title")
+        assert(sink.getvalue() == writer.write(lib))
+
+    def test_render_cache_template_change(self, lib):
+        writer = JinjaWriter([], templates=TEST_TEMPLATES, render_cache=True)
+        writer.update_templates({"entry": "just_title_entry.jinja", "lib": None})
+        writer.write(lib)
+        writer.update_templates({"entry": "entry.bib.jinja"})
+        result = writer.write(lib)
+        assert(writer._render_cache.stats()['hits'] == 0)
+        assert("test_art" in result)
+
+    def test_pickle_rebuilds_templates(self, lib):
+        writer = JinjaWriter([], templates=TEST_TEMPLATES)
+        writer.update_templates({"entry": "just_title_entry.jinja", "lib": None})
+        copied = pickle.loads(pickle.dumps(writer))
+        assert(copied._env is not writer._env)
+        assert(copied._templates['lib'] is None)
+        assert(copied._templates['entry'].name == "just_title_entry.jinja")
+        assert(copied.write(lib) == writer.write(lib))
+
+    def test_render_workers_matches(self, mocker):
+        mocker.patch.object(API_W, "RENDER_MIN_BLOCKS", 2)
+        lib = Library([model.Entry("article", f"test_{i}", [
+            model.Field("title", f"Title {i}"),
+        ]) for i in range(10)])
+        templates = {"entry": "just_title_entry.jinja", "lib": None}
+        expected  = JinjaWriter([], templates=TEST_TEMPLATES).write(lib, templates=templates)
+        parallel  = JinjaWriter([], templates=TEST_TEMPLATES, render_workers=2)
+        assert(parallel.write(lib, templates=templates) == expected)
+        assert("Title 9" in expected)
+
+    def test_batch_ctor_fail(self):
+        with pytest.raises(ValueError):
+            JinjaWriter([], batch=True, render_cache=True)
+
+        with pytest.raises(ValueError):
+            JinjaWriter([], batch=True, render_workers=2)
+
+    @pytest.mark.parametrize("lib_template", [None, "simple_lib.jinja"])
+    @pytest.mark.parametrize("meta_at", [0, 2, 5])
+    def test_batch_matches(self, lib_template, meta_at):
+        blocks = [
+            model.ImplicitComment("% A Comment"),
+            model.String("blah", "{bloo}"),
+            *(model.Entry("article", f"test_{i}", [
+                model.Field("year", 1992),
+                model.Field("title", f"Title {i}  "),
+            ]) for i in range(3)),
+        ]
+        blocks.insert(meta_at, MetaBlock(sources={"test.bib"}))
+        lib       = Library(blocks)
+        templates = {"lib": lib_template}
+        expected  = JinjaWriter([], templates=TEST_TEMPLATES).write(lib, templates=templates)
+        batched   = JinjaWriter([], templates=TEST_TEMPLATES, batch=True)
+        assert(batched.write(lib, templates=templates) == expected)
+        assert("@article{test_2," in expected)
+
+    def test_batch_custom_body(self, lib):
+        writer = JinjaWriter([], templates=TEST_TEMPLATES, batch=True)
+        match writer.write(lib, templates={"body": "just_title_body.jinja", "lib": None}):
+            case str() as x:
+                assert(x.strip() == "Testing Title")
+            case x:
+                assert(False), x
+
+    def test_bytecode_cache(self, lib, tmp_path):
+        target = tmp_path / "bytecode"
+        JinjaWriter([], bytecode_cache=target)
+        cached = list(target.iterdir())
+        assert(bool(cached))
+        writer = JinjaWriter([], bytecode_cache=target, batch=True)
+        assert(sorted(target.iterdir()) == sorted(cached))
+        copied = pickle.loads(pickle.dumps(writer))
+        assert(copied._env.bytecode_cache.directory == str(target))
+        assert(copied.write(lib) == writer.write(lib))
+
     def test_write_template_control(self, lib):
         templates = {
             "entry"   : "title_year_entry.jinja",
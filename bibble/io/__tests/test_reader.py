@@ -19,8 +19,15 @@ import pytest
 
 import bibble._interface as API
 from bibtexparser import Library
+from bibble.model import MetaBlock
 from .. import Reader
 from bibble.bidi import BraceWrapper
+from bibble.metadata import EntrySorter, KeyLocker
+from bibble.people import NameReader
+from bibble.people._interface import AuthorIndexBlock
+from bibble.util.selectors import SelectAuthor
+from bibble.util.executors import FusedExecutor, ParallelExecutor
+from bibble.util.middlecore import IdenBlockMiddleware
 
 # ##-- types
 # isort: off
@@ -64,6 +71,20 @@ EXAMPLE_BIB : Final[str] = """
 """
 # Body:
 
+class _MetaSetter(IdenBlockMiddleware):
+    """ Sets a value in the library's MetaBlock """
+
+    def transform_MetaBlock(self, block, library):
+        block.data['set'] = True
+        return [block]
+
+class _MetaHook(IdenBlockMiddleware):
+    """ Records the MetaBlock value its hook sees """
+
+    def handle_meta_entry(self, library):
+        self.seen = MetaBlock.find_in(library).data.get('set', False)
+
+
 class TestBibbleReader:
 
     def test_sanity(self):
@@ -105,6 +126,127 @@ class TestBibbleReader:
             case x:
                  assert(False), x
 
+    def test_middleware_grouping(self):
+        reader = Reader([BraceWrapper(), KeyLocker(), EntrySorter(), KeyLocker()])
+        match reader._group_middlewares(reader._middlewares, direction="read"):
+            case [FusedExecutor() as first, EntrySorter(), FusedExecutor() as last]:
+                assert(len(first) == 2)
+                assert(len(last) == 1)
+            case x:
+                assert(False), x
+
+    def test_meta_hook_starts_group(self):
+        reader = Reader([BraceWrapper(), _MetaHook(), KeyLocker()])
+        match reader._group_middlewares(reader._middlewares, direction="read"):
+            case [FusedExecutor() as first, FusedExecutor() as second]:
+                assert(len(first) == 1)
+                assert(len(second) == 2)
+            case x:
+                assert(False), x
+
+    def test_meta_hook_sees_earlier_transforms(self):
+        hook   = _MetaHook()
+        reader = Reader([_MetaSetter(), hook])
+        reader._run_readwares(Library([MetaBlock()]))
+        assert(hook.seen is True)
+
+    def test_parallel_middleware_grouping(self):
+        reader = Reader([BraceWrapper(),
+                         KeyLocker(allow_parallel_execution=True),
+                         KeyLocker(allow_parallel_execution=True),
+                         KeyLocker(allow_parallel_execution=True, parallel_pool="thread"),
+                         ])
+        match reader._group_middlewares(reader._middlewares, direction="read"):
+            case [FusedExecutor() as first, ParallelExecutor() as procs, ParallelExecutor() as threads]:
+                assert(len(first) == 1)
+                assert(len(procs) == 2)
+                assert(procs._pool == "process")
+                assert(threads._pool == "thread")
+            case x:
+                assert(False), x
+
+    def test_read_with_fused_middlewares(self):
+        reader = Reader([BraceWrapper(), KeyLocker(), EntrySorter()])
+        match reader.read(EXAMPLE_BIB):
+            case Library() as lib:
+                assert(len(lib.entries) == 1)
+                assert(lib.entries[0].fields_dict['title'].value == "Blah")
+            case x:
+                 assert(False), x
+
     @pytest.mark.skip
     def test_todo(self):
         pass
+
+class TestReadDir:
+
+    @pytest.fixture
+    def bib_dir(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        for i, name in enumerate(["b.bib", "a.bib", "sub/c.bib"]):
+            (tmp_path / name).write_text(EXAMPLE_BIB.replace("test_art", f"test_{i}"))
+        else:
+            (tmp_path / "ignored.txt").write_text(EXAMPLE_BIB)
+            return tmp_path
+
+    def test_sanity(self):
+        assert(True is not False) # noqa: PLR0133
+
+    def test_find_files(self, bib_dir):
+        reader = Reader([])
+        found  = reader._find_files(bib_dir, ext=".bib")
+        assert(found == [bib_dir / "a.bib", bib_dir / "b.bib", bib_dir / "sub/c.bib"])
+
+    @pytest.mark.parametrize("pool", ["process", "thread"])
+    def test_read_dir(self, bib_dir, pool):
+        reader = Reader([KeyLocker()])
+        match reader.read_dir(bib_dir, ext=".bib", workers=2, pool=pool):
+            case Library() as lib:
+                assert([x.key for x in lib.entries] == ["test_1_", "test_0_", "test_2_"])
+            case x:
+                assert(False), x
+
+    def test_matches_single_worker(self, bib_dir):
+        reader   = Reader([KeyLocker()])
+        single   = reader.read_dir(bib_dir, ext=".bib", workers=1)
+        parallel = reader.read_dir(bib_dir, ext=".bib", workers=3)
+        assert([x.key for x in single.entries] == [x.key for x in parallel.entries])
+
+    def test_merges_key_maps(self, bib_dir):
+        reader = Reader([KeyLocker()])
+        match reader.read_dir(bib_dir, ext=".bib", workers=2):
+            case Library() as lib:
+                metas = [x for x in lib.blocks if type(x) is MetaBlock]
+                assert(len(metas) == 1)
+                assert(metas[0].data['sources'] == {bib_dir / "a.bib", bib_dir / "b.bib", bib_dir / "sub/c.bib"})
+                assert(metas[0].data[bib_dir / "a.bib"] == {"test_1_"})
+            case x:
+                assert(False), x
+
+    def test_merges_author_indexes(self, bib_dir):
+        for i, name in enumerate(["b.bib", "a.bib", "sub/c.bib"]):
+            text = EXAMPLE_BIB.replace("test_art", f"test_{i}").replace("Bob", f"Bob and Person{i}, Some")
+            (bib_dir / name).write_text(text)
+
+        reader = Reader([BraceWrapper(), NameReader(index=True)])
+        match reader.read_dir(bib_dir, ext=".bib", workers=2, pool="thread"):
+            case Library() as lib:
+                assert(sum(isinstance(x, AuthorIndexBlock) for x in lib.blocks) == 1)
+                assert(not AuthorIndexBlock.find_in(lib).is_stale(lib))
+                found = SelectAuthor(authors=["Bob"]).transform(lib)
+                assert([x.key for x in found.entries] == ["test_1", "test_0", "test_2"])
+                found = SelectAuthor(authors=["Some Person0", "Some Person2"]).transform(lib)
+                assert([x.key for x in found.entries] == ["test_0", "test_2"])
+            case x:
+                assert(False), x
+
+    def test_into(self, bib_dir):
+        reader = Reader([KeyLocker()])
+        into   = reader.read(EXAMPLE_BIB)
+        match reader.read_dir(bib_dir, ext=".bib", into=into, workers=2):
+            case Library() as lib:
+                assert(lib is into)
+                assert(len(lib.entries) == 4)
+                assert(len([x for x in lib.blocks if type(x) is MetaBlock]) == 1)
+            case x:
+                assert(False), x
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# ruff: noqa: ANN201, ARG001, ANN001, ARG002, ANN202
+
+# Imports
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import warnings
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+# ##-- end 3rd party imports
+
+import pickle
+import os
+import subprocess
+import sys
+from bibtexparser import model
+from ..render_cache import RenderCache, entry_fingerprint
+from .. import _interface as API_IO
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+# from dataclasses import InitVar, dataclass, field
+# from pydantic import BaseModel, Field, model_validator, field_validator, ValidationError
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+
+# Vars:
+
+# Body:
+
+def _entry(title:str="Title") -> model.Entry:
+    return model.Entry("article", "test_art", [model.Field("year", "1992"), model.Field("title", title)])
+
+def _render(entry:model.Entry) -> list[str]:
+    return [entry.key, ":", entry.fields_dict['title'].value]
+
+class TestEntryFingerprint:
+
+    def test_sanity(self):
+        assert(True is not False) # noqa: PLR0133
+
+    def test_stable(self):
+        assert(entry_fingerprint(_entry(), "settings") == entry_fingerprint(_entry(), "settings"))
+
+    def test_changes(self):
+        base = entry_fingerprint(_entry(), "settings")
+        assert(base != entry_fingerprint(_entry("Other"), "settings"))
+        assert(base != entry_fingerprint(_entry(), "other settings"))
+        reordered = model.Entry("article", "test_art", [model.Field("title", "Title"), model.Field("year", "1992")])
+        assert(base != entry_fingerprint(reordered, "settings"))
+
+    @pytest.mark.parametrize("first,second", [(1992, "1992"), (["a", "b"], "['a', 'b']"), ({"a"}, ["a"]), (("a",), ["a"])])
+    def test_value_types_differ(self, first, second):
+        assert(entry_fingerprint(_entry(first), "settings") != entry_fingerprint(_entry(second), "settings"))
+
+    def test_set_order_independent(self):
+        tags  = [f"tag_{i}" for i in range(20)]
+        first = model.Entry("article", "test_art", [model.Field("tags", set(tags))])
+        other = model.Entry("article", "test_art", [model.Field("tags", set(reversed(tags)))])
+        assert(entry_fingerprint(first, "settings") == entry_fingerprint(other, "settings"))
+
+    def test_stable_across_processes(self):
+        script = "\n".join([
+            "from bibtexparser import model",
+            "from bibble.io.render_cache import entry_fingerprint",
+            "entry = model.Entry('article', 'test', [model.Field('tags', {f'tag_{i}' for i in range(20)}), model.Field('year', 1992)])",
+            "print(entry_fingerprint(entry, 'settings').hex())",
+        ])
+        results = set()
+        for seed in ("1", "2"):
+            env  = {**os.environ, "PYTHONHASHSEED": seed}
+            proc = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+            results.add(proc.stdout.strip())
+
+        assert(len(results) == 1)
+
+class TestRenderCache:
+
+    def test_sanity(self):
+        assert(True is not False) # noqa: PLR0133
+
+    def test_ctor(self):
+        match RenderCache():
+            case RenderCache() as x:
+                assert(len(x) == 0)
+            case x:
+                assert(False), x
+
+    def test_get_or_render(self, mocker):
+        cache  = RenderCache()
+        render = mocker.Mock(side_effect=_render)
+        first  = cache.get_or_render(_entry(), "settings", render)
+        second = cache.get_or_render(_entry(), "settings", render)
+        assert(first == second == ["test_art", ":", "Title"])
+        assert(first is not second)
+        assert(render.call_count == 1)
+
+    def test_save_and_load(self, tmp_path, mocker):
+        target = tmp_path / "render.cache"
+        cache  = RenderCache(target)
+        assert(not cache.save())
+        cache.get_or_render(_entry(), "settings", _render)
+        assert(cache.save())
+        render = mocker.Mock(side_effect=_render)
+        loaded = RenderCache(target)
+        assert(len(loaded) == 1)
+        assert(loaded.get_or_render(_entry(), "settings", render) == ["test_art", ":", "Title"])
+        render.assert_not_called()
+        # Nothing new, so nothing to save
+        assert(not loaded.save())
+
+    def test_corrupt_file(self, tmp_path):
+        target = tmp_path / "render.cache"
+        target.write_bytes(b"not a pickle")
+        assert(len(RenderCache(target)) == 0)
+
+    def test_old_format(self, tmp_path):
+        target = tmp_path / "render.cache"
+        target.write_bytes(pickle.dumps({"format": API_IO.RENDER_CACHE_FORMAT - 1, "items": [(b"key", ("blah",))]}))
+        assert(len(RenderCache(target)) == 0)
+
+    def test_bounded(self):
+        cache = RenderCache(maxsize=2)
+        for i in range(5):
+            cache.get_or_render(_entry(str(i)), "settings", _render)
+        assert(len(cache) == 2)
+
+    def test_pickle(self, tmp_path):
+        cache = RenderCache(tmp_path / "render.cache", maxsize=10)
+        cache.get_or_render(_entry(), "settings", _render)
+        cache.save()
+        copied = pickle.loads(pickle.dumps(cache))
+        assert(len(copied) == 1)
+        assert(copied.stats()['maxsize'] == 10)
+
+    @pytest.mark.skip
+    def test_todo(self):
+        pass
@@ -8,6 +8,7 @@ from __future__ import annotations
 # ##-- stdlib imports
 import logging as logmod
 import pathlib as pl
+import io
 import warnings
 # ##-- end stdlib imports
 
@@ -19,6 +20,7 @@ from bibtexparser import Library, model
 import bibble._interface as API
 from bibble.bidi import BraceWrapper
 from .. import RstWriter
+from .. import _interface as API_W
 from importlib.resources import files
 
 # ##-- types
@@ -101,6 +103,27 @@ class TestRstWriter:
             case x:
                  assert(False), x
 
+    def test_write_to_matches_write(self):
+        lib = Library([model.Entry("article", f"test_{i}", [
+            model.Field("year", 1992),
+            model.Field("title", f"Title {i}"),
+            model.Field("tags", "blah,bloo"),
+        ]) for i in range(3)])
+        writer = RstWriter([])
+        sink   = io.StringIO()
+        writer.write_to(lib, sink, title="Test")
+        assert(sink.getvalue() == writer.write(lib, title="Test"))
+
+    def test_render_workers_matches(self, mocker):
+        mocker.patch.object(API_W, "RENDER_MIN_BLOCKS", 2)
+        lib = Library([model.Entry("article", f"test_{i}", [
+            model.Field("year", 1992),
+            model.Field("title", f"Title {i}"),
+            model.Field("tags", "blah,bloo"),
+        ]) for i in range(10)])
+        expected = RstWriter([]).write(lib, title="Test")
+        assert(RstWriter([], render_workers=3).write(lib, title="Test") == expected)
+
     @pytest.mark.skip
     def test_todo(self):
         pass
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# ruff: noqa: ANN201, ARG001, ANN001, ARG002, ANN202
+
+# Imports
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import warnings
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+# ##-- end 3rd party imports
+
+import io
+from bibtexparser import model, Library
+from bibtexparser.splitter import Splitter
+from bibble.bidi import BidiLatex, BraceWrapper
+from bibble.metadata import EntrySorter
+from bibble.util import PairStack
+from .. import Reader, Writer
+from ..stream import scan_blocks, parse_block_text, stream_blocks
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+# from dataclasses import InitVar, dataclass, field
+# from pydantic import BaseModel, Field, model_validator, field_validator, ValidationError
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+
+EXAMPLE_BIB : Final[str] = """% intro comment
+@string{abc = "blah"}
+@article{first,
+  title  = {S\\'{e}ance},
+  year   = {2000},
+}
+
+@book{second, title = {Blah @misc{ nested }, year={1}}
+@misc{third, title = "x"}
+trailing
+"""
+
+def _entry_summary(blocks:list[model.Block]) -> list[tuple]:
+    return [(x.key, x.start_line, [(y.key, y.value, y.start_line) for y in x.fields])
+            for x in blocks if isinstance(x, model.Entry)]
+
+# Body:
+
+class TestScanBlocks:
+
+    def test_sanity(self):
+        assert(True is not False) # noqa: PLR0133
+
+    def test_scan(self):
+        match list(scan_blocks(EXAMPLE_BIB)):
+            case [(0, str() as comment), (1, str()), (2, str()), (7, str()), (7, str()), (8, str() as last)]:
+                assert(comment.startswith("% intro"))
+                assert(last.startswith("@misc{third"))
+            case x:
+                assert(False), x
+
+    @pytest.mark.parametrize("read_size", [1, 3, 7, 64, 4096])
+    def test_read_size_doesnt_change_scan(self, read_size):
+        assert(list(scan_blocks(EXAMPLE_BIB, read_size=read_size)) == list(scan_blocks(EXAMPLE_BIB)))
+
+    def test_scan_rejoins(self):
+        assert("".join(x[1] for x in scan_blocks(EXAMPLE_BIB, read_size=5)) == EXAMPLE_BIB)
+
+    def test_scan_file(self, tmp_path):
+        target = tmp_path / "test.bib"
+        target.write_text(EXAMPLE_BIB)
+        assert(list(scan_blocks(target)) == list(scan_blocks(EXAMPLE_BIB)))
+
+    def test_parse_block_text_offsets_lines(self):
+        match parse_block_text("@misc{test,\n title = {blah},\n}\n", start_line=10):
+            case [model.Entry() as entry]:
+                assert(entry.start_line == 10)
+                assert(entry.fields[0].start_line == 11)
+            case x:
+                assert(False), x
+
+    def test_matches_splitter(self):
+        whole    = Splitter(bibstr=EXAMPLE_BIB).split().blocks
+        streamed = list(stream_blocks(EXAMPLE_BIB, read_size=16))
+        assert(_entry_summary(streamed) == _entry_summary(whole))
+        assert([type(x) for x in streamed] == [type(x) for x in whole])
+
+    @pytest.mark.parametrize("read_size", [4, 64])
+    def test_marks_in_values_split_like_splitter(self, read_size):
+        text     = "@article{first,\n  title = {Blah\n@misc{inner, year = {1}}\n  blah},\n}\n@book{last, year = {2}}\n"
+        scanned  = [x[1] for x in scan_blocks(text, read_size=read_size)]
+        assert([x.split("{")[0] for x in scanned] == ["@article", "@misc", "@book"])
+        whole    = Splitter(bibstr=text).split().blocks
+        streamed = list(stream_blocks(text, read_size=read_size))
+        assert([type(x) for x in streamed] == [type(x) for x in whole])
+        assert(isinstance(streamed[0], model.ParsingFailedBlock))
+        assert(_entry_summary(streamed) == _entry_summary(whole))
+
+    def test_many_blocks_per_chunk(self):
+        text    = "".join(f"@misc{{key_{i}, year = {{{i}}}}}\n" for i in range(5000))
+        scanned = list(scan_blocks(text, read_size=len(text)))
+        assert(len(scanned) == 5000)
+        assert(scanned[-1] == (4999, "@misc{key_4999, year = {4999}}\n"))
+
+class TestStreaming:
+
+    def test_sanity(self):
+        assert(True is not False) # noqa: PLR0133
+
+    def test_reader_stream(self):
+        reader = Reader([BraceWrapper()])
+        match list(reader.stream(EXAMPLE_BIB)):
+            case [*blocks]:
+                entries = [x for x in blocks if isinstance(x, model.Entry)]
+                assert([x.key for x in entries] == ["first", "nested", "third"])
+                assert(entries[0]['year'] == "2000")
+            case x:
+                assert(False), x
+
+    def test_reader_stream_matches_read(self):
+        stack = PairStack()
+        stack.add(BidiLatex(), BraceWrapper())
+        reader = Reader(stack)
+        assert(_entry_summary(list(reader.stream(EXAMPLE_BIB))) == _entry_summary(reader.read(EXAMPLE_BIB).blocks))
+
+    def test_library_middlewares_cant_stream(self):
+        reader = Reader([BraceWrapper(), EntrySorter()])
+        with pytest.raises(TypeError):
+            next(reader.stream(EXAMPLE_BIB))
+
+    def test_write_stream_matches_write(self):
+        stack = PairStack()
+        stack.add(BidiLatex(), BraceWrapper())
+        reader, writer = Reader(stack), Writer(stack)
+        out            = io.StringIO()
+        count          = writer.write_stream(reader.stream(EXAMPLE_BIB), file=out)
+        assert(count == len(reader.read(EXAMPLE_BIB).blocks) - 1)
+        # The read library ends with a MetaBlock, which adds a trailing separator
+        assert(out.getvalue().rstrip() == writer.write(reader.read(EXAMPLE_BIB)).rstrip())
+
+    def test_write_stream_to_file(self, tmp_path):
+        target = tmp_path / "out.bib"
+        reader, writer = Reader([]), Writer([])
+        writer.write_stream(reader.stream(EXAMPLE_BIB), file=target)
+        assert(target.read_text().rstrip() == writer.write(reader.read(EXAMPLE_BIB)).rstrip())
+
+    def test_write_stream_doesnt_modify_blocks(self):
+        entry  = model.Entry("article", "test", [model.Field("title", "blah")])
+        writer = Writer([BidiLatex()])
+        writer.write_stream([entry], file=io.StringIO())
+        assert(entry['title'] == "blah")
+
+    @pytest.mark.skip
+    def test_todo(self):
+        pass
@@ -10,6 +10,8 @@ from __future__ import annotations
 # ##-- stdlib imports
 import logging as logmod
 import pathlib as pl
+import io
+import pickle
 import warnings
 # ##-- end stdlib imports
 
@@ -19,8 +21,11 @@ import pytest
 
 import bibble._interface as API
 from .. import Writer
+from .. import _interface as API_W
+from .. import writer as writer_mod
 from bibtexparser import Library, model
 from bibble.bidi import BraceWrapper
+from bibble.model import MetaBlock
 
 # ##-- types
 # isort: off
@@ -142,6 +147,171 @@ class TestBibbleWriter:
             case x:
                  assert(False), x
 
+    def test_visitor_table(self):
+        writer = Writer([])
+        assert(writer._visitors[model.Entry] == writer.visit_entry)
+        assert(writer._visitors[MetaBlock] == writer._visit_custom)
+        assert(writer._visitors[model.DuplicateBlockKeyBlock] == writer._visit_ignored_failure)
+
+    def test_set_active_rebuilds_visitors(self):
+        writer = Writer([])
+        writer.set_active([model.String])
+        assert(writer._visitors[model.Entry] == writer._visit_skipped)
+        assert(writer._visitors[model.String] == writer.visit_string)
+        entry  = model.Entry("article", "test_art", [model.Field("year", 1992)])
+        assert(writer.visit(entry) == [])
+
+    def test_write_failures_restores_active(self):
+        writer = Writer([])
+        lib    = Library([model.Entry("article", "test_art", [model.Field("year", 1992)])])
+        assert(writer.write_failures(lib).strip() == "")
+        assert("test_art" in writer.write(lib))
+
+    def test_write_to_matches_write(self):
+        def make_lib():
+            return Library([model.Entry("article", f"test_{i}", [model.Field("year", 1992), model.Field("title", f"Title {i}")]) for i in range(5)]
+                           + [model.String("name", "value")])
+        writer = Writer([BraceWrapper()])
+        sink   = io.StringIO()
+        count  = writer.write_to(make_lib(), sink)
+        assert(sink.getvalue() == writer.write(make_lib()))
+        assert(count == len(sink.getvalue()))
+
+    def test_write_to_path(self, tmp_path):
+        lib    = Library([model.Entry("article", "test_art", [model.Field("year", 1992)])])
+        writer = Writer([])
+        target = tmp_path / "out.bib"
+        writer.write_to(lib, target)
+        assert(target.read_text() == writer.write(lib))
+
+    def test_write_to_streams(self, mocker):
+        lib    = Library([model.Entry("article", f"test_{i}", [model.Field("year", 1992)]) for i in range(5)])
+        writer = Writer([])
+        sink   = mocker.Mock(spec=io.TextIOBase)
+        sink.write.side_effect = len
+        make_lib  = mocker.spy(writer, "make_lib")
+        make_body = mocker.spy(writer, "make_body")
+        writer.write_to(lib, sink)
+        make_lib.assert_not_called()
+        make_body.assert_not_called()
+        assert(5 < sink.write.call_count)
+
+    def test_unchanged_write_keeps_file(self, tmp_path):
+        lib    = Library([model.Entry("article", "test_art", [model.Field("year", 1992)])])
+        writer = Writer([])
+        target = tmp_path / "out.bib"
+        writer.write(lib, file=target)
+        before = target.stat()
+        writer.write(lib, file=target)
+        writer.write_to(lib, target)
+        assert(target.stat().st_ino == before.st_ino)
+        assert(target.stat().st_mtime_ns == before.st_mtime_ns)
+
+    def test_failed_write_keeps_file(self, tmp_path, mocker):
+        lib    = Library([model.Entry("article", "test_art", [model.Field("year", 1992)])])
+        writer = Writer([])
+        target = tmp_path / "out.bib"
+        target.write_text("old")
+        mocker.patch.object(writer, "visit", side_effect=ValueError("failed"))
+        with pytest.raises(ValueError):
+            writer.write_to(lib, target)
+
+        assert(target.read_text() == "old")
+        assert([x.name for x in tmp_path.iterdir()] == ["out.bib"])
+
+    def test_write_failures_appends(self, tmp_path):
+        lib    = Library([model.ParsingFailedBlock(error=ValueError("bad"), raw="@bad{")])
+        writer = Writer([])
+        target = tmp_path / "failures.bib"
+        target.write_text("old\n")
+        writer.write_failures(lib, file=target)
+        assert(target.read_text().startswith("old\n"))
+        assert("@bad{" in target.read_text())
+
+    def test_render_cache_matches(self):
+        def make_lib():
+            return Library([model.Entry("article", f"test_{i}", [model.Field("year", 1992), model.Field("title", f"Title {i}")]) for i in range(5)])
+        plain  = Writer([]).write(make_lib())
+        writer = Writer([], render_cache=True)
+        assert(writer.write(make_lib()) == plain)
+        assert(writer.write(make_lib()) == plain)
+        assert(writer._render_cache.stats()['hits'] == 5)
+
+    def test_render_cache_changed_entry(self):
+        lib    = Library([model.Entry("article", f"test_{i}", [model.Field("year", 1992)]) for i in range(3)])
+        writer = Writer([], render_cache=True)
+        writer.write(lib)
+        lib.entries[0].set_field(model.Field("year", 2000))
+        result = writer.write(lib)
+        assert("2000" in result)
+        assert(writer._render_cache.stats()['hits'] == 2)
+
+    def test_render_cache_format_change(self):
+        lib    = Library([model.Entry("article", "test_art", [model.Field("year", 1992)])])
+        writer = Writer([], render_cache=True)
+        writer.write(lib)
+        writer.format.indent = "    "
+        assert("    year" in writer.write(lib))
+        assert(writer._render_cache.stats()['hits'] == 0)
+
+    def test_render_cache_persists(self, tmp_path):
+        lib    = Library([model.Entry("article", "test_art", [model.Field("year", 1992)])])
+        target = tmp_path / "render.cache"
+        Writer([], render_cache=target).write(lib)
+        assert(target.exists())
+        writer = Writer([], render_cache=target)
+        writer.write(lib)
+        assert(writer._render_cache.stats()['hits'] == 1)
+
+    def test_render_workers_ctor_fail(self):
+        with pytest.raises(ValueError):
+            Writer([], render_workers=0)
+
+        with pytest.raises(ValueError):
+            Writer([], render_workers=2, render_cache=True)
+
+    def test_pickle_writer(self):
+        lib    = Library([model.Entry("article", "test_art", [model.Field("year", 1992)])])
+        writer = Writer([BraceWrapper()], render_workers=2)
+        copied = pickle.loads(pickle.dumps(writer))
+        assert(type(copied) is type(writer))
+        assert(copied._middlewares == [])
+        assert(copied._visitors is not writer._visitors)
+        assert(copied.write(lib) == Writer([]).write(lib))
+
+    def test_render_workers_matches(self, mocker):
+        mocker.patch.object(API_W, "RENDER_MIN_BLOCKS", 2)
+        lib      = Library([model.Entry("article", f"test_{i}", [model.Field("year", 1992), model.Field("title", f"Title {i}")]) for i in range(10)])
+        writer   = Writer([], render_workers=2)
+        parallel = mocker.spy(writer, "_render_parallel")
+        assert(writer.write(lib) == Writer([]).write(lib))
+        assert(parallel.call_count == 1)
+
+    def test_render_workers_send_chunks(self, mocker):
+        mocker.patch.object(API_W, "RENDER_MIN_BLOCKS", 2)
+        pool     = mocker.patch("bibble.io.writer.ProcessPoolExecutor")
+        mapped   = pool.return_value.__enter__.return_value.map
+        mapped.side_effect = lambda fn, chunks: map(fn, chunks)
+        lib      = Library([model.Entry("article", f"test_{i}", [model.Field("year", 1992)]) for i in range(10)])
+        writer   = Writer([], render_workers=2)
+        writer_mod._init_render_worker(writer)
+        assert(writer.write(lib) == Writer([]).write(lib))
+        assert(pool.call_args.kwargs['initargs'] == (writer,))
+        chunks = list(mapped.call_args.args[1])
+        assert(1 < len(chunks))
+        assert([x for chunk in chunks for x in chunk] == lib.blocks)
+
+    def test_render_workers_small_library(self, mocker):
+        lib      = Library([model.Entry("article", "test_art", [model.Field("year", 1992)])])
+        writer   = Writer([], render_workers=2)
+        parallel = mocker.spy(writer, "_render_parallel")
+        assert(writer.write(lib) == Writer([]).write(lib))
+        assert(parallel.call_count == 0)
+
+    def test_write_to_bad_target(self):
+        with pytest.raises(TypeError):
+            Writer([]).write_to(Library(), "out.bib")
+
     @pytest.mark.skip
     def test_todo(self):
         pass
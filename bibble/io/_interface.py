@@ -5,6 +5,8 @@
 # Imports:
 from __future__ import annotations
 
+import re
+
 from bibtexparser.writer import BibtexFormat
 
 # ##-- types
@@ -38,6 +40,25 @@ FAIL_COMMENT : Final[str] = "% WARNING Processing failed for the following {n} l
 FAIL_PARTIAL : Final[str] = "% Partially Processed Block:"
 FAIL_END     : Final[str] = "% End of Error Report"
 
+# Matches the start of a block, the same as bibtexparser.splitter.Splitter
+STREAM_MARK_RE       : Final[re.Pattern] = re.compile(r"@[\w]*( |\t)*(?={)")
+STREAM_READ_SIZE     : Final[int]        = 64 * 1024
+STREAM_MARK_LOOKBACK : Final[int]        = 256
+
+CACHE_SUFFIX      : Final[str] = ".bibcache"
+CACHE_FORMAT      : Final[int] = 1
+CACHE_MAX_BYTES   : Final[int] = 512 * 1024 * 1024
+CACHE_IGNORE_KEYS : Final[frozenset[str]] = frozenset({"_logger", "_transform_cache", "_encoder", "_decoder"})
+
+RENDER_CACHE_SIZE   : Final[int] = 2 ** 16
+RENDER_CACHE_FORMAT : Final[int] = 2
+
+RENDER_MIN_BLOCKS        : Final[int] = 512
+RENDER_CHUNKS_PER_WORKER : Final[int] = 4
+
+ATOMIC_TMP_SUFFIX : Final[str] = ".partial"
+ATOMIC_MODES      : Final[tuple[str, ...]] = ("w", "a")
+
 # Body:
 
 def default_format() -> BibtexFormat:
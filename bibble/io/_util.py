@@ -29,6 +29,8 @@ import faulthandler
 
 import bibble._interface as API
 from bibble.model import MetaBlock
+from bibble.util.executors import FusedExecutor, ParallelExecutor, READ_DIR, WRITE_DIR
+from bibble.util.profiling import Profiler
 
 # ##-- types
 # isort: off
@@ -68,58 +70,154 @@ logging = logmod.getLogger(__name__)
 
 class Runner_m:
     """
-    Shared code for running middlewares
+    Shared code for running middlewares.
+
+    Consecutive block level middlewares are fused into a single pass
+    over the library (see FusedExecutor),
+    or run in a worker pool if they allow parallel execution (see ParallelExecutor).
+    Everything else is run on its own.
+
+    If the runner has a truthy '_profile', each middleware is measured,
+    and the results stored in the library's MetaBlock (see Profiler).
     """
 
     def _run_writewares(self, library:Library, *, append:Maybe[list[Middleware]]=None) -> Library:
         """ Run write transforms on the library before writing,
         can handle bidirectional middlewares
         """
-        append     = append or []
+        append  = append or []
+        library = self._run_middlewares(library, direction=WRITE_DIR, append=append)
+        self._record_transform_chain("write_transforms", library, append)
+        return library
+
+    def _run_readwares(self, library:Library, *, append:Maybe[list[Middleware]]=None) -> Library:
+        append  = append or []
+        library = self._run_middlewares(library, direction=READ_DIR, append=append)
+        self._record_transform_chain("read_transforms", library, append)
+        return library
+
+    def _run_middlewares(self, library:Library, *, direction:str, append:list[Middleware]) -> Library:
         fail_count = len(library.failed_blocks)
-        for middleware in itz.chain(self._middlewares, append):
-            fail_count = len(library.failed_blocks)
-            self._logger.debug("- Running Write Middleware: %s", middleware.metadata_key())
-            if hasattr(middleware, "handle_meta_entry"):
-                middleware.handle_meta_entry(library)
-            match middleware:
-                case API.Middleware_p():
-                    library = middleware.transform(library=library)
-                case API.BidirectionalMiddleware_p():
-                    library = middleware.write_transform(library=library)
+        profiler   = self._make_profiler(direction=direction)
+        for group in self._group_middlewares(itz.chain(self._middlewares, append), direction=direction):
+            match group:
+                case FusedExecutor() | ParallelExecutor():
+                    members = group._middlewares
                 case x:
-                    raise TypeError(type(x))
+                    members = [x]
+
+            for middleware in members:
+                self._logger.debug("- Running %s Middleware: %s", direction.title(), middleware.metadata_key())
+                if hasattr(middleware, "handle_meta_entry"):
+                    middleware.handle_meta_entry(library)
+
+            match profiler:
+                case None:
+                    library = self._run_group(group, library, direction=direction)
+                case Profiler():
+                    library = profiler.run(group, library, fn=ftz.partial(self._run_group, direction=direction))
 
             if fail_count < (new_fcount:=len(library.failed_blocks)):
                 self._logger.debug("Added %s failures", new_fcount - fail_count)
                 fail_count = new_fcount
 
         else:
-            self._record_transform_chain("write_transforms", library, append)
+            self._record_profile(profiler, library, direction=direction)
             return library
 
-    def _run_readwares(self, library:Library, *, append:Maybe[list[Middleware]]=None) -> Library:
-        append     = append or []
-        fail_count = len(library.failed_blocks)
-        for middleware in itz.chain(self._middlewares, append):
-            self._logger.debug("- Running Read Middleware: %s", middleware.metadata_key())
-            if hasattr(middleware, "handle_meta_entry"):
-                middleware.handle_meta_entry(library)
-            match middleware:
-                case API.Middleware_p():
-                    library = middleware.transform(library=library)
-                case API.BidirectionalMiddleware_p():
-                    library = middleware.read_transform(library=library)
-                case x:
-                    raise TypeError(type(x))
+    def _run_group(self, group:FusedExecutor|ParallelExecutor|Middleware, library:Library, *, direction:str) -> Library:
+        match group:
+            case FusedExecutor() | ParallelExecutor() as executor:
+                return executor.run(library)
+            case API.Middleware_p() as middleware:
+                return middleware.transform(library=library)
+            case API.BidirectionalMiddleware_p() as middleware if direction == READ_DIR:
+                return middleware.read_transform(library=library)
+            case API.BidirectionalMiddleware_p() as middleware:
+                return middleware.write_transform(library=library)
+            case x:
+                raise TypeError(type(x))
 
-            if fail_count < (new_fcount:=len(library.failed_blocks)):
-                self._logger.debug("Added %s failures", new_fcount - fail_count)
-                fail_count = new_fcount
+    def _make_profiler(self, *, direction:str) -> Maybe[Profiler]:
+        match getattr(self, "_profile", False):
+            case False | None:
+                return None
+            case True | pl.Path():
+                return Profiler(direction=direction)
+            case x:
+                raise TypeError(type(x))
 
+    def _record_profile(self, profiler:Maybe[Profiler], library:Library, *, direction:str) -> None:
+        """ Store the profile in the library's MetaBlock as '{direction}_profile',
+        and dump it as json if profile is a path
+        """
+        match profiler, getattr(self, "_profile", False):
+            case None, _:
+                return
+            case Profiler(), pl.Path() as target if target.is_dir():
+                profiler.dump(target / f"{direction}_profile.json")
+            case Profiler(), pl.Path() as target:
+                profiler.dump(target)
+            case _:
+                pass
+
+        profiler.record(library, meta_key=f"{direction}_profile")
+
+    def _group_middlewares(self, middlewares:Iterable[Middleware], *, direction:str) -> list[FusedExecutor|ParallelExecutor|Middleware]:
+        """ Group runs of consecutive fusable middlewares into executors,
+        preserving the order of the stack.
+
+        Middlewares which allow parallel execution are grouped into ParallelExecutors,
+        split by the kind of pool they want,
+        the rest into FusedExecutors.
+        A middleware with a handle_meta_entry hook always starts a new group,
+        so the hook runs after the transforms of the middlewares before it.
+        """
+        groups : list[FusedExecutor|ParallelExecutor|Middleware] = []
+        run    : list[Middleware]                                = []
+        run_key                                                  = None
+
+        def close_run() -> None:
+            nonlocal run
+            match run_key:
+                case None if bool(run):
+                    groups.append(FusedExecutor(run, direction=direction))
+                case str() if bool(run):
+                    groups.append(ParallelExecutor(run, direction=direction))
+                case _:
+                    pass
+            run = []
+
+        for middleware in middlewares:
+            if not FusedExecutor.can_fuse(middleware, direction=direction):
+                close_run()
+                groups.append(middleware)
+                continue
+
+            if ParallelExecutor.can_parallelize(middleware, direction=direction):
+                key = ParallelExecutor.pool_kind(middleware)
+            else:
+                key = None
+
+            if key != run_key or FusedExecutor.has_meta_hook(middleware):
+                close_run()
+                run_key = key
+
+            run.append(middleware)
         else:
-            self._record_transform_chain("read_transforms", library, append)
-            return library
+            close_run()
+            return groups
+
+    def _stream_executor(self, *, direction:str, append:Maybe[list[Middleware]]=None) -> FusedExecutor:
+        """ Fuse the whole stack, for running on a stream of blocks.
+        Raises a TypeError if the stack has library level middlewares, which need the whole library.
+        """
+        middlewares = list(itz.chain(self._middlewares, append or []))
+        match [x for x in middlewares if not FusedExecutor.can_fuse(x, direction=direction)]:
+            case []:
+                return FusedExecutor(middlewares, direction=direction)
+            case [*xs]:
+                raise TypeError("Library level middlewares can't be streamed", [x.metadata_key() for x in xs])
 
     def _record_transform_chain(self, meta_key:str, library:Library, append:list[Middleware]) -> None:
         """
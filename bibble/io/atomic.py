@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Atomic, durable, text file output for writers.
+A file is either fully written, or left as it was.
+
+"""
+
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import hashlib
+import itertools as itz
+import logging as logmod
+import os
+import pathlib as pl
+import re
+import shutil
+import tempfile
+import time
+import types
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+from . import _interface as API_IO
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+    from typing import IO
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+
+# Body:
+
+class AtomicWrite:
+    """ A context manager for writing a text file atomically.
+
+    with AtomicWrite(path) as f:
+        f.write(text)
+
+    Text is written to a temp file in the same directory, which is fsync'd,
+    then renamed over the target, and the directory is fsync'd.
+    If the block raises, the temp file is removed, and the target is untouched.
+    If the new contents are the same as the target's, the target isn't replaced,
+    so its mtime doesn't change. 'changed' records which happened.
+
+    In mode 'a', the target's current contents are copied to the temp file first.
+    """
+    _target  : pl.Path
+    _mode    : str
+    _tmp     : Maybe[pl.Path]
+    _handle  : Maybe[IO[str]]
+    changed  : Maybe[bool]
+
+    def __init__(self, target:pl.Path, *, mode:str="w") -> None:
+        if mode not in API_IO.ATOMIC_MODES:
+            raise ValueError("Unsupported atomic write mode", mode)
+
+        self._target = pl.Path(target)
+        self._mode   = mode
+        self._tmp    = None
+        self._handle = None
+        self.changed = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} : {self._target} : changed {self.changed}>"
+
+    def __enter__(self) -> IO[str]:
+        fd, tmp      = tempfile.mkstemp(dir=self._target.parent,
+                                        prefix=f".{self._target.name}.",
+                                        suffix=API_IO.ATOMIC_TMP_SUFFIX)
+        self._tmp    = pl.Path(tmp)
+        self._handle = open(fd, "w", encoding="utf-8") # noqa: SIM115
+        if self._mode == "a" and self._target.exists():
+            with self._target.open("r", encoding="utf-8") as f:
+                shutil.copyfileobj(f, self._handle)
+
+        return self._handle
+
+    def __exit__(self, etype:Maybe[type], *exc:Any) -> Literal[False]:
+        assert(self._handle is not None and self._tmp is not None)
+        try:
+            if etype is None:
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+            self._handle.close()
+            if etype is None:
+                self._commit()
+        finally:
+            self._tmp.unlink(missing_ok=True)
+            self._handle = None
+            self._tmp    = None
+
+        return False
+
+    def _commit(self) -> None:
+        """ Replace the target with the temp file, unless they are the same """
+        if self._same_contents():
+            logging.info("Unchanged, not replacing: %s", self._target)
+            self.changed = False
+            return
+
+        self._copy_mode()
+        self._tmp.replace(self._target)
+        self.changed = True
+        self._fsync_dir()
+
+    def _same_contents(self) -> bool:
+        try:
+            if self._target.stat().st_size != self._tmp.stat().st_size:
+                return False
+        except FileNotFoundError:
+            return False
+
+        return self._digest(self._target) == self._digest(self._tmp)
+
+    def _copy_mode(self) -> None:
+        """ mkstemp makes files only readable by the user,
+        so give the temp file the target's permissions, or the defaults for a new file
+        """
+        try:
+            shutil.copymode(self._target, self._tmp)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(self._tmp, 0o666 & ~umask)
+
+    def _fsync_dir(self) -> None:
+        """ Make the rename durable. Not possible on every platform """
+        try:
+            fd = os.open(self._target.parent, os.O_RDONLY)
+        except OSError:
+            return
+
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _digest(self, path:pl.Path) -> str:
+        with path.open("rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
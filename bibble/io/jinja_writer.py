@@ -26,11 +26,13 @@ import faulthandler
 
 import jinja2
 from .writer import BibbleWriter
+from .render_cache import RenderCache
 from bibble import _interface as API
 from . import _interface as API_W
 from bibble.util.mixins import MiddlewareValidator_m
 from bibble.model import MetaBlock
 from bibble.util import PairStack
+from bibtexparser import model
 from bibtexparser.writer import BibtexFormat
 
 from ._util import Runner_m
@@ -80,40 +82,129 @@ DEFAULT_TEMPLATES  : Final[dict]  = {
     "lib"          : "lib.bib.jinja",
     "header"       : "header.bib.jinja",
     "entry"        : "entry.bib.jinja",
+    "body"         : "body.bib.jinja",
     "footer"       : "footer.bib.jinja",
 }
 DEFAULT_LOADER     : Final[jinja2.BaseLoader]  = jinja2.PackageLoader("bibble", "_templates")
 
 # Body:
 
+class BlockView_d:
+    """ A lightweight view of a block, for the body template of batched rendering.
+
+    Entries have their entry_type, key, a dict of their fields,
+    and the length of their longest field key (max_key). Their text is None.
+    Other blocks are rendered by the writer's visitors, and only have text.
+    """
+    __slots__ = ("entry_type", "key", "entry", "max_key", "text")
+
+    entry_type : Maybe[str]
+    key        : Maybe[str]
+    entry      : dict[str, model.Field]
+    max_key    : int
+    text       : Maybe[str]
+
+    def __init__(self, *, entry_type:Maybe[str]=None, key:Maybe[str]=None, entry:Maybe[dict]=None, text:Maybe[str]=None) -> None:
+        self.entry_type = entry_type
+        self.key        = key
+        self.entry      = entry or {}
+        self.max_key    = max(map(len, self.entry), default=0)
+        self.text       = text
+
+    @staticmethod
+    def from_entry(block:model.Entry) -> BlockView_d:
+        return BlockView_d(entry_type=block.entry_type, key=block.key, entry={x.key:x for x in block.fields})
+
+##--|
+
 class JinjaWriter(BibbleWriter):
     """
     Use jinja templates to write out bibtex
+
+    The environment and templates can't be pickled,
+    so pickled writers (eg: for render_workers) rebuild them
+    from the template directories and names.
+
+    With batch=True, the body is rendered by a single call of the 'body' template,
+    over a BlockView_d for each block, instead of calling the 'entry' template for each entry.
+    So a custom entry template needs a matching body template.
+
+    With bytecode_cache=True (or a directory), compiled templates are stored
+    in a jinja FileSystemBytecodeCache, so they are only compiled once per machine,
+    instead of once per process.
     """
-    _env        : jinja2.Environment
-    _templates  : dict[str, Maybe[jinja2.Template]]
+    _env            : jinja2.Environment
+    _templates      : dict[str, Maybe[jinja2.Template]]
+    _template_dirs  : list[pl.Path]
+    _template_names : dict[str, Maybe[str]]
+    _batch          : bool
+    _bytecode_cache : bool|pl.Path
 
-    def __init__(self, stack:PairStack, *, format:Maybe[BibtexFormat]=None, logger:Maybe[Logger]=None, templates:Maybe[pl.Path]=None) -> None:
+    def __init__(self, stack:PairStack, *, format:Maybe[BibtexFormat]=None, logger:Maybe[Logger]=None, templates:Maybe[pl.Path]=None, render_cache:bool|pl.Path|RenderCache=False, render_workers:int=1, batch:bool=False, bytecode_cache:bool|pl.Path=False) -> None:
         x : Any
-        super().__init__(stack, format=format, logger=logger)
+        super().__init__(stack, format=format, logger=logger, render_cache=render_cache, render_workers=render_workers)
         self._join_char = NEWLINE
+        match batch:
+            case True if self._render_cache is not None or 1 < self._render_workers:
+                raise ValueError("Batched rendering can't be used with a render cache or render_workers")
+            case bool() as x:
+                self._batch = x
+            case x:
+                raise TypeError(type(x))
+
+        match bytecode_cache:
+            case bool() as x:
+                self._bytecode_cache = x
+            case str() | pl.Path() as x:
+                self._bytecode_cache = pl.Path(x)
+            case x:
+                raise TypeError(type(x))
+
         match templates:
             case str()|pl.Path() as x:
-                loaders = [jinja2.FileSystemLoader(pl.Path(x)), DEFAULT_LOADER]
+                self._template_dirs = [pl.Path(x)]
             case [*xs]:
-                loaders = [jinja2.FileSystemLoader(pl.Path(x)) for x in xs]
-                loaders.append(DEFAULT_LOADER)
+                self._template_dirs = [pl.Path(x) for x in xs]
             case None:
-                loaders = [DEFAULT_LOADER]
+                self._template_dirs = []
+        self._template_names = {}
+        self._build_env()
+        self.update_templates(DEFAULT_TEMPLATES)
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        del state['_env']
+        del state['_templates']
+        return state
+
+    def __setstate__(self, state:dict) -> None:
+        super().__setstate__(state)
+        self._build_env()
+        self.update_templates(self._template_names)
+
+    def _build_env(self) -> None:
+        """ Build the jinja environment, loading from the template dirs, then the default templates """
+        loaders = [jinja2.FileSystemLoader(x) for x in self._template_dirs]
+        loaders.append(DEFAULT_LOADER)
+        match self._bytecode_cache:
+            case False:
+                bytecode_cache = None
+            case True:
+                # Jinja's default, a per user directory in the system temp dir
+                bytecode_cache = jinja2.FileSystemBytecodeCache()
+            case pl.Path() as x:
+                x.mkdir(parents=True, exist_ok=True)
+                bytecode_cache = jinja2.FileSystemBytecodeCache(str(x))
+
         self._env = jinja2.Environment(
             loader=jinja2.ChoiceLoader(loaders),
             autoescape=jinja2.select_autoescape(),
             trim_blocks=True,
             lstrip_blocks=True,
+            bytecode_cache=bytecode_cache,
             )
         self._env.filters['wrap'] = self._wrap_braces
         self._templates = {}
-        self.update_templates(DEFAULT_TEMPLATES)
 
     def update_templates(self, templates:dict[str, Maybe[str]]) -> None:
         for key, name in templates.items():
@@ -122,6 +213,20 @@ class JinjaWriter(BibbleWriter):
                     self._templates[key] = None
                 case str() as x:
                     self._templates[key] = self._env.get_template(name)
+            self._template_names[key] = name
+        else:
+            self._render_key = None
+
+    def _render_settings(self) -> str:
+        """ Entries are rendered by the entry template, so its source is part of the settings """
+        match self._templates.get('entry', None):
+            case None:
+                source = ""
+            case jinja2.Template() as template:
+                source, *_ = self._env.loader.get_source(self._env, template.name)
+
+        digest = hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+        return f"{super()._render_settings()}|{digest}"
 
     def make_header(self, library:Library, title:Maybe[str]=None) -> list[str]:
         if self._templates['header'] is None:
@@ -143,6 +248,37 @@ class JinjaWriter(BibbleWriter):
             footer=self._join_char.join(footer),
             ).strip()
 
+    def iter_lib(self, *, header:Iterable[str], body:Iterable[str], footer:Iterable[str]) -> Iterator[str]:
+        """ The lib template (and stripping the result) needs the whole body,
+        so it isn't streamed
+        """
+        yield self.make_lib(header=list(header), body=list(body), footer=list(footer))
+
+    def iter_body(self, library) -> Iterator[str]:
+        """ When batched, the whole body is rendered by the body template, as a single piece """
+        if not self._batch:
+            yield from super().iter_body(library)
+            return
+
+        # The join and separator match the joined pieces of the unbatched body
+        yield self._templates['body'].render(blocks=self._block_views(library.blocks),
+                                             join=self._join_char,
+                                             separator=self.format.block_separator)
+
+    def _block_views(self, blocks:Iterable[Block]) -> Iterator[BlockView_d]:
+        """ Views of the blocks for the body template.
+        Blocks which are visited as entries are viewed as entries,
+        other blocks are visited and viewed as their text,
+        which is empty for blocks which render nothing (eg: MetaBlocks).
+        """
+        visit_entry = self.visit_entry
+        for block in blocks:
+            match self._visitors[type(block)]:
+                case visitor if visitor == visit_entry:
+                    yield BlockView_d.from_entry(block)
+                case visitor:
+                    yield BlockView_d(text=self._join_char.join(visitor(block)))
+
     def visit_entry(self, block:Block) -> list[str]:
         return [self._templates['entry'].render(entry_type=block.entry_type,
                                                 key=block.key,
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+An on disk cache of read and transformed libraries,
+so unchanged bibtex files don't need to be parsed and transformed again.
+
+"""
+
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import hashlib
+import itertools as itz
+import logging as logmod
+import os
+import pathlib as pl
+import pickle
+import re
+import time
+import types
+import weakref
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import bibtexparser
+from bibtexparser import model
+
+# ##-- end 3rd party imports
+
+# ##-- 1st party imports
+import bibble
+from . import _interface as API_IO
+
+# ##-- end 1st party imports
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+    import bibble._interface as API
+    type Middleware = API.Middleware
+    type Block      = model.Block
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Body:
+
+def stack_fingerprint(middlewares:Iterable[Middleware]) -> str:
+    """ A stable hash of a middleware stack.
+    Built from each middleware's metadata key, and its configuration
+    (its cache_config, or for other middlewares, its attributes minus loggers and caches),
+    plus the bibble and bibtexparser versions and the cache format.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(f"{API_IO.CACHE_FORMAT}:{bibble.__version__}:{bibtexparser.__version__}".encode())
+    for mw in middlewares:
+        match mw:
+            case x if hasattr(x, "cache_config"):
+                state = x.cache_config()
+            case x:
+                state = vars(x)
+
+        match state:
+            case dict():
+                state = {k:v for k,v in state.items() if k not in API_IO.CACHE_IGNORE_KEYS}
+            case _:
+                pass
+
+        hasher.update(mw.metadata_key().encode())
+        hasher.update(_stable_repr(state, set()).encode())
+    else:
+        return hasher.hexdigest()
+
+def _stable_repr(val:Any, seen:set[int]) -> str:
+    """ A repr that is the same between runs,
+    ie: without object addresses, and with sets sorted
+    """
+    match val:
+        case None | bool() | int() | float() | str() | bytes() | pl.PurePath():
+            return repr(val)
+        case re.Pattern():
+            return f"re({val.pattern!r}, {val.flags})"
+        case enum.Enum():
+            return str(val)
+        case type() | types.FunctionType() | types.BuiltinFunctionType():
+            return f"{val.__module__}.{val.__qualname__}"
+        case logmod.Logger():
+            return ""
+        case _ if id(val) in seen:
+            return "..."
+        case _:
+            pass
+
+    seen.add(id(val))
+    match val:
+        case dict():
+            inner = sorted(f"{_stable_repr(k, seen)}:{_stable_repr(v, seen)}" for k,v in val.items())
+            return "{" + ", ".join(inner) + "}"
+        case set() | frozenset():
+            return "{" + ", ".join(sorted(_stable_repr(x, seen) for x in val)) + "}"
+        case list() | tuple():
+            return "[" + ", ".join(_stable_repr(x, seen) for x in val) + "]"
+        case types.MethodType():
+            return f"{type(val.__self__).__qualname__}.{val.__func__.__qualname__}"
+        case ftz.partial():
+            return f"partial({_stable_repr(val.func, seen)}, {_stable_repr(val.args, seen)}, {_stable_repr(val.keywords, seen)})"
+        case x if hasattr(x, "__dict__"):
+            return f"{type(x).__qualname__}({_stable_repr(vars(x), seen)})"
+        case x if hasattr(type(x), "__slots__"):
+            slots = {k:getattr(x, k, None) for k in type(x).__slots__}
+            return f"{type(x).__qualname__}({_stable_repr(slots, seen)})"
+        case x:
+            return type(x).__qualname__
+
+##--|
+
+class ReadCache:
+    """ An on disk cache of the transformed blocks of read bibtex files.
+
+    Entries are keyed by the file's resolved path and the read stack's fingerprint.
+    An entry is a hit if the file's size and mtime are unchanged,
+    or if its content hash is unchanged.
+
+    Each entry is a pickled header (path, size, mtime, hash, stack fingerprint),
+    followed by the pickled blocks, so stale entries can be rejected
+    without loading the blocks.
+
+    Storing a file's entry for a new stack removes entries for old stacks.
+    Entries are evicted by least recent use (tracked with file mtimes)
+    when the cache grows beyond max_bytes.
+    """
+    _root      : pl.Path
+    _max_bytes : int
+
+    def __init__(self, root:pl.Path, *, max_bytes:int=API_IO.CACHE_MAX_BYTES) -> None:
+        self._root      = pl.Path(root).expanduser().resolve()
+        self._max_bytes = max_bytes
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def get(self, source:pl.Path, stack:str) -> Maybe[list[Block]]:
+        """ Get the cached blocks for a file, if the file and stack are unchanged """
+        target = self._entry_path(source, stack)
+        if not target.exists():
+            return None
+
+        try:
+            stat = source.stat()
+            with target.open("rb") as f:
+                header = pickle.load(f)
+                match header:
+                    case {"format": API_IO.CACHE_FORMAT, "stack": str() as hstack} if hstack == stack:
+                        pass
+                    case _:
+                        return None
+
+                unchanged = header['size'] == stat.st_size and header['mtime'] == stat.st_mtime_ns
+                if not unchanged and header['hash'] != self._hash(source):
+                    return None
+
+                blocks = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as err:
+            logging.info("Bad Read Cache entry for %s: %s", source, err)
+            target.unlink(missing_ok=True)
+            return None
+
+        # Mark as recently used
+        os.utime(target)
+        return blocks
+
+    def set(self, source:pl.Path, stack:str, blocks:list[Block]) -> bool:
+        """ Store the transformed blocks of a file.
+        Returns False if the blocks can't be pickled.
+        """
+        stat   = source.stat()
+        header = {
+            "format" : API_IO.CACHE_FORMAT,
+            "path"   : str(source.resolve()),
+            "size"   : stat.st_size,
+            "mtime"  : stat.st_mtime_ns,
+            "hash"   : self._hash(source),
+            "stack"  : stack,
+        }
+        try:
+            data = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)
+            data += pickle.dumps(blocks, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as err:
+            logging.info("Can't cache read of %s: %s", source, err)
+            return False
+
+        target  = self._entry_path(source, stack)
+        partial = target.with_suffix(".partial")
+        # Remove entries for other stacks
+        for old in self._root.glob(f"{self._path_key(source)}-*{API_IO.CACHE_SUFFIX}"):
+            old.unlink(missing_ok=True)
+
+        partial.write_bytes(data)
+        partial.replace(target)
+        self.prune()
+        return True
+
+    def prune(self, max_bytes:Maybe[int]=None) -> int:
+        """ Evict the least recently used entries until the cache is under max_bytes.
+        Returns the number of entries evicted.
+        """
+        limit   = self._max_bytes if max_bytes is None else max_bytes
+        stats   = []
+        for path in self._entries():
+            try:
+                stats.append((path.stat(), path))
+            except FileNotFoundError:
+                # Removed by another reader sharing the cache
+                continue
+
+        entries = sorted(stats, key=lambda x: x[0].st_mtime_ns)
+        total   = sum(x[0].st_size for x in entries)
+        evicted = 0
+        for stat, path in entries:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total   -= stat.st_size
+            evicted += 1
+        else:
+            pass
+
+        return evicted
+
+    def clear(self) -> None:
+        """ Remove all entries """
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def _entries(self) -> list[pl.Path]:
+        return list(self._root.glob(f"*{API_IO.CACHE_SUFFIX}"))
+
+    def _path_key(self, source:pl.Path) -> str:
+        return hashlib.sha256(str(source.resolve()).encode()).hexdigest()[:32]
+
+    def _entry_path(self, source:pl.Path, stack:str) -> pl.Path:
+        return self._root / f"{self._path_key(source)}-{stack[:32]}{API_IO.CACHE_SUFFIX}"
+
+    def _hash(self, source:pl.Path) -> str:
+        with source.open("rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
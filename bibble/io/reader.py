@@ -17,6 +17,8 @@ import re
 import time
 import types
 import weakref
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from uuid import UUID, uuid1
 
 # ##-- end stdlib imports
@@ -24,6 +26,7 @@ from uuid import UUID, uuid1
 # ##-- 3rd party imports
 from jgdv import Mixin, Proto
 from jgdv.debugging.timing import TimeCtx
+from bibtexparser import model
 from bibtexparser.library import Library
 from bibtexparser.splitter import Splitter
 
@@ -31,9 +34,14 @@ from bibtexparser.splitter import Splitter
 
 from bibble import _interface as API
 from bibble.model import MetaBlock
+from bibble.people._interface import AuthorIndexBlock
+from bibble.library import BibbleLib
 from bibble.util.mixins import MiddlewareValidator_m
 from bibble.util import PairStack
+from bibble.util.executors import PROCESS_POOL, THREAD_POOL, READ_DIR
 from ._util import Runner_m
+from .read_cache import ReadCache, stack_fingerprint
+from .stream import stream_blocks
 
 # ##-- types
 # isort: off
@@ -56,6 +64,7 @@ if TYPE_CHECKING:
     from collections.abc import Sequence, Mapping, MutableMapping, Hashable
 
     type Logger = logmod.Logger
+    type Block  = model.Block
     type Middleware = API.Middleware_p | API.BidirectionalMiddleware_p
 ##--|
 
@@ -66,6 +75,18 @@ if TYPE_CHECKING:
 logging = logmod.getLogger(__name__)
 ##-- end logging
 
+_worker_state : dict = {}
+
+def _init_read_worker(middlewares:list[Middleware], lib_base:type, cache:Maybe[ReadCache], append:Maybe[list[Middleware]]) -> None:
+    """ Process pool initializer for BibbleReader.read_dir """
+    _worker_state['reader'] = BibbleReader(middlewares, lib_base=lib_base, cache=cache)
+    _worker_state['append'] = append
+
+def _read_in_worker(source:pl.Path) -> Maybe[Library]:
+    return _worker_state['reader'].read(source, append=_worker_state['append'])
+
+##--|
+
 @Proto(API.Reader_p)
 @Mixin(Runner_m, MiddlewareValidator_m)
 class BibbleReader:
@@ -74,8 +95,10 @@ class BibbleReader:
     """
     _middlewares : list[Middleware]
     _lib_class   : type[Library]
+    _cache       : Maybe[ReadCache]
+    _profile     : bool|pl.Path
 
-    def __init__(self, stack:PairStack|list[Middleware], *, lib_base:Maybe[type]=None, logger:Maybe[Logger]=None):
+    def __init__(self, stack:PairStack|list[Middleware], *, lib_base:Maybe[type]=None, logger:Maybe[Logger]=None, cache:Maybe[ReadCache]=None, profile:bool|pl.Path=False):
         match stack:
             case PairStack():
                 self._middlewares = stack.read_stack()
@@ -84,19 +107,53 @@ class BibbleReader:
             case x:
                 raise TypeError(type(x))
 
-        self._lib_class : type = lib_base or Library
+        self._lib_class : type = lib_base or BibbleLib
         self._logger           = logger or logging
+        self._cache            = cache
+        self._profile          = profile
 
         self.exclude_middlewares(API.WriteTime_p)
         if not issubclass(self._lib_class, Library):
             raise TypeError("Bad library base pased to reader", lib_base)
 
-    def read_dir(self, source:pl.Path, *, ext:str, into:Maybe[Library]=None, append:Maybe[list[Middleware]]=None) -> Maybe[Library]:
-        visited : set = set()
+    def read_dir(self, source:pl.Path, *, ext:str, into:Maybe[Library]=None, append:Maybe[list[Middleware]]=None, workers:Maybe[int]=None, pool:str=PROCESS_POOL) -> Maybe[Library]:
+        """ Read all files with the extension 'ext' under 'source'.
+
+        Each file is read, and has the read stack run on it, in a worker pool
+        ('process' by default, or 'thread'), then the libraries are merged
+        into 'into' (or a new library) in sorted path order,
+        along with the source -> keys maps of their MetaBlocks.
+
+        Workers are given a copy of this reader's stack, library base and cache.
+        Returns None if any file can't be read.
+        """
+        to_read = self._find_files(source, ext=ext)
+        workers = min(len(to_read), workers or os.cpu_count() or 1)
+        match workers:
+            case 0 | 1:
+                results = (self.read(x, append=append) for x in to_read)
+                return self._merge_dir(to_read, results, into=into)
+            case _ if pool == THREAD_POOL:
+                executor = ThreadPoolExecutor(max_workers=workers)
+                fn       = ftz.partial(self.read, append=append)
+            case _ if pool == PROCESS_POOL:
+                executor = ProcessPoolExecutor(max_workers=workers,
+                                               initializer=_init_read_worker,
+                                               initargs=(self._middlewares, self._lib_class, self._cache, append))
+                fn       = _read_in_worker
+            case _:
+                raise ValueError("Unknown pool kind", pool)
+
+        with executor:
+            return self._merge_dir(to_read, executor.map(fn, to_read), into=into)
+
+    def _find_files(self, source:pl.Path, *, ext:str) -> list[pl.Path]:
+        """ Find all files with the extension 'ext' under 'source', sorted """
+        visited : set  = set()
         to_read : list = []
-        for args in pl.Path().walk(top_down=True, on_error=None, follow_symlinks=False):
+        for args in pl.Path(source).walk(top_down=True, on_error=None, follow_symlinks=False):
             dpath     : pl.Path   = args[0]
-            dnames    : list[str] = args[0] # Edit to control descent
+            dnames    : list[str] = args[1] # Edit to control descent
             filenames : list[str] = args[2]
             if dpath in visited:
                 dnames.clear()
@@ -105,18 +162,57 @@ class BibbleReader:
 
             to_read += [y for x in filenames if (y:=dpath/x).suffix == ext]
         else:
-            pass
-        ##--|
-        lib = into or self._lib_class()
-        for x in to_read:
-            match self.read(x, into=lib, append=append):
+            return sorted(to_read)
+
+    def _merge_dir(self, sources:list[pl.Path], results:Iterable[Maybe[Library]], *, into:Maybe[Library]=None) -> Maybe[Library]:
+        """ Merge the libraries of read files, in order.
+        The source -> keys maps of plain MetaBlocks are merged into a single MetaBlock,
+        and the files' AuthorIndexBlocks into a single index.
+        """
+        lib    = into if into is not None else self._lib_class()
+        merged = MetaBlock.find_in(lib)
+        index  = AuthorIndexBlock.find_in(lib)
+        for source, result in zip(sources, results, strict=True):
+            match result:
                 case None:
+                    self._logger.warning("Failed to read: %s", source)
                     return None
-                case Library() as y:
-                    lib = y
+                case Library():
+                    pass
+                case x:
+                    raise TypeError(type(x))
+
+            for block in result.blocks:
+                match block:
+                    case MetaBlock() if type(block) is MetaBlock and merged is None:
+                        merged = block
+                        lib.add(block)
+                    case MetaBlock() if type(block) is MetaBlock:
+                        self._merge_meta(merged, block)
+                    case AuthorIndexBlock() if index is None:
+                        index = block
+                        lib.add(block)
+                    case AuthorIndexBlock():
+                        index.merge(block)
+                    case _:
+                        lib.add(block)
         else:
             return lib
 
+    def _merge_meta(self, target:MetaBlock, other:MetaBlock) -> None:
+        """ Merge the data of a file's MetaBlock into another """
+        for key, val in other.data.items():
+            match target.data.get(key, None), val:
+                case None, _:
+                    target.data[key] = val
+                case set() as existing, set():
+                    existing.update(val)
+                case list() as existing, list() if key.endswith("transforms"):
+                    # The same stack was run on each file
+                    pass
+                case _:
+                    target.data[key] = val
+
     def read(self, source:str|pl.Path, *, into:Maybe[Library]=None, append:Maybe[list[Middleware]]=None) -> Maybe[Library]:
         """ read source and make a new library.
         if given 'into' lib, add the newly read entries into that libray as well
@@ -125,6 +221,12 @@ class BibbleReader:
         basic       : Library
         transformed : Library
 
+        match self._read_cached(source, append=append):
+            case Library() as transformed:
+                return self._merge_into(transformed, source, into)
+            case None:
+                pass
+
         match source:
             case str():
                 source_text = source
@@ -149,6 +251,39 @@ class BibbleReader:
 
         timer.msg("<-- Read Transforms took: %s", timer.total_s)
 
+        self._store_cached(source, transformed, append=append)
+        return self._merge_into(transformed, source, into)
+
+    def stream(self, source:str|pl.Path, *, append:Maybe[list[Middleware]]=None) -> Iterator[Block]:
+        """ Read a source block by block, running the read stack on each block as it is parsed.
+        Memory use is bounded by the largest block, rather than the size of the source.
+
+        The stack can only contain block level middlewares.
+        Middlewares are given a context library, which holds the strings, preambles and meta blocks
+        seen so far, but not entries. So duplicate keys are logged, but not converted to failed blocks.
+        """
+        executor       = self._stream_executor(direction=READ_DIR, append=append)
+        context        = self._lib_class()
+        seen    : set  = set()
+        for middleware in executor._middlewares:
+            if hasattr(middleware, "handle_meta_entry"):
+                middleware.handle_meta_entry(context)
+
+        for block in stream_blocks(source):
+            for result in executor.run_block(block, context):
+                match result:
+                    case model.Entry() if result.key in seen:
+                        self._logger.warning("Duplicate key in stream: %s", result.key)
+                    case model.Entry():
+                        seen.add(result.key)
+                    case model.String() | model.Preamble() | MetaBlock():
+                        context.add(result)
+                    case _:
+                        pass
+
+                yield result
+
+    def _merge_into(self, transformed:Library, source:str|pl.Path, into:Maybe[Library]) -> Library:
         entry_keys : set = {x.key for x in transformed.entries}
         match into:
             case Library():
@@ -161,6 +296,33 @@ class BibbleReader:
 
         return self._map_keys(final_lib, source, entry_keys)
 
+    def _read_cached(self, source:str|pl.Path, *, append:Maybe[list[Middleware]]=None) -> Maybe[Library]:
+        """ Get the transformed library of a file from the cache, if it is unchanged """
+        match self._cache, source:
+            case ReadCache() as cache, pl.Path():
+                pass
+            case _:
+                return None
+
+        stack = stack_fingerprint(itz.chain(self._middlewares, append or []))
+        match cache.get(source, stack):
+            case None:
+                self._logger.debug("Read Cache Miss: %s", source)
+                return None
+            case [*blocks]:
+                self._logger.debug("Read Cache Hit: %s", source)
+                lib = self._lib_class()
+                lib.add(blocks)
+                return lib
+
+    def _store_cached(self, source:str|pl.Path, transformed:Library, *, append:Maybe[list[Middleware]]=None) -> None:
+        match self._cache, source:
+            case ReadCache() as cache, pl.Path():
+                stack = stack_fingerprint(itz.chain(self._middlewares, append or []))
+                cache.set(source, stack, transformed.blocks)
+            case _:
+                pass
+
     def _map_keys(self, final_lib:Library, source:str|pl.Path, entry_keys:set[str]) -> Library:
         """ Map source -> keys
 
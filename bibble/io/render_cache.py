@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+A cache of the rendered text of entries, for writers,
+so entries that haven't changed since the last write aren't rendered again.
+
+"""
+
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import hashlib
+import itertools as itz
+import logging as logmod
+import os
+import pathlib as pl
+import pickle
+import re
+import time
+import types
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+from bibble.util.cache import BoundedCache
+from . import _interface as API_IO
+from .read_cache import _stable_repr
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+    from bibtexparser import model
+
+    type Entry = model.Entry
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Body:
+
+def entry_fingerprint(entry:Entry, settings:str) -> bytes:
+    """ A hash of the writer's settings, and the entry's type, key, and ordered fields """
+    text = "\0".join([settings, entry.entry_type, entry.key, *(f"{x.key}\0{_canonical(x.value)}" for x in entry.fields)])
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+def _canonical(val:Any) -> str:
+    """ A string of a field value which is the same between processes,
+    and includes its type, so eg: 1992 and '1992' differ.
+    Sets are sorted, as their order depends on the hash seed.
+    """
+    match val:
+        case str():
+            # The common case
+            return f"str({val!r})"
+        case None | bool() | int() | float() | bytes():
+            inner = repr(val)
+        case set() | frozenset():
+            inner = ", ".join(sorted(_canonical(x) for x in val))
+        case list() | tuple():
+            inner = ", ".join(_canonical(x) for x in val)
+        case dict():
+            inner = ", ".join(sorted(f"{_canonical(k)}: {_canonical(v)}" for k,v in val.items()))
+        case x if hasattr(x, "__dict__") or hasattr(type(x), "__slots__"):
+            inner = _stable_repr(x, set())
+        case x:
+            inner = repr(x)
+
+    return f"{type(val).__qualname__}({inner})"
+
+class RenderCache:
+    """ A bounded cache of the rendered pieces of entries, by entry_fingerprint.
+
+    With a path, the cache is loaded from it on creation,
+    and save() writes it back if anything new was rendered.
+    A cache that can't be loaded (missing, corrupt, or an old format) starts empty.
+    """
+    _path   : Maybe[pl.Path]
+    _cache  : BoundedCache
+    _dirty  : bool
+
+    def __init__(self, path:Maybe[str|pl.Path]=None, *, maxsize:int=API_IO.RENDER_CACHE_SIZE) -> None:
+        self._path  = None if path is None else pl.Path(path)
+        self._cache = BoundedCache(maxsize)
+        self._dirty = False
+        self.load()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} : {self._path} : {self._cache!r}>"
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __getstate__(self) -> dict:
+        """ Copies only keep the path and size, and reload from the path """
+        return {"path": self._path, "maxsize": self._cache.maxsize}
+
+    def __setstate__(self, state:dict) -> None:
+        self.__init__(state['path'], maxsize=state['maxsize'])
+
+    def get_or_render(self, entry:Entry, settings:str, render:Callable[[Entry], list[str]]) -> list[str]:
+        """ Get the cached pieces of an entry, or render and store them """
+        key    = entry_fingerprint(entry, settings)
+        misses = self._cache.misses
+        pieces = self._cache.get_or_make(key, lambda _: tuple(render(entry)))
+        self._dirty |= misses != self._cache.misses
+        return list(pieces)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    def load(self) -> None:
+        """ Add the pieces saved at the cache's path """
+        match self._path:
+            case pl.Path() as path if path.exists():
+                pass
+            case _:
+                return
+
+        try:
+            with path.open("rb") as f:
+                match pickle.load(f):
+                    case {"format": API_IO.RENDER_CACHE_FORMAT, "items": list() as items}:
+                        self._cache.update(items)
+                    case _:
+                        logging.info("Ignoring render cache of an old format: %s", path)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as err:
+            logging.info("Ignoring unreadable render cache: %s : %s", path, err)
+
+    def save(self) -> bool:
+        """ Write the cache to its path, if it has one and anything new was rendered """
+        match self._path:
+            case pl.Path() as path if self._dirty:
+                pass
+            case _:
+                return False
+
+        data    = pickle.dumps({"format": API_IO.RENDER_CACHE_FORMAT, "items": self._cache.items()},
+                               protocol=pickle.HIGHEST_PROTOCOL)
+        partial = path.with_suffix(".partial")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial.write_bytes(data)
+        partial.replace(path)
+        self._dirty = False
+        return True
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._dirty = True
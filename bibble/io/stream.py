@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Incremental scanning of bibtex sources, for streaming reads.
+
+The source is read in fixed size pieces, and split into the text of single blocks,
+so memory is bounded by the largest block instead of the size of the file.
+Each block's text is then parsed with bibtexparser's Splitter.
+
+Splitter treats every '@type{' mark as the start of a block,
+whatever the brace depth, so splitting the source at the same marks
+gives the same blocks as splitting the whole file at once.
+
+"""
+
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import io
+import itertools as itz
+import logging as logmod
+import pathlib as pl
+import re
+import time
+import types
+import weakref
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+from bibtexparser import model
+from bibtexparser.library import Library
+from bibtexparser.splitter import Splitter
+
+# ##-- end 3rd party imports
+
+# ##-- 1st party imports
+from . import _interface as API_IO
+
+# ##-- end 1st party imports
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+    type Block = model.Block
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Body:
+
+def scan_blocks(source:pl.Path|str|io.TextIOBase, *, read_size:int=API_IO.STREAM_READ_SIZE) -> Iterator[tuple[int, str]]:
+    """ Split a bibtex source into the text of each block,
+    yielding (start line, text) pairs.
+
+    The text of a block runs from its '@' mark to the next one,
+    so includes any implicit comment after it.
+    Text before the first block is yielded as well.
+
+    Marks are found with the Splitter's own pattern, without tracking braces.
+    So an '@word{' inside a field value, even on a later line, starts a new block.
+    The Splitter does the same: it aborts the enclosing entry as a ParsingFailedBlock,
+    and parses from the mark as a new block. So streamed blocks match a whole-file parse.
+    """
+    match source:
+        case pl.Path():
+            with source.open() as f:
+                yield from _scan_stream(f, read_size=read_size)
+        case str():
+            yield from _scan_stream(io.StringIO(source), read_size=read_size)
+        case io.TextIOBase():
+            yield from _scan_stream(source, read_size=read_size)
+        case x:
+            raise TypeError(type(x))
+
+def _scan_stream(stream:io.TextIOBase, *, read_size:int) -> Iterator[tuple[int, str]]:
+    buffer     = ""
+    start_line = 0
+    # Where the current block starts in the buffer
+    start      = 0
+    # Where to resume searching for marks from.
+    scanned    = 0
+    while (piece:=stream.read(read_size)):
+        # Drop the blocks already yielded, once per chunk
+        buffer   = buffer[start:] + piece
+        scanned -= start
+        start    = 0
+        # Marks only match once their '{' has been read,
+        # so resume a little before the end of the last search, in case one was cut off
+        search_from = max(1, scanned - API_IO.STREAM_MARK_LOOKBACK)
+        while (mark:=API_IO.STREAM_MARK_RE.search(buffer, search_from)) is not None:
+            text        = buffer[start:mark.start()]
+            start       = mark.start()
+            search_from = start + 1
+            yield start_line, text
+            start_line += text.count("\n")
+        else:
+            scanned = len(buffer)
+    else:
+        if start < len(buffer):
+            yield start_line, buffer[start:]
+
+def parse_block_text(text:str, *, start_line:int=0) -> list[Block]:
+    """ Parse the text of a block (from scan_blocks) with bibtexparser's Splitter,
+    offsetting the line numbers of the blocks and fields by start_line.
+    """
+    blocks = Splitter(bibstr=text).split(library=Library()).blocks
+    if start_line == 0:
+        return blocks
+
+    for block in blocks:
+        if block._start_line_in_file is not None:
+            block._start_line_in_file += start_line
+
+        match block:
+            case model.Entry():
+                for field in block.fields:
+                    if field._start_line is not None:
+                        field._start_line += start_line
+            case _:
+                pass
+    else:
+        return blocks
+
+def stream_blocks(source:pl.Path|str|io.TextIOBase, *, read_size:int=API_IO.STREAM_READ_SIZE) -> Iterator[Block]:
+    """ Parse a source block by block """
+    for start_line, text in scan_blocks(source, read_size=read_size):
+        yield from parse_block_text(text, start_line=start_line)
@@ -18,6 +18,9 @@ import re
 import time
 import types
 import weakref
+import io
+import importlib
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 from uuid import UUID, uuid1
 
@@ -40,7 +43,15 @@ from bibble.util.mixins import MiddlewareValidator_m
 from bibble.model import MetaBlock, FailedBlock
 from bibble.util import PairStack
 
+from bibble.library import BibbleLib
+from bibble.util.executors import WRITE_DIR
+from bibble.util.snapshot import snapshot_block
+from bibble.util.dispatch import DispatchTable
+from bibble.util.middlecore import GEN_CLASS_RE
 from ._util import Runner_m
+from .atomic import AtomicWrite
+from .render_cache import RenderCache
+from .read_cache import _stable_repr
 # ##-- end 1st party imports
 
 # ##-- types
@@ -68,6 +79,7 @@ if TYPE_CHECKING:
     from bibtexparser.writer import BibtexFormat
 
     type Middleware = API.Middleware_p | API.BidirectionalMiddleware_p
+    type Block      = model.Block
 ##--|
 
 # isort: on
@@ -86,6 +98,30 @@ DEFAULT_ACTIVE : Final[set] = set([
     model.ExplicitComment,
     model.ImplicitComment,
 ])
+
+_worker_state : dict = {}
+##--|
+
+def _rebuild_writer(module:str, name:str) -> BibbleWriter:
+    """ Unpickling helper for writers, see BibbleWriter.__reduce__ """
+    cls = getattr(importlib.import_module(module), name)
+    return cls.__new__(cls)
+
+def _init_render_worker(writer:BibbleWriter) -> None:
+    """ Process pool initializer for parallel rendering.
+    Receives the writer once per worker,
+    the blocks are sent with each chunk.
+    """
+    _worker_state['writer'] = writer
+
+def _render_chunk(chunk:list[Block]) -> list[list[str]]:
+    """ Visit a chunk of blocks with the worker's writer.
+    Each block's pieces are joined, so fewer strings are sent back.
+    """
+    writer = _worker_state['writer']
+    join   = writer._join_char.join
+    return [[join(pieces)] if (pieces:=writer.visit(x)) else [] for x in chunk]
+
 ##--|
 
 class _Visitors_m:
@@ -165,19 +201,57 @@ class BibbleWriter:
     Uses visitor pattern
 
     Note: visit method are responsible for new lines
+
+    Pass render_cache=True (or a path, to persist it between runs, or a RenderCache)
+    to reuse the rendered text of entries that are unchanged since they were last written.
+    Entries are keyed by their type, key and fields, and the writer's settings (see _render_settings).
+
+    Pass render_workers > 1 to render the blocks of large libraries in a process pool.
+    The blocks are split into ordered chunks, each worker gets a copy of the writer
+    (without its middlewares), and the rendered chunks are joined back in order.
+    Workers can't share a render cache, so the two can't be combined.
     """
     _value_sep      : str
     _value_column   : Maybe[int]
     _middlewares    : list[Middleware]
     format          : BibtexFormat
     _active_blocks  : set[type[model.Block]]
+    _visitors       : DispatchTable
+    _profile        : bool|pl.Path
+    _render_cache   : Maybe[RenderCache]
+    _render_key     : Maybe[str]
+    _render_workers : int
 
-    def __init__(self, stack:PairStack|list[Middleware], *, format:Maybe[BibtexFormat]=None, logger:Maybe[Logger]=None, active_blocks:Maybe[Iterable[type[model.Block]]]=None):
+    def __init__(self, stack:PairStack|list[Middleware], *, format:Maybe[BibtexFormat]=None, logger:Maybe[Logger]=None, active_blocks:Maybe[Iterable[type[model.Block]]]=None, profile:bool|pl.Path=False, render_cache:bool|pl.Path|RenderCache=False, render_workers:int=1):
         self._value_sep         = API_W.VAL_SEP
         self._value_column      = None
         self._logger            = logger or logging
         self._join_char         = EMPTY_JOIN
-        self._active_blocks     = active_blocks or DEFAULT_ACTIVE
+        self._profile           = profile
+        self._render_key        = None
+        match render_cache:
+            case False | None:
+                self._render_cache = None
+            case True:
+                self._render_cache = RenderCache()
+            case str() | pl.Path() as x:
+                self._render_cache = RenderCache(x)
+            case RenderCache() as x:
+                self._render_cache = x
+            case x:
+                raise TypeError(type(x))
+
+        match render_workers:
+            case int() as x if x < 1:
+                raise ValueError("render_workers must be at least 1", x)
+            case int() as x if 1 < x and self._render_cache is not None:
+                raise ValueError("A render cache can't be used with render_workers", x)
+            case int() as x:
+                self._render_workers = x
+            case x:
+                raise TypeError(type(x))
+
+        self.set_active(active_blocks or DEFAULT_ACTIVE)
         match stack:
             case PairStack():
                 self._middlewares = stack.write_stack()
@@ -196,35 +270,144 @@ class BibbleWriter:
 
         self.exclude_middlewares(API.ReadTime_p)
 
-    def set_active(self, active:Iterable[type[model.Block]]) -> None:
-        self._active_blocks = set(active)
+    def __reduce__(self) -> tuple:
+        """ Writers are pickled by the name their class is bound to in its module,
+        as mixed in classes (eg: 'BibbleWriter<+M>') can't be found by their qualname.
+        Needed to send writers to render workers.
+        """
+        cls  = type(self)
+        name = GEN_CLASS_RE.sub("", cls.__qualname__)
+        return (_rebuild_writer, (cls.__module__, name), self.__getstate__())
 
-    def write(self, library:Library, *, file:None|pl.Path=None, append:Maybe[list[Middleware]]=None, title:Maybe[str]=None) -> str:
-        """ Write the library to a string, and possbly a file
-        # TODO write failure reports to a separate file
+    def __getstate__(self) -> dict:
+        """ Pickled writers only render, so don't keep their middlewares or render cache.
+        The visitor table holds bound methods, so is rebuilt on unpickling.
         """
-        self._calculate_auto_value_align(library)
+        state = self.__dict__.copy()
+        state['_middlewares']  = []
+        state['_render_cache'] = None
+        del state['_visitors']
+        return state
 
-        with TimeCtx(logger=logging, level=logmod.INFO) as ctx:
-            ctx.msg("--> Write Transforms: Start")
-            transformed = self._run_writewares(library, append=append)
+    def __setstate__(self, state:dict) -> None:
+        self.__dict__.update(state)
+        self.set_active(self._active_blocks)
 
-        ctx.msg("<-- Write Transforms took: %s", ctx.total_s)
+    def set_active(self, active:Iterable[type[model.Block]]) -> None:
+        """ Set the types of block to write, and rebuild the visitor table """
+        self._active_blocks = set(active)
+        self._visitors      = DispatchTable(self._resolve_visitor)
 
-        header  = self.make_header(transformed, title)
-        body    = self.make_body(transformed)
-        footer  = self.make_footer(transformed, file)
-        lib     = self.make_lib(header=header, body=body, footer=footer)
+    def write(self, library:Library, *, file:None|pl.Path|io.TextIOBase=None, append:Maybe[list[Middleware]]=None, title:Maybe[str]=None) -> str:
+        """ Write the library to a string, and possbly a file.
+        To write a file without building the string, use write_to.
+        # TODO write failure reports to a separate file
+        """
+        transformed = self._transform_for_write(library, append=append)
+        header      = self.make_header(transformed, title)
+        body        = self.make_body(transformed)
+        footer      = self.make_footer(transformed, file if isinstance(file, pl.Path) else None)
+        lib         = self.make_lib(header=header, body=body, footer=footer)
 
         # Reset the value column:
         self._value_column = None
+        self._render_key   = None
+        self._save_render_cache()
         match file:
             case pl.Path():
-                file.write_text(lib)
+                with AtomicWrite(file) as f:
+                    f.write(lib)
+                return lib
+            case io.TextIOBase():
+                file.write(lib)
                 return lib
             case _:
                 return lib
 
+    def write_to(self, library:Library, file:pl.Path|io.TextIOBase, *, append:Maybe[list[Middleware]]=None, title:Maybe[str]=None) -> int:
+        """ Write the library to a file, or any text sink, as each block is visited,
+        without building the whole library as a string.
+        Returns the number of characters written.
+        """
+        match file:
+            case pl.Path():
+                with AtomicWrite(file) as f:
+                    return self._write_pieces(library, f, path=file, append=append, title=title)
+            case io.TextIOBase():
+                return self._write_pieces(library, file, path=None, append=append, title=title)
+            case x:
+                raise TypeError(type(x))
+
+    def write_stream(self, blocks:Iterable[Block], *, file:pl.Path|io.TextIOBase, append:Maybe[list[Middleware]]=None, title:Maybe[str]=None) -> int:
+        """ Write blocks to a file as they arrive, running the write stack on each block.
+        For use with BibbleReader.stream, so memory use is bounded by the largest block.
+
+        The stack can only contain block level middlewares,
+        and the format's value_column can't be calculated automatically.
+        Returns the number of blocks written.
+        """
+        match file:
+            case pl.Path():
+                with AtomicWrite(file) as f:
+                    return self.write_stream(blocks, file=f, append=append, title=title)
+            case io.TextIOBase():
+                pass
+            case x:
+                raise TypeError(type(x))
+
+        executor = self._stream_executor(direction=WRITE_DIR, append=append)
+        copying  = not all(x.allow_inplace for x in executor._middlewares)
+        context  = BibbleLib()
+        for middleware in executor._middlewares:
+            if hasattr(middleware, "handle_meta_entry"):
+                middleware.handle_meta_entry(context)
+
+        self._calculate_auto_value_align(context)
+        file.write(self._join_char.join(self.make_header(context, title)))
+        count = 0
+        for block in blocks:
+            if copying:
+                block = snapshot_block(block)
+
+            for result in executor.run_block(block, context):
+                if 0 < count:
+                    file.write(self.format.block_separator)
+
+                file.write(self._join_char.join(self.visit(result)))
+                count += 1
+        else:
+            file.write(self._join_char.join(self.make_footer(context, None)))
+            self._value_column = None
+            self._render_key   = None
+            self._save_render_cache()
+            return count
+
+    def _write_pieces(self, library:Library, sink:io.TextIOBase, *, path:Maybe[pl.Path], append:Maybe[list[Middleware]], title:Maybe[str]) -> int:
+        transformed = self._transform_for_write(library, append=append)
+        count       = 0
+        try:
+            for piece in self.iter_lib(header=self.make_header(transformed, title),
+                                       body=self.iter_body(transformed),
+                                       footer=self.make_footer(transformed, path)):
+                count += sink.write(piece)
+            else:
+                self._save_render_cache()
+                return count
+        finally:
+            # Reset the value column:
+            self._value_column = None
+            self._render_key   = None
+
+    def _transform_for_write(self, library:Library, *, append:Maybe[list[Middleware]]) -> Library:
+        self._calculate_auto_value_align(library)
+
+        with TimeCtx(logger=logging, level=logmod.INFO) as ctx:
+            ctx.msg("--> Write Transforms: Start")
+            transformed = self._run_writewares(library, append=append)
+
+        ctx.msg("<-- Write Transforms took: %s", ctx.total_s)
+        return transformed
+
     def write_as_data(self, library:Library, *, file:None|pl.Path=None, append:Maybe[list[Middleware]]=None, title:Maybe[str]=None) -> Any:
         """ Instead of writing the library out as a string, write it as data
 
@@ -235,13 +418,13 @@ class BibbleWriter:
     def write_failures(self, library:Library, *, file:Maybe[pl.Path]=None, append:bool=False) -> str:
         """ Write failed blocks to a separate file """
         curr_blocks = self._active_blocks
-        self._active_blocks = set([FailedBlock, model.ParsingFailedBlock, model.MiddlewareErrorBlock])
+        self.set_active([FailedBlock, model.ParsingFailedBlock, model.MiddlewareErrorBlock])
         result = self.write(library, append=append)
-        self._active_blocks = curr_blocks
+        self.set_active(curr_blocks)
         if not file:
             return result
 
-        with file.open('a') as f:
+        with AtomicWrite(file, mode="a") as f:
             f.write(result)
 
         return result
@@ -250,17 +433,42 @@ class BibbleWriter:
         return []
 
     def make_body(self, library) -> list[str]:
-        total_entries = len(library.blocks) - 2
-        body : list[str] = []
-        for i, block in enumerate(library.blocks):
-            # Get string representation (as list of strings) of block
-            pieces = self.visit(block)
-            body.extend(pieces)
+        return list(self.iter_body(library))
+
+    def iter_body(self, library) -> Iterator[str]:
+        """ Visit the blocks of the library, one at a time,
+        or in chunks in a process pool (see render_workers)
+        """
+        blocks = library.blocks
+        match len(blocks):
+            case _ if self._render_workers < 2:
+                rendered = map(self.visit, blocks)
+            case x if x < API_W.RENDER_MIN_BLOCKS:
+                rendered = map(self.visit, blocks)
+            case _:
+                rendered = self._render_parallel(blocks)
+
+        total_entries = len(blocks) - 2
+        # Get string representation (as list of strings) of each block
+        for i, pieces in enumerate(rendered):
+            yield from pieces
             # Separate Blocks
             if i <= total_entries:
-                body.append(self.format.block_separator)
-        else:
-            return body
+                yield self.format.block_separator
+
+    def _render_parallel(self, blocks:list[Block]) -> Iterator[list[str]]:
+        """ Visit ordered chunks of blocks in a process pool,
+        yielding the rendered blocks in their original order
+        """
+        count  = min(len(blocks), self._render_workers * API_W.RENDER_CHUNKS_PER_WORKER)
+        size   = -(-len(blocks) // count)
+        chunks = [blocks[i:i+size] for i in range(0, len(blocks), size)]
+        logging.info("Rendering %s blocks in %s chunks, with %s workers", len(blocks), len(chunks), self._render_workers)
+        with ProcessPoolExecutor(max_workers=self._render_workers,
+                                 initializer=_init_render_worker,
+                                 initargs=(self,)) as pool:
+            for chunk in pool.map(_render_chunk, chunks):
+                yield from chunk
 
     def make_footer(self, library, file:None|pl.Path=None) -> list[str]:
         return []
@@ -268,38 +476,100 @@ class BibbleWriter:
     def make_lib(self, *, header:list[str], body:list[str], footer:list[str]) -> str:
         return self._join_char.join([*header, *body, *footer])
 
+    def iter_lib(self, *, header:Iterable[str], body:Iterable[str], footer:Iterable[str]) -> Iterator[str]:
+        """ The pieces of make_lib's string, in order, for streaming """
+        pieces = itz.chain(header, body, footer)
+        match self._join_char:
+            case "":
+                yield from pieces
+            case join_char:
+                for i, piece in enumerate(pieces):
+                    if 0 < i:
+                        yield join_char
+                    yield piece
+
     def visit(self, block) -> list[str]:
-        match block:
-            case x if isinstance(x, API.CustomWriteBlock_p):
-                assert(hasattr(x, "visit"))
-                return x.visit(self)
+        return self._visitors[type(block)](block)
+
+    def _resolve_visitor(self, cls:type) -> Callable[[Block], list[str]]:
+        """ Find the visit method for a block type.
+        Blocks with their own visit method (see API.CustomWriteBlock_p) visit themselves.
+        Otherwise the first active type the block is an instance of is used,
+        in the order of _visitor_order.
+        """
+        if callable(getattr(cls, "visit", None)):
+            return self._visit_custom
+
+        for btype, visitor in self._visitor_order():
+            if issubclass(cls, btype) and btype in self._active_blocks:
+                return self._cached_visitor(btype, visitor)
+        else:
+            pass
+
+        if issubclass(cls, model.ParsingFailedBlock):
+            return self._visit_ignored_failure
+
+        return self._visit_skipped
+
+    def _visitor_order(self) -> list[tuple[type, Callable[[Block], list[str]]]]:
+        return [
             ##--| Standard blocks
-            case MetaBlock() if MetaBlock in self._active_blocks:
-                return self.visit_metablock(block)
-            case model.Entry() if model.Entry in self._active_blocks:
-                return self.visit_entry(block)
-            case model.String() if model.String in self._active_blocks:
-                return self.visit_string(block)
-            case model.Preamble() if model.Preamble in self._active_blocks:
-                return self.visit_preamble(block)
-            case model.ExplicitComment() if model.ExplicitComment in self._active_blocks:
-                return self.visit_expl_comment(block)
-            case model.ImplicitComment() if model.ImplicitComment in self._active_blocks:
-                return self.visit_impl_comment(block)
+            (MetaBlock,                  self.visit_metablock),
+            (model.Entry,                self.visit_entry),
+            (model.String,               self.visit_string),
+            (model.Preamble,             self.visit_preamble),
+            (model.ExplicitComment,      self.visit_expl_comment),
+            (model.ImplicitComment,      self.visit_impl_comment),
             ##--| Failures
-            case FailedBlock() if FailedBlock in self._active_blocks:
-                return self.visit_failed_block(block)
-            case model.MiddlewareErrorBlock() if model.MiddlewareErrorBlock in self._active_blocks:
-                return self.visit_middleware_error_block(block)
-            case model.ParsingFailedBlock() if model.ParsingFailedBlock in self._active_blocks:
-                return self.visit_parsing_failed_block(block)
-            case model.ParsingFailedBlock() if block._ignore_error_block is not None:
-                return self.visit(block._ignore_error_block)
-            case model.ParsingFailedBlock():
-                return []
+            (FailedBlock,                self.visit_failed_block),
+            (model.MiddlewareErrorBlock, self.visit_middleware_error_block),
+            (model.ParsingFailedBlock,   self.visit_parsing_failed_block),
+        ]
+
+    def _cached_visitor(self, btype:type, visitor:Callable[[Block], list[str]]) -> Callable[[Block], list[str]]:
+        """ With a render cache, entries are visited through it """
+        match self._render_cache:
+            case RenderCache() if btype is model.Entry:
+                return ftz.partial(self._visit_cached, visitor)
             case _:
-                logging.info(f"Skipping block type: {type(block)}")
+                return visitor
+
+    def _visit_cached(self, visitor:Callable[[Block], list[str]], block:model.Entry) -> list[str]:
+        if self._render_key is None:
+            # Settings are fixed for a write, so only built once per write
+            self._render_key = self._render_settings()
+        return self._render_cache.get_or_render(block, self._render_key, visitor)
+
+    def _render_settings(self) -> str:
+        """ Everything, other than the entry, that changes how an entry is rendered.
+        Subclasses that render differently should extend this.
+        """
+        return "|".join([f"{type(self).__module__}.{type(self).__qualname__}",
+                         _stable_repr(self.format, set()),
+                         str(self._value_column),
+                         self._value_sep])
+
+    def _save_render_cache(self) -> None:
+        match self._render_cache:
+            case None:
+                pass
+            case cache:
+                cache.save()
+
+    def _visit_custom(self, block:API.CustomWriteBlock_p) -> list[str]:
+        return block.visit(self)
+
+    def _visit_ignored_failure(self, block:model.ParsingFailedBlock) -> list[str]:
+        """ An inactive parsing failure is written as the block it ignored, if any """
+        match block._ignore_error_block:
+            case None:
                 return []
+            case x:
+                return self.visit(x)
+
+    def _visit_skipped(self, block:Block) -> list[str]:
+        logging.info(f"Skipping block type: {type(block)}")
+        return []
 
     def _calculate_auto_value_align(self, library: Library) -> None:
         """
@@ -308,6 +578,8 @@ class BibbleWriter:
         If the format specifies a value, uses that.
         Otherwise calulates it from the larges field key
         """
+        # The column is part of the render settings
+        self._render_key = None
         if self._value_column is not None:
             return
 
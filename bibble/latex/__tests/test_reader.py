@@ -10,6 +10,7 @@ from __future__ import annotations
 # ##-- stdlib imports
 import logging as logmod
 import pathlib as pl
+import pickle
 import warnings
 # ##-- end stdlib imports
 
@@ -20,6 +21,7 @@ import pytest
 from bibtexparser import model, Library
 import bibble._interface as API
 from .. import LatexReader
+from bibble.util.executors import ParallelExecutor
 
 # ##-- types
 # isort: off
@@ -88,6 +90,58 @@ class TestLatexReader:
             case x:
                  assert(False), x
 
+    def test_pickle_roundtrip(self):
+        mid = pickle.loads(pickle.dumps(LatexReader()))
+        assert(type(mid) is LatexReader)
+        assert(mid._test_decode(r"\'{e}") == "é")
+
+    def test_parallel_matches_sequential(self):
+        def make_lib():
+            return Library([model.Entry("test", f"test_{i}", [model.Field("title", r"\'{e}")]) for i in range(20)])
+
+        mid        = LatexReader(allow_parallel_execution=True)
+        sequential = mid.transform(make_lib())
+        parallel   = ParallelExecutor([mid], direction="read", workers=2, min_blocks=0).run(make_lib())
+        assert([x.fields[0].value for x in parallel.entries] == [x.fields[0].value for x in sequential.entries])
+
+    @pytest.mark.parametrize("text", ["plain text", "a, b: c (1992)", "Ümlaut", "x^2 a_b #1", ""])
+    def test_plain_text_skips_decoder(self, text, mocker):
+        mid = LatexReader()
+        spy = mocker.spy(mid._decoder, "latex_to_text")
+        assert(mid.decode(text) == text)
+        assert(mid.decode(text) == mid._decoder.latex_to_text(text))
+        assert(spy.call_count == 1)
+        assert(mid.coder_stats()['decode_cache']['misses'] == 0)
+
+    @pytest.mark.parametrize("text", [r"\'{e}", "a -- b", "``quoted''", "50% off", "a ~ b", "a & b", "$x$", "?`"])
+    def test_latex_uses_decoder(self, text):
+        mid = LatexReader()
+        assert(mid.decode(text) == mid._decoder.latex_to_text(text))
+        assert(mid.coder_stats()['decode_cache']['misses'] == 1)
+
+    def test_decode_cache_hits(self, mocker):
+        mid = LatexReader()
+        spy = mocker.spy(mid._decoder, "latex_to_text")
+        lib = Library([model.Entry("test", f"test_{i}", [model.Field("publisher", r"Presses Universitaires de Fran\c{c}e")]) for i in range(10)])
+        mid.transform(lib)
+        assert(spy.call_count == 1)
+        assert(all(x.fields[0].value == "Presses Universitaires de Françe" for x in lib.entries))
+        assert(mid.coder_stats()['decode_cache'] == {"size": 1, "maxsize": mid._cache_size, "hits": 9, "misses": 1})
+
+    def test_decode_cache_size(self):
+        mid = LatexReader(cache_size=2)
+        for x in [r"\'{a}", r"\'{e}", r"\'{i}"]:
+            mid.decode(x)
+
+        assert(len(mid._decode_cache) == 2)
+        assert(r"\'{a}" not in mid._decode_cache)
+
+    def test_rebuild_clears_cache(self):
+        mid = LatexReader()
+        mid.decode(r"\'{e}")
+        mid.rebuild_decoder()
+        assert(len(mid._decode_cache) == 0)
+
     @pytest.mark.skip
     def test_todo(self):
         pass
@@ -61,6 +61,26 @@ logging = logmod.getLogger(__name__)
 DEFAULT_RULES_K : Final[str] = "defaults"
 KEEP_BRACED_K   : Final[str] = "keep_braced_groups"
 MATH_MODE_K     : Final[str] = "math_mode"
+CACHE_SIZE_K    : Final[str] = "cache_size"
+
+CODER_CACHE_SIZE : Final[int]        = 4096
+# Text without any of these decodes to itself, so can skip the decoder.
+# ie: macros, math, non-breaking spaces, groups, comments, alignment,
+# and the ligatures --, ---, ``, '', ?` and !`
+DECODE_SPECIAL_RE : Final[re.Pattern] = re.compile(r"[\\$~{}%&]|--|``|''|[?!]`")
+# The ascii characters to probe an encoder with, to find the ones it changes.
+ENCODE_PROBE      : Final[str]        = "\t\n\r" + "".join(chr(x) for x in range(0x20, 0x7F))
+# Control characters aren't probed, as the encoder warns about them, so always encode them
+ENCODE_CONTROL    : Final[str]        = "\x00-\x08\x0b\x0c\x0e-\x1f\x7f"
+# The number of combined encode rules kept for reuse between encoders
+ENCODE_RULE_CACHE_SIZE : Final[int]   = 64
+# Flags which can be scoped to one alternative of a combined encode rule
+ENCODE_SCOPED_FLAGS    : Final[tuple[tuple[re.RegexFlag, str], ...]] = (
+    (re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.ASCII, "a"),
+)
+# Numbered backreferences, named backreferences and conditionals,
+# which would refer to the wrong groups in a combined encode rule
+ENCODE_UNCOMBINABLE_RE : Final[re.Pattern] = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
 
 ##--| Encoding Rules:
 ## Turned into conversion rules using UnicodeHelper_m.builde_encode_rule
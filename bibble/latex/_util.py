@@ -11,6 +11,7 @@ import enum
 import functools as ftz
 import itertools as itz
 import logging as logmod
+import operator
 import pathlib as pl
 import re
 import time
@@ -25,7 +26,8 @@ import atexit # for @atexit.register
 import faulthandler
 # ##-- end stdlib imports
 
-from pylatexenc.latexencode import (RULE_REGEX, UnicodeToLatexConversionRule,
+from pylatexenc.latexencode import (RULE_DICT, RULE_REGEX,
+                                    UnicodeToLatexConversionRule,
                                     UnicodeToLatexEncoder)
 from pylatexenc.latex2text import (LatexNodes2Text, MacroTextSpec,
                                    get_default_latex_context_db)
@@ -34,6 +36,7 @@ from pylatexenc.macrospec import LatexContextDb
 from bibtexparser import model
 
 from . import _interface as LAPI
+from bibble.util.cache import BoundedCache
 from jgdv import Mixin
 # ##-- types
 # isort: off
@@ -49,7 +52,7 @@ from typing import no_type_check, final, override, overload
 # from pydantic import BaseModel, Field, model_validator, field_validator, ValidationError
 
 if TYPE_CHECKING:
-    from jgdv import Maybe, VList
+    from jgdv import Maybe, VList, Result
     from typing import Final
     from typing import ClassVar, Any, LiteralString
     from typing import Never, Self, Literal
@@ -71,16 +74,47 @@ logging = logmod.getLogger(__name__)
 ##-- end logging
 
 # Vars:
-
+_ENCODE_RULE_CACHE : Final[BoundedCache] = BoundedCache(LAPI.ENCODE_RULE_CACHE_SIZE)
 # Body:
 
+class CombinedEncodeRepl:
+    """ The replacement of a combined encode rule.
+    Dispatches on the named group of the alternative which matched,
+    and rematches that alternative's own pattern, so its groups expand as normal.
+    """
+    __slots__ = ("_table",)
+
+    _table : dict[str, tuple[re.Pattern, str]]
+
+    def __init__(self, table:dict[str, tuple[re.Pattern, str]]) -> None:
+        self._table = table
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} : {len(self._table)} rules>"
+
+    def __call__(self, match:re.Match) -> str:
+        pattern, repl = self._table[match.lastgroup]
+        return pattern.match(match.string, match.start()).expand(repl)
+
+
 class UnicodeHelper_m:
     """
     A Helper for using pylatexenc
 
     Builds Encoders using lists of str pairs
-    and Decoders using dicts
+    and Decoders using dicts.
+
+    Decoding skips the decoder for text with no latex in it,
+    and encoding skips the encoder for ascii text none of its rules could change.
+    Other text is memoized in bounded caches, cleared when the coders are rebuilt.
+
+    Encode rules built from str pairs are combined into a single regex,
+    and shared between encoders built from the same pairs.
     """
+    _cache_size     : int = LAPI.CODER_CACHE_SIZE
+    _decode_cache   : BoundedCache
+    _encode_cache   : BoundedCache
+    _encode_prescan : Maybe[list[re.Pattern]]
 
     @staticmethod
     def prep_encode_tuples(tuples:list) -> list:
@@ -102,8 +136,74 @@ class UnicodeHelper_m:
 
     @staticmethod
     def build_encode_rule(tuples:list) -> U2LRule:
+        """ Build a regex conversion rule from pairs of pattern,replacement.
+        The same pairs get the same (cached) rule.
+        """
         compiled = UnicodeHelper_m.prep_encode_tuples(tuples)
-        return UnicodeToLatexConversionRule(rule_type=RULE_REGEX, rule=compiled)
+        key      = tuple((x.pattern, x.flags, y) for x,y in compiled)
+        return _ENCODE_RULE_CACHE.get_or_make(key, UnicodeHelper_m.combine_encode_tuples)
+
+    @staticmethod
+    def combine_encode_tuples(key:tuple[tuple[str, int, str], ...]) -> U2LRule:
+        """ Merge (pattern, flags, replacement) triples into a rule of one alternation,
+        so the encoder tries one regex at each position instead of each pattern in turn.
+        Alternatives are tried in order, so the first pattern to match still wins.
+
+        Patterns with backreferences or unscopable flags, or which don't compile together,
+        are left as a rule of separate patterns.
+        """
+        pairs      = [(re.compile(x, flags), y) for x, flags, y in key]
+        separate   = UnicodeToLatexConversionRule(rule_type=RULE_REGEX, rule=pairs)
+        scopable   = ftz.reduce(operator.or_, (x for x,_ in LAPI.ENCODE_SCOPED_FLAGS), re.UNICODE)
+        alts, table = [], {}
+        if len(pairs) < 2:
+            return separate
+
+        for i, (pattern, repl) in enumerate(pairs):
+            if LAPI.ENCODE_UNCOMBINABLE_RE.search(pattern.pattern) or pattern.flags & ~scopable:
+                logging.debug("Encode rule can't be combined: %s", pattern.pattern)
+                return separate
+
+            name  = f"_r{i}"
+            flags = "".join(char for flag, char in LAPI.ENCODE_SCOPED_FLAGS if pattern.flags & flag)
+            match flags:
+                case "":
+                    alts.append(f"(?P<{name}>{pattern.pattern})")
+                case _:
+                    alts.append(f"(?P<{name}>(?{flags}:{pattern.pattern}))")
+
+            table[name] = (pattern, repl)
+        else:
+            try:
+                combined = re.compile("|".join(alts))
+            except re.error as err:
+                logging.debug("Encode rules can't be combined: %s", err)
+                return separate
+
+        return UnicodeToLatexConversionRule(rule_type=RULE_REGEX, rule=[(combined, CombinedEncodeRepl(table))])
+
+    @staticmethod
+    def build_encode_prescan(encoder:UnicodeToLatexEncoder, rules:list[str|U2LRule]) -> Maybe[list[re.Pattern]]:
+        """ Build the patterns which match any ascii text the encoder could change.
+        Named and dict rules are by character, so are found by probing the encoder with each ascii character.
+        Regex rules can match sequences, so their patterns are used directly.
+        Returns None if callable rules make it unknowable.
+        """
+        patterns = []
+        for rule in rules:
+            match rule:
+                case str():
+                    pass
+                case UnicodeToLatexConversionRule(rule_type=x) if x == RULE_DICT:
+                    pass
+                case UnicodeToLatexConversionRule(rule_type=x, rule=[*pairs]) if x == RULE_REGEX:
+                    patterns += [y for y,_ in pairs]
+                case _:
+                    return None
+        else:
+            changed = "".join(x for x in LAPI.ENCODE_PROBE if encoder.unicode_to_latex(x) != x)
+            patterns.insert(0, re.compile(f"[{re.escape(changed)}{LAPI.ENCODE_CONTROL}]"))
+            return patterns
 
     @staticmethod
     def build_decode_rule(pair:tuple) -> MacroTextSpec:
@@ -134,16 +234,68 @@ class UnicodeHelper_m:
 
         return LatexNodes2Text(latex_context=context_db, **kwargs)
 
+    def __getstate__(self) -> dict:
+        """ The pylatexenc coders can't be pickled, so drop them,
+        and rebuild them from the accumulated rules when unpickled
+        """
+        state = super().__getstate__()
+        state.pop("_encoder", None)
+        state.pop("_decoder", None)
+        state['_unicode_coders'] = [x for x in ("_encoder", "_decoder") if x in self.__dict__]
+        return state
+
+    def __setstate__(self, state:dict) -> None:
+        coders = state.pop("_unicode_coders", [])
+        super().__setstate__(state)
+        if "_encoder" in coders:
+            self.rebuild_encoder()
+        if "_decoder" in coders:
+            self.rebuild_decoder()
+
     def rebuild_encoder(self, *, rules:Maybe[list[U2LRule]]=None, **kwargs) -> None:
         """ Accumulates rules and rebuilds the encoder """
         self._total_rules += [x for x in (rules or []) if x not in self._total_rules]
         self._total_options.update(kwargs)
-        self._encoder = self.build_encoder(rules=self._total_rules[:], kwargs=self._total_options)
+        self._encoder        = self.build_encoder(rules=self._total_rules[:], kwargs=self._total_options)
+        self._encode_prescan = self.build_encode_prescan(self._encoder, [*self._total_rules, LAPI.DEFAULT_RULES_K])
+        self._encode_cache   = BoundedCache(self._cache_size)
+
+    def encode(self, text:str) -> Result[str, Exception]:
+        """ Encode unicode to latex, using the cache """
+        match self._encode_prescan:
+            case [*xs] if text.isascii() and not any(x.search(text) for x in xs):
+                return text
+            case _:
+                return self._encode_cache.get_or_make(text, self._encode_uncached)
+
+    def _encode_uncached(self, text:str) -> Result[str, Exception]:
+        try:
+            return self._encoder.unicode_to_latex(text)
+        except Exception as err:
+            return err
 
     def rebuild_decoder(self, *, rules:dict=None, **kwargs) -> None:
         self._total_rules.update(rules or {})
         self._total_options.update(kwargs)
-        self._decoder = self.build_decoder(rules=self._total_rules, kwargs=self._total_options)
+        self._decoder      = self.build_decoder(rules=self._total_rules, kwargs=self._total_options)
+        self._decode_cache = BoundedCache(self._cache_size)
+
+    def decode(self, text:str) -> Result[str, Exception]:
+        """ Decode latex to unicode, using the cache """
+        if LAPI.DECODE_SPECIAL_RE.search(text) is None:
+            return text
+
+        return self._decode_cache.get_or_make(text, self._decode_uncached)
+
+    def _decode_uncached(self, text:str) -> Result[str, Exception]:
+        try:
+            return self._decoder.latex_to_text(text)
+        except Exception as err:
+            return err
+
+    def coder_stats(self) -> dict:
+        """ The hit/miss counts of the coder caches """
+        return {x.removeprefix("_"): getattr(self, x).stats() for x in ("_decode_cache", "_encode_cache") if hasattr(self, x)}
 
     def _test_encode(self, text) -> str:
         """ utility to test latex encoding """
@@ -90,6 +90,7 @@ class LatexReader(IdenBlockMiddleware):
     def __init__(self, *, extra:Maybe[dict]=None, **kwargs):
         super().__init__(**kwargs)
         self.set_field_matchers(black=self._blacklist, white=[])
+        self._cache_size    = kwargs.pop(LAPI.CACHE_SIZE_K, LAPI.CODER_CACHE_SIZE)
         self._total_options = {
             LAPI.KEEP_BRACED_K : kwargs.pop(LAPI.KEEP_BRACED_K, False),
             LAPI.MATH_MODE_K   : kwargs.pop(LAPI.MATH_MODE_K, 'text'),
@@ -126,12 +127,9 @@ class LatexReader(IdenBlockMiddleware):
                 return [model.Field(key=field.key, value=x)]
 
     def _transform_raw_str(self, python_string: str) -> Result[str, Exception]:
-        """Transforms a python string to a latex string
+        """Transforms a latex string to a python string
 
         Returns:
-            Tuple[str, str]: The transformed string and a possible error message
+            The transformed string, or the error
         """
-        try:
-            return self._decoder.latex_to_text(python_string)
-        except Exception as e:
-            return e
+        return self.decode(python_string)
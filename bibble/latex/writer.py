@@ -100,16 +100,16 @@ class LatexWriter(IdenBlockMiddleware):
         kwargs.setdefault(API.ALLOW_INPLACE_MOD_K, False)
         super().__init__(**kwargs)
         self.set_field_matchers(black=self._blacklist, white=[])
+        self._cache_size                  = kwargs.pop(LAPI.CACHE_SIZE_K, LAPI.CODER_CACHE_SIZE)
         self._total_options               = {}
-        self._total_rules : list[U2LRule] = [
-            self.build_encode_rule(LAPI.ENCODING_RULES)
-        ]
+        encode_tuples                     = [*LAPI.ENCODING_RULES]
         if kwargs.get(API.KEEP_MATH_K, True):
-            self._total_rules.append(self.build_encode_rule(LAPI.MATH_RULES))
+            encode_tuples += LAPI.MATH_RULES
 
         if kwargs.get(API.ENCLOSE_URLS_K, False):
-            self._total_rules.append(self.build_encode_rule(LAPI.URL_RULES))
+            encode_tuples += LAPI.URL_RULES
 
+        self._total_rules : list[U2LRule] = [self.build_encode_rule(encode_tuples)]
         self.rebuild_encoder()
 
     def on_write(self):
@@ -130,11 +130,11 @@ class LatexWriter(IdenBlockMiddleware):
         match self.transform_strlike(field.value):
             case Exception() as err:
                 return err
+            case x if x == field.value:
+                # Unchanged, so a snapshot's entry can keep sharing its fields
+                return [field]
             case x:
                 return [model.Field(key=field.key, value=x)]
 
     def _transform_raw_str(self, python_string: str) -> Result[str, Exception]:
-        try:
-            return self._encoder.unicode_to_latex(python_string)
-        except Exception as e:
-            return e
+        return self.encode(python_string)
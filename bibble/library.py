@@ -30,6 +30,7 @@ from bibtexparser.middlewares import BlockMiddleware
 # ##-- end 3rd party imports
 
 import bibble._interface as API
+from bibble.model import MetaBlock
 
 # ##-- types
 # isort: off
@@ -54,6 +55,7 @@ if TYPE_CHECKING:
     from collections.abc import Sequence, Mapping, MutableMapping, Hashable
 
     from API import Middleware
+    from bibtexparser.model import Block
 ##--|
 
 # isort: on
@@ -63,17 +65,72 @@ if TYPE_CHECKING:
 logging = logmod.getLogger(__name__)
 ##-- end logging
 
-@Proto(API.Library_p)
+@Proto(API.Library_p, API.MetaIndexed_p)
 class BibbleLib(Library):
     """ A library with a key value store for extra info
     Also tracks the individual files used as source
+
+    Keeps an index of its MetaBlocks, by each MetaBlock type in their mro,
+    in library order, so MetaBlock.find_in doesn't have to scan the library.
     """
+    _meta_index : dict[type, list[MetaBlock]]
 
     def __init__(self, *args, **kwargs):
+        self._meta_index  = defaultdict(list)
         super().__init__(*args, **kwargs)
         self._kv_store    = defaultdict(set)
         self.source_files = set()
 
+    def find_meta(self, cls:type[MetaBlock]) -> Maybe[MetaBlock]:
+        """ Get the first MetaBlock of a type, in O(1) """
+        match self._meta_index.get(cls, None):
+            case [x, *_]:
+                return x
+            case _:
+                return None
+
+    def remove(self, blocks:list[Block]|Block) -> None:
+        super().remove(blocks)
+        match blocks:
+            case MetaBlock():
+                self._unindex_meta(blocks)
+            case list():
+                for block in blocks:
+                    if isinstance(block, MetaBlock):
+                        self._unindex_meta(block)
+
+    def replace(self, old_block:Block, new_block:Block, fail_on_duplicate_key:bool=True) -> None:
+        super().replace(old_block, new_block, fail_on_duplicate_key=fail_on_duplicate_key)
+        if isinstance(old_block, MetaBlock) or isinstance(new_block, MetaBlock):
+            # The new block is not at the end of the library, so reindex to keep the order
+            self._reindex_meta()
+
+    def _add_to_dicts(self, block:Block) -> Block:
+        """ Extends Library._add_to_dicts, which add and replace use, to index meta blocks """
+        block = super()._add_to_dicts(block)
+        if isinstance(block, MetaBlock):
+            self._index_meta(block)
+
+        return block
+
+    def _index_meta(self, block:MetaBlock) -> None:
+        for cls in type(block).mro():
+            if not issubclass(cls, MetaBlock):
+                break
+            self._meta_index[cls].append(block)
+
+    def _unindex_meta(self, block:MetaBlock) -> None:
+        for cls in type(block).mro():
+            if not issubclass(cls, MetaBlock):
+                break
+            self._meta_index[cls] = [x for x in self._meta_index[cls] if x is not block]
+
+    def _reindex_meta(self) -> None:
+        self._meta_index.clear()
+        for block in self.blocks:
+            if isinstance(block, MetaBlock):
+                self._index_meta(block)
+
     def add_sublibrary(self, lib:Library, source:Maybe[str|pl.Path]=None) -> Self:
         """ Merge entries, kv_store and source files into this library
         will *overwrite* existing kv_store keys
@@ -9,6 +9,8 @@ from .isbn_writer import IsbnWriter
 from .isbn_validator import IsbnValidator
 from .entry_sorter import EntrySorter
 from .data_insert import DataInsertMW
+from .exif_session import ExiftoolSession
+from .file_state import FileStateStore
 
 try:
     from .metadata_writer import ApplyMetadata, FileCheck
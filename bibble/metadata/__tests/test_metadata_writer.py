@@ -10,6 +10,10 @@ from __future__ import annotations
 # ##-- stdlib imports
 import logging as logmod
 import pathlib as pl
+import json
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
 import warnings
 # ##-- end stdlib imports
 
@@ -19,10 +23,14 @@ import pytest
 
 import bibble._interface as API
 from bibtexparser import model, Library
+import jsonlines
 import sh
 
 try:
     from .. import ApplyMetadata, FileCheck, _interface as MAPI
+    from ..exif_session import ExiftoolSession
+    from ..file_state import FileStateStore
+    from bibble.util.executors import ParallelExecutor
 except (ImportError, ImportWarning):
     pytest.skip("Skipping Metadata Writing Tests as an external tool is missing",
                 allow_module_level=True)
@@ -140,12 +148,123 @@ class TestApplyMetadata:
             case x:
                 assert(False), x
 
+    def test_file_read_once(self, mocker, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.pdf"
+        tmpfile.touch()
+        entry                 = model.Entry("test", "test:blah", [model.Field("file", tmpfile), model.Field("year", "2020")])
+        mid                   = ApplyMetadata(backup=pl.Path(tmpdir) / "backup.jsonl", force=True)
+        session               = mocker.Mock(spec=ExiftoolSession)
+        session.read_metadata.return_value = {"SourceFile": str(tmpfile)}
+        mid._exiftool.session = session
+        mid.pdf_is_modifiable = mocker.Mock(return_value=True)
+        mid.pdf_validate      = mocker.Mock()
+        mid.pdf_finalize      = mocker.Mock()
+        mid.transform(Library([entry]))
+        assert(session.read_metadata.call_count == 1)
+        assert(session.write_tags.call_count == 1)
+
+    def test_unchanged_file_skipped(self, mocker, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.pdf"
+        tmpfile.write_bytes(b"%PDF-1.4")
+        entry                 = model.Entry("test", "test:blah", [model.Field("file", tmpfile), model.Field("year", "2020")], raw="@test{test:blah}")
+        mid                   = ApplyMetadata(state=pl.Path(tmpdir) / "state.sqlite")
+        session               = mocker.Mock(spec=ExiftoolSession)
+        session.read_metadata.return_value = {"SourceFile": str(tmpfile)}
+        mid._exiftool.session = session
+        mid.pdf_is_modifiable = mocker.Mock(return_value=True)
+        mid.pdf_validate      = mocker.Mock()
+        mid.pdf_finalize      = mocker.Mock()
+        mid.transform(Library([entry]))
+        assert(session.write_tags.call_count == 1)
+        # Unchanged, so skipped
+        mid.transform(Library([entry]))
+        assert(session.read_metadata.call_count == 1)
+        assert(session.write_tags.call_count == 1)
+        assert(mid.pdf_is_modifiable.call_count == 1)
+        # The entry changed, so updated again
+        entry.set_field(model.Field("year", "2021"))
+        mid.transform(Library([entry]))
+        assert(session.write_tags.call_count == 2)
+
+    def test_failed_update_not_recorded(self, mocker, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.pdf"
+        tmpfile.write_bytes(b"%PDF-1.4")
+        entry                      = model.Entry("test", "test:blah", [model.Field("file", tmpfile)])
+        mid                        = ApplyMetadata(state=pl.Path(tmpdir) / "state.sqlite")
+        mid.pdf_is_modifiable      = mocker.Mock(return_value=False)
+        mid.metadata_matches_entry = mocker.Mock(return_value=False)
+        mid.transform(Library([entry]))
+        assert(mid._state_store.get(tmpfile) is None)
+
+    def test_updated_pdf_recorded_modifiable(self, mocker, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.pdf"
+        tmpfile.write_bytes(b"%PDF-1.4")
+        entry                 = model.Entry("test", "test:blah", [model.Field("file", tmpfile), model.Field("year", "2020")])
+        mid                   = ApplyMetadata(state=pl.Path(tmpdir) / "state.sqlite", force=True)
+        mid._exiftool.session = mocker.Mock(spec=ExiftoolSession)
+        mid.pdf_is_modifiable = mocker.Mock(return_value=True)
+        mid.pdf_validate      = mocker.Mock()
+        mid.pdf_finalize      = mocker.Mock()
+        mid.transform(Library([entry]))
+        assert(mid._state_store.get_result(tmpfile, MAPI.QPDF_MODIFIABLE) is True)
+
+    def test_workers_ctor(self):
+        mid = ApplyMetadata(workers=4)
+        assert(mid.allow_parallel)
+        assert(ParallelExecutor.pool_kind(mid) == "thread")
+        assert(mid._extra[API.PARALLEL_WORKERS_K] == 4)
+        assert(not ApplyMetadata().allow_parallel)
+
+    def test_workers_ctor_fail(self):
+        with pytest.raises(ValueError):
+            ApplyMetadata(workers=0)
+
+    def test_workers_failures_stay_with_entry(self, tmpdir):
+        paths = [pl.Path(tmpdir) / f"test_{i}.txt" for i in range(10)]
+        for x in paths:
+            x.touch()
+        lib    = Library([model.Entry("test", f"test:{i}", [model.Field("file", x)]) for i, x in enumerate(paths)])
+        mid    = ApplyMetadata(workers=4, tqdm=False)
+        result = ParallelExecutor([mid], direction="write").run(lib)
+        assert(len(result.failed_blocks) == 10)
+        assert([x.error.args[1] for x in result.failed_blocks] == [f"test:{i}" for i in range(10)])
+
+    def test_workers_pickle_sessions(self):
+        mid    = ApplyMetadata(workers=2)
+        mid._exiftool.session = "not pickled"
+        copied = pickle.loads(pickle.dumps(mid))
+        assert(getattr(copied._exiftool, "session", None) is None)
+
+    def test_workers_backup(self, mocker, tmpdir):
+        backup = pl.Path(tmpdir) / "backup.jsonl"
+        mid    = ApplyMetadata(backup=backup, workers=8)
+        record = {"SourceFile": "blah", "Description": "x" * 100_000}
+
+        def slow_write(writer, obj):
+            # Yield between the halves of a record, so unlocked writes interleave
+            text = json.dumps(obj) + "\n"
+            writer._fp.write(text[:len(text)//2])
+            time.sleep(0.001)
+            writer._fp.write(text[len(text)//2:])
+            writer._fp.flush()
+
+        mocker.patch.object(jsonlines.Writer, "write", slow_write)
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda i: mid.backup_original_metadata(pl.Path(f"{i}.pdf"), metadata=record), range(40)))
+
+        lines = backup.read_text().splitlines()
+        assert(len(lines) == 40)
+        assert(all(json.loads(x) == record for x in lines))
+
+    def test_workers_backup_lock_pickles(self):
+        copied = pickle.loads(pickle.dumps(ApplyMetadata(backup=pl.Path("backup.jsonl"))))
+        assert(copied._backup_lock is not None)
+
     @pytest.mark.skip
     def test_todo(self):
         """
         Still to test:
         - modifiable failure
-        - original metadata backup
         - epub update
         - pdf update
         - pdf validation
@@ -184,6 +303,125 @@ class TestFileCheck:
             case x:
                  assert(False), x
 
+    def test_state_skips_qpdf(self, mocker, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.pdf"
+        tmpfile.write_bytes(b"%PDF-1.4")
+        store = FileStateStore(pl.Path(tmpdir) / "state.sqlite")
+        store.record(tmpfile)
+        store.record_result(tmpfile, MAPI.QPDF_MODIFIABLE, True)
+        entry = model.Entry("test", "test:blah", [model.Field("file", tmpfile)])
+        mid   = FileCheck(state=store)
+        mid.pdf_is_modifiable = mocker.Mock(return_value=False)
+        mid.transform(Library([entry]))
+        mid.pdf_is_modifiable.assert_not_called()
+        assert(entry.fields_dict[MAPI.PDF_LOCKED_K].value is False)
+
+    def test_state_keeps_lock(self, mocker, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.pdf"
+        tmpfile.write_bytes(b"%PDF-1.4")
+        store = FileStateStore(pl.Path(tmpdir) / "state.sqlite")
+        entry = model.Entry("test", "test:blah", [model.Field("file", tmpfile), model.Field(MAPI.PDF_LOCKED_K, True)])
+        # ApplyMetadata records the state when the metadata already matches, without running qpdf
+        apply = ApplyMetadata(state=store)
+        apply.pdf_is_modifiable      = mocker.Mock(return_value=False)
+        apply.read_metadata          = mocker.Mock(return_value={})
+        apply.metadata_matches_entry = mocker.Mock(return_value=True)
+        apply.transform(Library([entry]))
+        apply.pdf_is_modifiable.assert_not_called()
+        assert(store.matches(tmpfile))
+        mid   = FileCheck(state=store)
+        mid.pdf_is_modifiable = mocker.Mock(return_value=False)
+        mid.transform(Library([entry]))
+        mid.pdf_is_modifiable.assert_not_called()
+        assert(entry.fields_dict[MAPI.PDF_LOCKED_K].value is True)
+
+    def test_cached_lock_check(self, mocker, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.pdf"
+        tmpfile.write_bytes(b"%PDF-1.4")
+        entry = model.Entry("test", "test:blah", [model.Field("file", tmpfile)])
+        for _ in range(3):
+            mid = FileCheck(state=pl.Path(tmpdir) / "state.sqlite")
+            mid.pdf_is_modifiable = mocker.Mock(return_value=False)
+            mid.transform(Library([entry]))
+            assert(entry.fields_dict[MAPI.PDF_LOCKED_K].value is True)
+        else:
+            # Only the first run calls qpdf
+            assert(mid.pdf_is_modifiable.call_count == 0)
+
+    def test_clears_stale_fields(self, mocker, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.pdf"
+        tmpfile.touch()
+        entry = model.Entry("test", "test:blah", [model.Field("file", tmpfile),
+                                                  model.Field(MAPI.ORPHANED_K, True),
+                                                  model.Field(MAPI.PDF_LOCKED_K, True)])
+        mid   = FileCheck()
+        mid.pdf_is_modifiable = mocker.Mock(return_value=True)
+        mid.transform(Library([entry]))
+        assert(MAPI.ORPHANED_K not in entry.fields_dict)
+        # Without a state store, the existing lock isn't checked again
+        mid.pdf_is_modifiable.assert_not_called()
+        assert(entry.fields_dict[MAPI.PDF_LOCKED_K].value is True)
+
+    def test_keeps_lock_unknown_to_store(self, mocker, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.pdf"
+        tmpfile.write_bytes(b"%PDF-1.4")
+        entry = model.Entry("test", "test:blah", [model.Field("file", tmpfile), model.Field(MAPI.PDF_LOCKED_K, True)])
+        mid   = FileCheck(state=pl.Path(tmpdir) / "state.sqlite")
+        mid.pdf_is_modifiable = mocker.Mock(return_value=True)
+        assert(mid.transform_Entry(entry, Library()) == [])
+        mid.pdf_is_modifiable.assert_not_called()
+
+    def test_rechecks_changed_lock(self, mocker, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.pdf"
+        tmpfile.write_bytes(b"%PDF-1.4")
+        store = FileStateStore(pl.Path(tmpdir) / "state.sqlite")
+        store.record_result(tmpfile, MAPI.QPDF_MODIFIABLE, False)
+        entry = model.Entry("test", "test:blah", [model.Field("file", tmpfile), model.Field(MAPI.PDF_LOCKED_K, True)])
+        mid   = FileCheck(state=store)
+        mid.pdf_is_modifiable = mocker.Mock(return_value=True)
+        mid.transform(Library([entry]))
+        mid.pdf_is_modifiable.assert_not_called()
+        assert(entry.fields_dict[MAPI.PDF_LOCKED_K].value is True)
+        tmpfile.write_bytes(b"%PDF-1.4 unlocked")
+        mid.transform(Library([entry]))
+        mid.pdf_is_modifiable.assert_called_once()
+        assert(entry.fields_dict[MAPI.PDF_LOCKED_K].value is False)
+        assert(store.get_result(tmpfile, MAPI.QPDF_MODIFIABLE) is True)
+
+    def test_clears_lock_of_non_pdf(self, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.epub"
+        tmpfile.touch()
+        entry = model.Entry("test", "test:blah", [model.Field("file", tmpfile), model.Field(MAPI.PDF_LOCKED_K, True)])
+        FileCheck().transform(Library([entry]))
+        assert(MAPI.PDF_LOCKED_K not in entry.fields_dict)
+
+    def test_unchanged_entry(self, mocker, tmpdir):
+        tmpfile = pl.Path(tmpdir) / "test.pdf"
+        tmpfile.touch()
+        entry = model.Entry("test", "test:blah", [model.Field("file", tmpfile), model.Field(MAPI.PDF_LOCKED_K, "False")])
+        mid   = FileCheck()
+        mid.pdf_is_modifiable = mocker.Mock(return_value=True)
+        assert(mid.transform_Entry(entry, Library()) == [])
+
+    def test_workers_in_library_order(self, mocker, tmpdir):
+        paths = [pl.Path(tmpdir) / f"test_{i}.pdf" for i in range(20)]
+        for x in paths[::2]:
+            x.touch()
+        lib    = Library([model.Entry("test", f"test:{i}", [model.Field("file", x)]) for i, x in enumerate(paths)])
+        mid    = FileCheck(workers=4, tqdm=False)
+        mid.pdf_is_modifiable = mocker.Mock(side_effect=lambda x: int(x.stem.split("_")[1]) % 4 == 0)
+        result = ParallelExecutor([mid], direction="write").run(lib)
+        assert([x.key for x in result.entries] == [f"test:{i}" for i in range(20)])
+        for i, entry in enumerate(result.entries):
+            fields = entry.fields_dict
+            match i % 4:
+                case 0:
+                    assert(fields[MAPI.PDF_LOCKED_K].value is False)
+                case 2:
+                    assert(fields[MAPI.PDF_LOCKED_K].value is True)
+                case _:
+                    assert(fields[MAPI.ORPHANED_K].value is True)
+
 
     def test_orphan_check_fail(self, tmpdir):
         tmpfile = pl.Path(tmpdir) / "test.pdf"
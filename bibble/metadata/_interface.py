@@ -76,11 +76,38 @@ PDF_LOCKED_K   : Final[str]        = "pdf_locked"
 BIBTEX_EXIF    : Final[str]        = "Bibtex"
 DESC_EXIF      : Final[str]        = "Description"
 
+EXIFTOOL_CMD       : Final[str]             = "exiftool"
+EXIF_STAY_OPEN     : Final[tuple[str, ...]] = ("-stay_open", "True", "-@", "-")
+EXIF_CLOSE         : Final[bytes]           = b"-stay_open\nFalse\n"
+EXIF_JSON          : Final[str]             = "-J"
+EXIF_CSTR          : Final[str]             = "#[CSTR]"
+# Sentinels written after each command, numbered to match it.
+# exiftool replaces ${status} with the command's exit status.
+EXIF_READY_FMT     : Final[str]             = "{{ready{}}}"
+EXIF_STATUS_FMT    : Final[str]             = "${{status}}=post{}"
+EXIF_STATUS_SUFF   : Final[str]             = "=post{}"
+EXIF_STATUS_RE     : Final[re.Pattern]      = re.compile(r"(-?\d+)$")
+EXIF_CLOSE_TIMEOUT : Final[int]             = 10
+
+# The sqlite file state store. See FileStateStore.
+STATE_K              : Final[str]             = "state"
+STATE_SCHEMA_VERSION : Final[int]             = 2
+STATE_TABLES         : Final[dict[str, str]]  = {
+    "file_state"   : "CREATE TABLE IF NOT EXISTS file_state (path TEXT PRIMARY KEY, inode INTEGER, size INTEGER, mtime INTEGER, digest TEXT, entry_hash TEXT)",
+    "file_results" : "CREATE TABLE IF NOT EXISTS file_results (path TEXT, name TEXT, inode INTEGER, size INTEGER, mtime INTEGER, digest TEXT, ok INTEGER, PRIMARY KEY (path, name))",
+}
+STATE_PRAGMAS        : Final[tuple[str, ...]] = ("PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL")
+STATE_HASH_CHUNK     : Final[int]             = 2 ** 20
+# Fields the metadata middlewares set, which aren't part of an entry's hash
+STATE_IGNORE_FIELDS  : Final[frozenset[str]]  = frozenset([ORPHANED_K, PDF_LOCKED_K])
+
 QPDF_CHECK     : Final[str]        = "--check"
 QPDF_LINEAR    : Final[str]        = "--linearize"
 QPDF_IS_ENCRPT : Final[str]        = "--is-encrypted"
 QPDF_REQ_PASS  : Final[str]        = "--requires-password"
 QPDF_OK_CODES  : Final[tuple]      = (2,)
+# The name pdf_is_modifiable's results are stored under, in a FileStateStore
+QPDF_MODIFIABLE : Final[str]       = "qpdf_modifiable"
 
 EPUB_SUFF      : Final[str]        = ".epub"
 PDF_SUFF       : Final[str]        = ".pdf"
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+A long running exiftool process,
+so files can be read and written without starting perl each time.
+
+See https://exiftool.org/exiftool_pod.html#stay_open-FLAG
+"""
+
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import itertools as itz
+import json
+import logging as logmod
+import pathlib as pl
+import queue
+import re
+import subprocess
+import threading
+import time
+import types
+import weakref
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+from . import _interface as MAPI
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+    from typing import IO
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+
+# Body:
+
+class ExiftoolResult_d:
+    """ The output of a single exiftool command """
+    __slots__ = ("stdout", "stderr", "status")
+
+    stdout : str
+    stderr : str
+    status : int
+
+    def __init__(self, *, stdout:str, stderr:str, status:int) -> None:
+        self.stdout = stdout
+        self.stderr = stderr
+        self.status = status
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} : {self.status}>"
+
+class ExiftoolSession:
+    """ Runs commands through a single 'exiftool -stay_open True -@ -' process.
+
+    Each command's arguments are written to exiftool's stdin, one per line,
+    followed by -execute{N}. Its output is read up to the matching {ready{N}} on stdout,
+    and a status sentinel (from -echo4) on stderr.
+    stderr is drained by a thread as it is written,
+    so warnings filling its pipe can't block exiftool while stdout is read.
+    Arguments with newlines are passed as C strings (#[CSTR]).
+
+    The process starts on the first command, and is closed by close(),
+    leaving a 'with' block, or when the session is garbage collected.
+    Commands are run one at a time, so a session can be shared between threads.
+    """
+    _cmd       : list[str]
+    _proc      : Maybe[subprocess.Popen]
+    _stderr    : Maybe[queue.SimpleQueue]
+    _count     : int
+    _lock      : threading.Lock
+    _finalizer : Maybe[weakref.finalize]
+
+    def __init__(self, *, executable:str|pl.Path=MAPI.EXIFTOOL_CMD, args:Iterable[str]=()) -> None:
+        self._cmd       = [str(executable), *MAPI.EXIF_STAY_OPEN]
+        self._proc      = None
+        self._stderr    = None
+        self._count     = 0
+        self._lock      = threading.Lock()
+        self._finalizer = None
+        match list(args):
+            case []:
+                pass
+            case [*xs]:
+                self._cmd += ["-common_args", *xs]
+
+    def __repr__(self) -> str:
+        state = "running" if self.running else "stopped"
+        return f"<{self.__class__.__name__} : {state} : {self._count} commands>"
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, *exc:Any) -> Literal[False]:
+        self.close()
+        return False
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self) -> None:
+        """ Start the exiftool process, if it isn't already running """
+        if self.running:
+            return
+
+        logging.debug("Starting exiftool session: %s", self._cmd)
+        try:
+            self._proc = subprocess.Popen(self._cmd,
+                                          stdin=subprocess.PIPE,
+                                          stdout=subprocess.PIPE,
+                                          stderr=subprocess.PIPE)
+        except OSError as err:
+            raise ChildProcessError("Couldn't start exiftool", self._cmd[0], err) from None
+
+        self._stderr    = queue.SimpleQueue()
+        drain           = threading.Thread(target=self._drain, args=(self._proc.stderr, self._stderr),
+                                           name="exiftool-stderr", daemon=True)
+        drain.start()
+        self._finalizer = weakref.finalize(self, self._shutdown, self._proc, drain)
+
+    def close(self) -> None:
+        """ Tell exiftool to exit, and wait for it """
+        match self._finalizer:
+            case None:
+                pass
+            case finalizer:
+                finalizer()
+
+        self._proc      = None
+        self._stderr    = None
+        self._finalizer = None
+
+    @staticmethod
+    def _shutdown(proc:subprocess.Popen, drain:threading.Thread) -> None:
+        try:
+            proc.stdin.write(MAPI.EXIF_CLOSE)
+            proc.stdin.close()
+            proc.wait(timeout=MAPI.EXIF_CLOSE_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+        finally:
+            drain.join(timeout=MAPI.EXIF_CLOSE_TIMEOUT)
+            proc.stdout.close()
+            if not drain.is_alive():
+                proc.stderr.close()
+
+    @staticmethod
+    def _drain(stream:IO[bytes], lines:queue.SimpleQueue) -> None:
+        """ Move lines from a stream to a queue, ending with b'' when it closes """
+        try:
+            for line in iter(stream.readline, b""):
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            lines.put(b"")
+
+    def execute(self, *args:str|pl.Path) -> ExiftoolResult_d:
+        """ Run a single exiftool command, returning its output and exit status """
+        with self._lock:
+            self.start()
+            self._count += 1
+            num   = self._count
+            lines = [self._as_line(x) for x in args]
+            lines += ["-echo4", MAPI.EXIF_STATUS_FMT.format(num), f"-execute{num}", ""]
+            try:
+                self._proc.stdin.write("\n".join(lines).encode())
+                self._proc.stdin.flush()
+            except OSError as err:
+                raise ChildProcessError("The exiftool session has stopped", err) from None
+
+            stdout = self._read_until(self._proc.stdout.readline, MAPI.EXIF_READY_FMT.format(num))
+            stderr = self._read_until(self._stderr.get, MAPI.EXIF_STATUS_SUFF.format(num))
+
+        match MAPI.EXIF_STATUS_RE.search(stderr):
+            case re.Match() as status:
+                return ExiftoolResult_d(stdout=stdout, stderr=stderr[:status.start()], status=int(status[1]))
+            case _:
+                raise ChildProcessError("No exiftool status, ${status} needs exiftool >= 12.10", stderr)
+
+    def read_metadata(self, path:pl.Path) -> dict:
+        """ Get a file's metadata as a dict (exiftool -J {path}) """
+        result = self.execute(MAPI.EXIF_JSON, path)
+        if result.status != 0:
+            raise ChildProcessError("Exiftool read failed", path, result.stderr.strip())
+
+        try:
+            return json.loads(result.stdout)[0]
+        except (json.JSONDecodeError, IndexError):
+            raise ChildProcessError("Exiftool returned bad json", path) from None
+
+    def write_tags(self, path:pl.Path, args:list[str]) -> None:
+        """ Write tags to a file (exiftool {args} {path}) """
+        result = self.execute(*args, path)
+        if result.status != 0:
+            raise ChildProcessError("Exiftool update failed", path, result.stderr.strip())
+
+    def _as_line(self, arg:str|pl.Path) -> str:
+        """ Format an argument as a line of an exiftool argfile """
+        match str(arg):
+            case str() as x if "\n" in x or "\r" in x:
+                escaped = x.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r")
+                return f"{MAPI.EXIF_CSTR}{escaped}"
+            case x:
+                return x
+
+    def _read_until(self, readline:Callable[[], bytes], sentinel:str) -> str:
+        """ Read lines (b'' at the end of the stream) until one ends with the sentinel,
+        returning the text before it
+        """
+        lines = []
+        while bool(line:=readline()):
+            text = line.decode("utf-8", errors="replace").rstrip("\r\n")
+            if text.endswith(sentinel):
+                lines.append(text.removesuffix(sentinel))
+                return "\n".join(lines)
+
+            lines.append(text)
+        else:
+            raise ChildProcessError("The exiftool session stopped unexpectedly", "\n".join(lines))
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+A sqlite store of the state of files whose metadata has been written,
+and of the results of checking them (eg: with qpdf),
+so unchanged files can be skipped without running exiftool or qpdf.
+
+"""
+
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import hashlib
+import itertools as itz
+import logging as logmod
+import os
+import pathlib as pl
+import re
+import sqlite3
+import threading
+import time
+import types
+import weakref
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+from . import _interface as MAPI
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+    from bibtexparser import model
+
+    type Entry = model.Entry
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+
+# Body:
+
+class FileState_d:
+    """ The recorded state of a file:
+    its inode, size, mtime (in ns), a hash of its contents,
+    and a hash of the entry last written to it (or None)
+    """
+    __slots__ = ("inode", "size", "mtime", "digest", "entry_hash")
+
+    inode      : int
+    size       : int
+    mtime      : int
+    digest     : str
+    entry_hash : Maybe[str]
+
+    def __init__(self, *, inode:int, size:int, mtime:int, digest:str, entry_hash:Maybe[str]=None) -> None:
+        self.inode      = inode
+        self.size       = size
+        self.mtime      = mtime
+        self.digest     = digest
+        self.entry_hash = entry_hash
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} : {self.size} bytes : {self.digest[:8]}>"
+
+    def same_stat(self, stat:os.stat_result) -> bool:
+        return (self.inode, self.size, self.mtime) == (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+class FileStateStore:
+    """ A sqlite database of FileState_d's, keyed by resolved path.
+
+    matches(path, entry) is true when the file's inode, size and mtime are as recorded,
+    and the entry hashes to what was written. Only a stat call, no subprocesses.
+    If the stat differs but the size doesn't, the contents are hashed,
+    so touched or restored files still match, and their new stat is recorded.
+
+    get_result(path, name) similarly returns the recorded bool result of a named check of a file
+    (eg: MAPI.QPDF_MODIFIABLE), if the file is unchanged since record_result(path, name, ok).
+
+    The database is opened on first use, so the store can be pickled.
+    Use ':memory:' as the path for a store that isn't persisted.
+    Lookups and writes are serialized, so a store can be shared between threads.
+    """
+    _path      : str
+    _conn      : Maybe[sqlite3.Connection]
+    _lock      : threading.Lock
+    _finalizer : Maybe[weakref.finalize]
+    hits       : int
+    misses     : int
+
+    @staticmethod
+    def entry_digest(entry:Entry) -> str:
+        """ A stable hash of an entry's type, key and fields, except those in STATE_IGNORE_FIELDS """
+        hasher = hashlib.sha256()
+        hasher.update(f"{entry.entry_type}\0{entry.key}\0".encode())
+        for field in entry.fields:
+            match field.value:
+                case _ if field.key in MAPI.STATE_IGNORE_FIELDS:
+                    continue
+                case set() | frozenset() as xs:
+                    value = repr(sorted(str(x) for x in xs))
+                case x:
+                    value = str(x)
+            hasher.update(f"{field.key}\0{value}\0".encode())
+        else:
+            return hasher.hexdigest()
+
+    @staticmethod
+    def file_digest(path:pl.Path) -> str:
+        """ A hash of a file's contents """
+        with pl.Path(path).open("rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    def __init__(self, path:str|pl.Path) -> None:
+        self._path      = str(path)
+        self._conn      = None
+        self._lock      = threading.Lock()
+        self._finalizer = None
+        self.hits       = 0
+        self.misses     = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} : {self._path} : hits {self.hits}, misses {self.misses}>"
+
+    def __getstate__(self) -> dict:
+        """ Pickled stores reopen the same database """
+        return {"path": self._path}
+
+    def __setstate__(self, state:dict) -> None:
+        self.__init__(state['path'])
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc:Any) -> Literal[False]:
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM file_state").fetchone()[0]
+
+    def close(self) -> None:
+        match self._finalizer:
+            case None:
+                pass
+            case finalizer:
+                finalizer()
+
+        self._conn      = None
+        self._finalizer = None
+
+    def get(self, path:pl.Path) -> Maybe[FileState_d]:
+        """ Get the recorded state of a file """
+        with self._lock:
+            row = self._connect().execute("SELECT inode, size, mtime, digest, entry_hash FROM file_state WHERE path = ?",
+                                          (self._key(path),)).fetchone()
+        match row:
+            case None:
+                return None
+            case (inode, size, mtime, digest, entry_hash):
+                return FileState_d(inode=inode, size=size, mtime=mtime, digest=digest, entry_hash=entry_hash)
+
+    def matches(self, path:pl.Path, entry:Maybe[Entry]=None) -> bool:
+        """ Test if a file, and the entry written to it, are unchanged since they were recorded """
+        path = pl.Path(path)
+        match self.get(path):
+            case None:
+                result = False
+            case FileState_d() as state if entry is not None and state.entry_hash != self.entry_digest(entry):
+                result = False
+            case FileState_d() as state:
+                match self._unchanged(path, state):
+                    case None:
+                        result = False
+                    case x if x is state:
+                        result = True
+                    case x:
+                        self._put(path, x)
+                        result = True
+
+        return self._count(result, hit=result)
+
+    def get_result(self, path:pl.Path, name:str) -> Maybe[bool]:
+        """ Get the recorded result of the check 'name' of a file,
+        or None if it wasn't recorded, or the file has changed since
+        """
+        path = pl.Path(path)
+        with self._lock:
+            row = self._connect().execute("SELECT inode, size, mtime, digest, ok FROM file_results WHERE path = ? AND name = ?",
+                                          (self._key(path), name)).fetchone()
+        match row:
+            case None:
+                return self._count(None, hit=False)
+            case (inode, size, mtime, digest, ok):
+                state = FileState_d(inode=inode, size=size, mtime=mtime, digest=digest)
+
+        match self._unchanged(path, state):
+            case None:
+                return self._count(None, hit=False)
+            case x if x is state:
+                return self._count(bool(ok), hit=True)
+            case x:
+                self._put_result(path, name, x, bool(ok))
+                return self._count(bool(ok), hit=True)
+
+    def has_result(self, path:pl.Path, name:str) -> bool:
+        """ Test if a result of the check 'name' of a file was recorded, even if the file has changed since """
+        with self._lock:
+            row = self._connect().execute("SELECT 1 FROM file_results WHERE path = ? AND name = ?",
+                                          (self._key(path), name)).fetchone()
+        return row is not None
+
+    def record_result(self, path:pl.Path, name:str, ok:bool) -> None:
+        """ Record the result of the check 'name' of a file, as it is now """
+        path  = pl.Path(path)
+        stat  = path.stat()
+        state = FileState_d(inode=stat.st_ino,
+                            size=stat.st_size,
+                            mtime=stat.st_mtime_ns,
+                            digest=self.file_digest(path))
+        self._put_result(path, name, state, ok)
+
+    def record(self, path:pl.Path, entry:Maybe[Entry]=None) -> FileState_d:
+        """ Record the current state of a file, and the entry written to it """
+        path  = pl.Path(path)
+        stat  = path.stat()
+        state = FileState_d(inode=stat.st_ino,
+                            size=stat.st_size,
+                            mtime=stat.st_mtime_ns,
+                            digest=self.file_digest(path),
+                            entry_hash=None if entry is None else self.entry_digest(entry))
+        self._put(path, state)
+        return state
+
+    def forget(self, path:pl.Path) -> None:
+        """ Remove the recorded state and results of a file """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM file_state WHERE path = ?", (self._key(path),))
+            conn.execute("DELETE FROM file_results WHERE path = ?", (self._key(path),))
+            conn.commit()
+
+    def stats(self) -> dict:
+        return {"path": self._path, "hits": self.hits, "misses": self.misses}
+
+    def _put(self, path:pl.Path, state:FileState_d) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO file_state VALUES (?, ?, ?, ?, ?, ?)",
+                         (self._key(path), state.inode, state.size, state.mtime, state.digest, state.entry_hash))
+            conn.commit()
+
+    def _put_result(self, path:pl.Path, name:str, state:FileState_d, ok:bool) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO file_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (self._key(path), name, state.inode, state.size, state.mtime, state.digest, int(ok)))
+            conn.commit()
+
+    def _unchanged(self, path:pl.Path, state:FileState_d) -> Maybe[FileState_d]:
+        """ Compare a file to its recorded state.
+        Returns None if it has changed or is missing, the state if its stat is the same,
+        or a new state if only its stat has changed (ie: it has the same contents)
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        match state:
+            case _ if state.same_stat(stat):
+                return state
+            case _ if state.size != stat.st_size:
+                return None
+            case _ if state.digest != self.file_digest(path):
+                return None
+            case _:
+                return FileState_d(inode=stat.st_ino,
+                                   size=stat.st_size,
+                                   mtime=stat.st_mtime_ns,
+                                   digest=state.digest,
+                                   entry_hash=state.entry_hash)
+
+    def _count(self, result:Any, *, hit:bool) -> Any:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return result
+
+    def _key(self, path:pl.Path) -> str:
+        return str(pl.Path(path).resolve())
+
+    def _connect(self) -> sqlite3.Connection:
+        """ Open the database, creating or replacing the table if needed.
+        Call with the lock held.
+        """
+        if self._conn is not None:
+            return self._conn
+
+        conn = sqlite3.connect(self._path, check_same_thread=False)
+        for pragma in MAPI.STATE_PRAGMAS:
+            conn.execute(pragma)
+        match conn.execute("PRAGMA user_version").fetchone():
+            case (MAPI.STATE_SCHEMA_VERSION,):
+                pass
+            case (version,):
+                logging.info("Rebuilding file state store %s, from version %s", self._path, version)
+                for table in MAPI.STATE_TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version = {MAPI.STATE_SCHEMA_VERSION}")
+
+        for sql in MAPI.STATE_TABLES.values():
+            conn.execute(sql)
+        conn.commit()
+        self._conn      = conn
+        self._finalizer = weakref.finalize(self, conn.close)
+        return conn
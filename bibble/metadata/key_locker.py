@@ -35,6 +35,7 @@ from jgdv import Mixin, Proto
 # ##-- 1st party imports
 import bibble._interface as API
 from . import _interface as MAPI
+from bibble.model import CowEntry
 from bibble.util.middlecore import IdenBlockMiddleware
 from bibble.util.mixins import ErrorRaiser_m
 # ##-- end 1st party imports
@@ -96,7 +97,7 @@ class KeyLocker(IdenBlockMiddleware):
         Never()
 
     def transform_Entry(self, entry, library) -> list:
-        entry = deepcopy(entry)
+        entry = CowEntry.of(entry)
         entry.key = self.clean_key(entry.key)
         match entry.get(MAPI.CROSSREF_K):
             case None:
@@ -16,6 +16,7 @@ import json
 import logging as logmod
 import pathlib as pl
 import re
+import threading
 import time
 import types
 import weakref
@@ -36,7 +37,10 @@ from jgdv import Proto, Mixin
 
 import bibble._interface as API
 from . import _interface as MAPI
+from .exif_session import ExiftoolSession
+from .file_state import FileStateStore
 from bibble.util.middlecore import IdenBlockMiddleware
+from bibble.util.executors import THREAD_POOL
 from bibble.util.mixins import ErrorRaiser_m
 from bibble.util.name_parts import NameParts_d
 
@@ -115,14 +119,115 @@ class _EntryFileGetter_m:
             case _:
                 return None
 
+class _FileWorkers_m:
+    """ Mixin for running file checks and updates in a bounded thread pool.
+
+    With workers > 1, the middleware allows parallel execution in a pool of that many threads,
+    so a ParallelExecutor dispatches the entries to it in shards,
+    while the results are still applied in library order.
+    """
+
+    def _file_worker_kwargs(self, workers:int, kwargs:dict) -> dict:
+        match workers:
+            case int() if workers < 1:
+                raise ValueError("File workers must be at least 1", workers)
+            case 1:
+                return kwargs
+            case int():
+                kwargs.setdefault(API.ALLOW_PARALLEL_K, True)
+                kwargs.setdefault(API.PARALLEL_POOL_K, THREAD_POOL)
+                kwargs.setdefault(API.PARALLEL_WORKERS_K, workers)
+                kwargs.setdefault("tqdm", True)
+                return kwargs
+            case x:
+                raise TypeError("File workers must be an int", x)
+
+class _FileState_m:
+    """ Mixin for skipping files which are unchanged since their metadata was written,
+    using a FileStateStore. Without a store, nothing is skipped.
+    """
+
+    def _init_state_store(self, store:Maybe[str|pl.Path|FileStateStore]) -> None:
+        match store:
+            case None | FileStateStore():
+                self._state_store = store
+            case str() | pl.Path():
+                self._state_store = FileStateStore(store)
+            case x:
+                raise TypeError("Unknown file state store", x)
+
+    def state_matches(self, path:pl.Path, entry:Maybe[Entry]=None) -> bool:
+        """ Test if the file (and the entry written to it) is unchanged since it was recorded """
+        match self._state_store:
+            case None:
+                return False
+            case store:
+                return store.matches(path, entry)
+
+    def record_state(self, path:pl.Path, entry:Maybe[Entry]=None) -> None:
+        match self._state_store:
+            case None:
+                pass
+            case store:
+                store.record(path, entry)
+
+    def cached_check(self, path:pl.Path, name:str, check:Callable[[pl.Path], bool]) -> bool:
+        """ Run check(path), unless its result for the file, as it is now, is in the state store """
+        match self._state_store:
+            case None:
+                return check(path)
+            case store:
+                pass
+
+        match store.get_result(path, name):
+            case bool() as result:
+                return result
+            case None:
+                result = check(path)
+                store.record_result(path, name, result)
+                return result
+
+    def record_check(self, path:pl.Path, name:str, result:bool) -> None:
+        match self._state_store:
+            case None:
+                pass
+            case store:
+                store.record_result(path, name, result)
+
+class _Exiftool_m:
+    """ Mixin for running exiftool through a long running ExiftoolSession,
+    started on first use.
+    Sessions are per thread, so file workers don't interleave their commands.
+    """
+
+    def exiftool_session(self) -> ExiftoolSession:
+        match getattr(self._exiftool, "session", None):
+            case ExiftoolSession() as session:
+                return session
+            case _:
+                self._exiftool.session = ExiftoolSession()
+                return self._exiftool.session
+
+    def read_metadata(self, path:pl.Path) -> dict:
+        """ Get the metadata of a file, as a dict, from exiftool """
+        try:
+            return self.exiftool_session().read_metadata(path)
+        except ChildProcessError:
+            raise ValueError("Couldn't retrieve metadata as json", path) from None
+
 class _Metadata_Check_m:
-    """A mixin for checking the metadata fof files"""
+    """A mixin for checking the metadata fof files
+
+    Both checks take the file's metadata if it has already been read,
+    so each file is only read once.
+    """
 
-    def backup_original_metadata(self, path:pl.Path) -> None:
+    def backup_original_metadata(self, path:pl.Path, *, metadata:Maybe[dict]=None) -> None:
         """
         If self._backup is set, backup the files metadata as jsonlines there
         Uses exiftool to export the metadata as json,
         which is then appended into the backup as a jsonlines file.
+        File workers share the backup, so appends hold self._backup_lock.
         """
         assert(hasattr(self, "_backup"))
         match self._backup:
@@ -131,15 +236,11 @@ class _Metadata_Check_m:
             case _:
                 return
 
-        try:
-            result = json.loads(exiftool("-J", str(path)))[0]
-        except sh.ErrorReturnCode:
-            raise ValueError("Couldn't retrieve metadata as json", path) from None
-
-        with jsonlines.open(self._backup, mode='a') as f:
+        result = metadata or self.read_metadata(path)
+        with self._backup_lock, jsonlines.open(self._backup, mode='a') as f:
             f.write(result)
 
-    def metadata_matches_entry(self, path:pl.Path, entry:Entry) -> bool:
+    def metadata_matches_entry(self, path:pl.Path, entry:Entry, *, metadata:Maybe[dict]=None) -> bool:
         """ Test the given path to see if the metadata matches.
         This is quite naive.
         From exiftool, it looks for either:
@@ -152,9 +253,9 @@ class _Metadata_Check_m:
         """
         assert(hasattr(self, "_logger"))
         try:
-            result = json.loads(exiftool("-J", str(path)))[0]
-        except sh.ErrorReturnCode:
-            self._logger.warning("Couldn't match metadata", path)
+            result = metadata or self.read_metadata(path)
+        except ValueError:
+            self._logger.warning("Couldn't match metadata: %s", path)
             return False
 
         bib_field_matches  = result.get(MAPI.BIBTEX_EXIF, None) == entry.raw
@@ -175,10 +276,7 @@ class _Pdf_Update_m:
         args = self._entry_to_exiftool_args(entry)
         self._logger.debug("Pdf update args: %s : %s", path, args)
         # Call
-        try:
-            exiftool(*args, str(path))
-        except sh.ErrorReturnCode as err:
-            raise ChildProcessError("Exiftool update failed", err) from None
+        self.exiftool_session().write_tags(path, args)
 
     def pdf_is_modifiable(self, path:pl.Path) -> bool:
         """ Use qpdf to test the pdf for encryption or password locking,
@@ -357,29 +455,54 @@ class _Epub_Update_m:
 ##--|
 
 @Proto(API.WriteTime_p)
-@Mixin(_Pdf_Update_m, _Epub_Update_m, _EntryFileGetter_m, _Metadata_Check_m, ErrorRaiser_m)
+@Mixin(_Pdf_Update_m, _Epub_Update_m, _EntryFileGetter_m, _Metadata_Check_m, _Exiftool_m, _FileWorkers_m, _FileState_m, ErrorRaiser_m)
 class ApplyMetadata(IdenBlockMiddleware):
     """ Apply metadata to files mentioned in bibtex entries
       uses xmp-prism tags and some custom ones for pdfs,
       and epub standard.
 
+    exiftool is run as a single long running process (see ExiftoolSession),
+    and each file's metadata is read once, for both checking and backing up.
+
+    Pass workers=N to update up to N files at once, each thread with its own exiftool.
+
+    Pass state=path to record the files it updates in a FileStateStore,
+    so later runs skip files that, along with their entries, haven't changed.
+
     TODO add a 'meta_update' status field to the entry for [locked,failed]
       """
-    _backup   : Maybe[pl.path]
-    _failures : list[Exception]
-
-    def __init__(self, *, backup:Maybe[pl.Path]=None, force:bool=False, **kwargs):
-        super().__init__(**kwargs)
+    _backup      : Maybe[pl.path]
+    _backup_lock : threading.Lock
+    _exiftool    : threading.local
+    _state_store : Maybe[FileStateStore]
+
+    def __init__(self, *, backup:Maybe[pl.Path]=None, force:bool=False, workers:int=1, state:Maybe[pl.Path|FileStateStore]=None, **kwargs):
+        super().__init__(**self._file_worker_kwargs(workers, kwargs))
+        self._init_state_store(state)
         self._extra.setdefault("tqdm", True)
         self._backup        = backup
-        self._failures      = []
+        self._backup_lock   = threading.Lock()
         self._force_update  = force
+        self._exiftool      = threading.local()
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        # Running processes, so are restarted on use instead
+        del state['_exiftool']
+        del state['_backup_lock']
+        return state
+
+    def __setstate__(self, state:dict) -> None:
+        super().__setstate__(state)
+        self._exiftool    = threading.local()
+        self._backup_lock = threading.Lock()
 
     def on_write(self):
         Never()
 
     def transform_Entry(self, entry:Entry, library:API.Library_p) -> list[Entry]:
-        result : list[Entry] = []
+        result   : list[Entry]     = []
+        failures : list[Exception] = []
         match self._get_file(entry):
             case None:
                 pass
@@ -387,34 +510,53 @@ class ApplyMetadata(IdenBlockMiddleware):
                 update = BTP.model.Field(MAPI.ORPHANED_K, True)
                 entry.set_field(update)
                 result.append(entry)
-            case pl.Path() as x if self.metadata_matches_entry(x, entry) and not self._force_update:
-                self._logger.info("No Metadata Update Necessary: %s", x)
-            case pl.Path() as x if x.suffix == MAPI.PDF_SUFF:
-                for field in self.process_pdf(x, entry):
-                    entry.set_field(field)
-                else:
-                    result.append(entry)
-            case pl.Path() as x if x.suffix == MAPI.EPUB_SUFF:
-                for field in self.process_epub(x, entry):
-                    entry.set_field(field)
-                else:
-                    result.append(entry)
-            case x:
-                self._failures.append(TypeError("Unknown File Type", entry.key, x))
+            case pl.Path() as x if x.suffix not in (MAPI.PDF_SUFF, MAPI.EPUB_SUFF):
+                failures.append(TypeError("Unknown File Type", entry.key, x))
                 self._logger.warning("Found a file that wasn't an epub or pdf: %s", x)
+            case pl.Path() as x:
+                result += self._update_file(x, entry, failures=failures)
+
+        return result + [self.make_error_block(entry, x) for x in failures]
+
+    def _update_file(self, path:pl.Path, entry:Entry, *, failures:list[Exception]) -> list[Entry]:
+        """ Read the file's metadata once, and update it if it doesn't match the entry.
+        Failures are added to 'failures', which is local to the entry, so files can be updated in threads.
+        Successfully updated files are recorded in the state store.
+        """
+        if not self._force_update and self.state_matches(path, entry):
+            self._logger.info("No Metadata Update Necessary, Unchanged: %s", path)
+            return []
 
-        for x in self._failures:
-            result.append(self.make_error_block(entry, x))
+        try:
+            metadata = self.read_metadata(path)
+        except ValueError:
+            metadata = None
+
+        prior_failures = len(failures)
+        match path.suffix:
+            case _ if self.metadata_matches_entry(path, entry, metadata=metadata) and not self._force_update:
+                self._logger.info("No Metadata Update Necessary: %s", path)
+                self.record_state(path, entry)
+                return []
+            case MAPI.PDF_SUFF:
+                fields = self.process_pdf(path, entry, metadata=metadata, failures=failures)
+            case MAPI.EPUB_SUFF:
+                fields = self.process_epub(path, entry, metadata=metadata, failures=failures)
+
+        if len(failures) == prior_failures:
+            self.record_state(path, entry)
+
+        for field in fields:
+            entry.set_field(field)
         else:
-            self._failures = []
-            return result
+            return [entry]
 
-    def process_epub(self, epub:pl.Path, entry:Entry) -> list[Field]:
+    def process_epub(self, epub:pl.Path, entry:Entry, *, metadata:Maybe[dict]=None, failures:list[Exception]) -> list[Field]:
         try:
-            self.backup_original_metadata(epub)
+            self.backup_original_metadata(epub, metadata=metadata)
             self.update_epub_by_calibre(epub, entry)
         except (ValueError, ChildProcessError) as err:
-            self._failures.append(ValueError("Epub meta update failed", epub, *err.args))
+            failures.append(ValueError("Epub meta update failed", epub, *err.args))
             self._logger.warning("Epub Update failed: %s : %s", epub, err)
             return []
         else:
@@ -422,29 +564,31 @@ class ApplyMetadata(IdenBlockMiddleware):
                 raise FileNotFoundError("File has gone missing", epub)
             return []
 
-    def process_pdf(self, pdf:pl.Path, entry:Entry) -> list[Field]:
-        if not self.pdf_is_modifiable(pdf):
+    def process_pdf(self, pdf:pl.Path, entry:Entry, *, metadata:Maybe[dict]=None, failures:list[Exception]) -> list[Field]:
+        if not self.cached_check(pdf, MAPI.QPDF_MODIFIABLE, self.pdf_is_modifiable):
             locked_field = BTP.model.Field(MAPI.PDF_LOCKED_K , True)
-            self._failures.append(ValueError("Pdf is locked", pdf))
+            failures.append(ValueError("Pdf is locked", pdf))
             return [locked_field]
 
         try:
-            self.backup_original_metadata(pdf)
+            self.backup_original_metadata(pdf, metadata=metadata)
             self.update_pdf_by_exiftool(pdf, entry)
             self.pdf_validate(pdf)
             self.pdf_finalize(pdf)
         except (ValueError, ChildProcessError, FileExistsError) as err:
-            self._failures.append(ValueError("Pdf Meta update failed", pdf, *err.args))
+            failures.append(ValueError("Pdf Meta update failed", pdf, *err.args))
             self._logger.warning("Pdf Update Failed: %s : %s", pdf, err)
             return []
         else:
             if not pdf.exists():
                 raise FileNotFoundError("File has gone missing", pdf)
+            # It was just updated, so the new file is modifiable
+            self.record_check(pdf, MAPI.QPDF_MODIFIABLE, True)
             return []
 
 ##--|
 
-@Mixin(_Pdf_Update_m, _EntryFileGetter_m)
+@Mixin(_Pdf_Update_m, _EntryFileGetter_m, _FileWorkers_m, _FileState_m)
 class FileCheck(IdenBlockMiddleware):
     """ Like ApplyMetadata, but just checks for files that can't be modified or are missing,
     so they can be fixed.
@@ -452,27 +596,73 @@ class FileCheck(IdenBlockMiddleware):
 
       Annotate entries with 'pdf_locked' if the pdf can't be modified,
       "orphan_file" if the pdf or epub does not exist
+
+    Fields that are no longer the case are removed, or updated.
+    Existing 'pdf_locked' fields are kept, unless the state store shows the pdf has changed since it was checked.
+
+    Pass workers=N to check up to N files at once.
+    Pass state=path to store qpdf's results in a FileStateStore,
+    so unchanged pdfs aren't checked again.
+    With the same store as ApplyMetadata, pdfs it has updated aren't checked either.
     """
+    _state_store : Maybe[FileStateStore]
+
+    def __init__(self, *, workers:int=1, state:Maybe[pl.Path|FileStateStore]=None, **kwargs):
+        super().__init__(**self._file_worker_kwargs(workers, kwargs))
+        self._init_state_store(state)
 
     def transform_Entry(self, entry:Entry, library:API.Library_p) -> list[Entry]:
-        """
-        TODO remove orphan/lock field if its no longer the case
-        """
+        fields  : dict        = entry.fields_dict
+        updates : list[Field] = []
+        stale   : list[str]   = []
         match self._get_file(entry):
             case None:
-                return []
+                stale += [MAPI.ORPHANED_K, MAPI.PDF_LOCKED_K]
             case pl.Path() as x if not x.exists():
-                update = BTP.model.Field(MAPI.ORPHANED_K, True)
-                entry.set_field(update)
-            case pl.Path() as x if x.suffix == MAPI.PDF_SUFF and MAPI.PDF_LOCKED_K in entry.fields_dict:
-                pass
-            case pl.Path() as x if x.suffix == MAPI.PDF_SUFF and not self.pdf_is_modifiable(x):
-                update = BTP.model.Field(MAPI.PDF_LOCKED_K, True)
-                entry.set_field(update)
+                updates.append(BTP.model.Field(MAPI.ORPHANED_K, True))
             case pl.Path() as x if x.suffix == MAPI.PDF_SUFF:
-                update = BTP.model.Field(MAPI.PDF_LOCKED_K,  False)
-                entry.set_field(update)
-            case _:
-                return []
+                stale.append(MAPI.ORPHANED_K)
+                match self._pdf_is_locked(x, fields):
+                    case None:
+                        pass
+                    case bool() as locked:
+                        updates.append(BTP.model.Field(MAPI.PDF_LOCKED_K, locked))
+            case pl.Path():
+                stale += [MAPI.ORPHANED_K, MAPI.PDF_LOCKED_K]
 
-        return [entry]
+        stale   = [x for x in stale if x in fields]
+        updates = [x for x in updates if x.key not in fields or str(fields[x.key].value) != str(x.value)]
+        if not (bool(stale) or bool(updates)):
+            return []
+
+        for key in stale:
+            entry.pop(key)
+        for field in updates:
+            entry.set_field(field)
+        else:
+            return [entry]
+
+    def _pdf_is_locked(self, path:pl.Path, fields:dict) -> Maybe[bool]:
+        """ Check if a pdf is locked, or return None to keep the entry's existing pdf_locked field.
+        An existing field is only checked again with qpdf if the state store
+        has a result for the file from before it changed.
+        Only stored qpdf results are trusted, not the file's recorded state,
+        as ApplyMetadata records the state of files it skips without running qpdf.
+        """
+        match self._state_store:
+            case _ if MAPI.PDF_LOCKED_K not in fields:
+                return not self.cached_check(path, MAPI.QPDF_MODIFIABLE, self.pdf_is_modifiable)
+            case None:
+                return None
+            case store:
+                pass
+
+        match store.get_result(path, MAPI.QPDF_MODIFIABLE):
+            case bool() as result:
+                return not result
+            case None if not store.has_result(path, MAPI.QPDF_MODIFIABLE):
+                return None
+            case None:
+                result = self.pdf_is_modifiable(path)
+                self.record_check(path, MAPI.QPDF_MODIFIABLE, result)
+                return not result
@@ -69,7 +69,16 @@ class MetaBlock(model.Block):
 
     @classmethod
     def find_in(cls, lib:Library) -> Maybe[Self]:
-        """ Find a block of this cls in a given library """
+        """ Find a block of this cls in a given library.
+        Uses the library's index if it has one (eg: BibbleLib),
+        otherwise scans the library.
+        """
+        match lib:
+            case API.MetaIndexed_p():
+                return lib.find_meta(cls)
+            case _:
+                pass
+
         for block in lib.blocks:
             if isinstance(block, cls):
                 return block
@@ -116,3 +125,63 @@ class FailedBlock(model.MiddlewareErrorBlock):
 
         return [report]
 
+
+class CowEntry(model.Entry):
+    """ A Copy-on-Write view of an entry, used in library snapshots.
+
+    Shares its list of fields with the entry it was made from,
+    until it is first modified (by set_field, pop, [] = , del [], or assigning fields),
+    at which point it takes its own copy of the list.
+    Reading fields (by fields, get, [] etc) never copies,
+    so a snapshot costs only what middlewares actually change.
+
+    Fields themselves are always shared, so middlewares should
+    replace fields (with entry.set_field) rather than modify them,
+    or their values, in place.
+    """
+
+    @classmethod
+    def of(cls, entry:model.Entry) -> CowEntry:
+        """ Make a view of an entry, without copying its fields """
+        view                  = cls.__new__(cls)
+        view.__dict__         = entry.__dict__.copy()
+        view._parser_metadata = entry._parser_metadata.copy()
+        view._cow_owned       = False
+        return view
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, model.Entry):
+            return NotImplemented
+
+        mine   = {k:v for k,v in self.__dict__.items() if k != "_cow_owned"}
+        theirs = {k:v for k,v in other.__dict__.items() if k != "_cow_owned"}
+        return mine == theirs
+
+    @property
+    def fields(self) -> list[model.Field]:
+        return self._fields
+
+    @fields.setter
+    def fields(self, value:list[model.Field]) -> None:
+        self._cow_owned = True
+        self._fields    = value
+
+    def set_field(self, field:model.Field) -> None:
+        if not self._cow_owned and any(x is field for x in self._fields):
+            # Setting a field to itself changes nothing, so doesn't need a copy
+            return
+
+        self._cow_own()
+        super().set_field(field)
+
+    def pop(self, key:str, default=None) -> Maybe[model.Field]:
+        self._cow_own()
+        return super().pop(key, default)
+
+    def _cow_own(self) -> None:
+        """ Take a private copy of the shared fields list """
+        if self._cow_owned:
+            return
+
+        self._fields    = self._fields[:]
+        self._cow_owned = True
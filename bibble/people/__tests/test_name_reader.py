@@ -10,6 +10,8 @@ from __future__ import annotations
 # ##-- stdlib imports
 import logging as logmod
 import pathlib as pl
+import pickle
+import random
 import warnings
 # ##-- end stdlib imports
 
@@ -21,6 +23,10 @@ from bibtexparser import Library, model
 import bibble._interface as API
 from .. import NameReader
 from ..name_reader import _SplitAuthors_m, _NameToParts_m, NameParts_d
+from .._interface import AuthorIndexBlock
+from bibble.model import MetaBlock
+from bibble.util.executors import FusedExecutor
+from bibble.util.middlecore import IdenBlockMiddleware
 
 # ##-- types
 # isort: off
@@ -92,6 +98,49 @@ class TestSplitAuthors:
             case x:
                 assert(False), x
 
+class TestSplitAuthorsDifferential:
+    """ The regex splitter must give the same results as the fsm """
+
+    def test_sanity(self):
+        assert(True is not False) # noqa: PLR0133
+
+    def test_default_splitter(self):
+        assert(_SplitAuthors_m._splitter == "re")
+
+    @pytest.mark.parametrize("text", ["bob and jim", "bob AND jim", "bob  and \tjim", "bob~and~jim",
+                                      "bob and", "and jim", "bob and and jim", "bob and {jim}", "bob and }jim",
+                                      "{Simon and Schuster} and Penguin", "bob {and} jim", "{bob and jim",
+                                      "bob} and jim", "B{\\\"o}b and J\\'im", "bob \\and jim", "bob a\\xnd jim",
+                                      "bob and \\'Eve", "bob \\q and jim", "bob and\\", "\\x and y", "bobland andy"])
+    def test_matches_fsm(self, text):
+        obj = _SplitAuthors_m()
+        assert(obj._split_authors_re(text) == obj._split_authors_fsm(text))
+
+    def test_matches_fsm_fuzzed(self):
+        obj      = _SplitAuthors_m()
+        rng      = random.Random(0)
+        alphabet = " ~\taAnNdD{}\\xy,."
+        for _ in range(5_000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+            assert(obj._split_authors_re(text) == obj._split_authors_fsm(text)), repr(text)
+
+    def test_long_collaboration(self):
+        obj   = _SplitAuthors_m()
+        names = [f"Surname{i}, {{\\\"O}}. and{i}" for i in range(2_000)]
+        assert(obj._split_authors_re(" and ".join(names)) == names)
+
+    @pytest.mark.parametrize("splitter", ["re", "fsm"])
+    def test_reader_splitter(self, splitter):
+        lib = Library([model.Entry("test", "test:a", [model.Field("author", "Bill and {Bob and Co}")])])
+        mid = NameReader(parts=False, splitter=splitter)
+        mid.transform(lib)
+        assert(mid._splitter == splitter)
+        assert(lib.entries[0].fields[0].value == ["Bill", "{Bob and Co}"])
+
+    def test_reader_bad_splitter(self):
+        with pytest.raises(ValueError):
+            NameReader(splitter="bad")
+
 class TestNameToParts:
 
     def test_sanity(self):
@@ -235,6 +284,131 @@ class TestNameReader:
             case x:
                  assert(False), x
 
+class TestNameReaderCache:
+
+    def test_sanity(self):
+        assert(True is not False) # noqa: PLR0133
+
+    def test_repeated_fields_hit(self):
+        lib = Library([model.Entry("test", f"test:{i}", [model.Field("author", "Russell, Stuart and Norvig, Peter")]) for i in range(10)])
+        mid = NameReader()
+        mid.transform(lib)
+        stats = mid.parse_stats()
+        assert(stats['field_cache']['hits'] == 9)
+        assert(stats['field_cache']['misses'] == 1)
+        assert(stats['name_cache']['misses'] == 2)
+
+    def test_repeated_names_hit(self):
+        lib = Library([model.Entry("test", "test:a", [model.Field("author", "Russell, Stuart and Norvig, Peter")]),
+                       model.Entry("test", "test:b", [model.Field("editor", "Norvig, Peter")])])
+        mid = NameReader()
+        mid.transform(lib)
+        assert(mid.parse_stats()['name_cache'] == {"size": 2, "maxsize": 8192, "hits": 1, "misses": 2})
+
+    def test_entries_get_copies(self):
+        lib = Library([model.Entry("test", f"test:{i}", [model.Field("author", "Bill and Bob")]) for i in range(2)])
+        NameReader().transform(lib)
+        first, second = [x.fields[0].value for x in lib.entries]
+        assert(first[0] is not second[0])
+        first[0].last.append("Mutated")
+        assert(second[0].last == ["Bill"])
+
+    def test_split_only_cached(self):
+        lib = Library([model.Entry("test", f"test:{i}", [model.Field("author", "Bill and Bob")]) for i in range(3)])
+        mid = NameReader(parts=False)
+        mid.transform(lib)
+        assert(all(x.fields[0].value == ["Bill", "Bob"] for x in lib.entries))
+        assert(mid.parse_stats()['field_cache']['hits'] == 2)
+
+    def test_cache_size(self):
+        lib = Library([model.Entry("test", f"test:{i}", [model.Field("author", f"Bill {i}")]) for i in range(10)])
+        mid = NameReader(cache_size=4)
+        mid.transform(lib)
+        assert(len(mid._field_cache) == 4)
+        assert(len(mid._name_cache) == 4)
+
+class TestNameReaderIndex:
+
+    def test_sanity(self):
+        assert(True is not False) # noqa: PLR0133
+
+    def _library(self) -> Library:
+        return Library([model.Entry("test", "test:a", [model.Field("author", "Russell, Stuart and Norvig, Peter")]),
+                        model.Entry("test", "test:b", [model.Field("editor", "Peter Norvig"), model.Field("translator", "Bill")]),
+                        model.Entry("test", "test:c", [model.Field("title", "blah")])])
+
+    def test_no_index_by_default(self):
+        lib = NameReader().transform(self._library())
+        assert(AuthorIndexBlock.find_in(lib) is None)
+
+    def test_index_added(self):
+        lib = NameReader(index=True).transform(self._library())
+        match AuthorIndexBlock.find_in(lib):
+            case AuthorIndexBlock() as index:
+                assert(sum(isinstance(x, AuthorIndexBlock) for x in lib.blocks) == 1)
+                assert(lib.blocks[-1] is index)
+                assert(index.keys == {"test:a", "test:b", "test:c"})
+                assert(not index.is_stale(lib))
+                assert(index.lookup("norvig, peter") == {"test:a", "test:b"})
+                assert(index.lookup("russell, stuart") == {"test:a"})
+                assert("bill" not in index)
+                assert(len(index) == 2)
+            case x:
+                assert(False), x
+
+    def test_index_split_only(self):
+        lib   = NameReader(index=True, parts=False).transform(self._library())
+        index = AuthorIndexBlock.find_in(lib)
+        assert(index.lookup(NameParts_d(first=["Peter"], last=["Norvig"])) == {"test:a", "test:b"})
+        assert(lib.entries[0].fields[0].value == ["Russell, Stuart", "Norvig, Peter"])
+
+    def test_index_per_library(self):
+        mid    = NameReader(index=True)
+        first  = AuthorIndexBlock.find_in(mid.transform(self._library()))
+        lib    = Library([model.Entry("test", "test:d", [model.Field("author", "Bill")])])
+        second = AuthorIndexBlock.find_in(mid.transform(lib))
+        assert(first is not second)
+        assert(second.lookup("bill") == {"test:d"})
+        assert("bill" not in first)
+
+    def test_index_when_fused(self):
+        lib   = FusedExecutor([NameReader(index=True), IdenBlockMiddleware()], direction="read").run(self._library())
+        index = AuthorIndexBlock.find_in(lib)
+        assert(index.lookup("norvig, peter") == {"test:a", "test:b"})
+        assert([x.key for x in lib.entries] == ["test:a", "test:b", "test:c"])
+        assert(lib.blocks[-1] is index)
+
+    def test_index_after_meta_blocks(self):
+        lib   = self._library()
+        lib.add(MetaBlock(blah=True))
+        lib   = NameReader(index=True).transform(lib)
+        assert([type(x) for x in lib.blocks[-2:]] == [MetaBlock, AuthorIndexBlock])
+
+    def test_merge_index(self):
+        first  = NameReader().build_index(self._library())
+        second = NameReader().build_index(Library([model.Entry("test", "test:d", [model.Field("author", "Peter Norvig")])]))
+        first.merge(second)
+        assert(first.lookup("norvig, peter") == {"test:a", "test:b", "test:d"})
+        assert(first.keys == {"test:a", "test:b", "test:c", "test:d"})
+
+    def test_build_index(self):
+        index = NameReader().build_index(self._library())
+        assert(index.lookup("norvig, peter") == {"test:a", "test:b"})
+
+    def test_normalize(self):
+        name = NameParts_d(first=["J.~R.", "{R}."], von=["van", "der"], last=["{Tolkien}"])
+        assert(AuthorIndexBlock.normalize(name) == "van der tolkien, j. r. r.")
+
+    def test_index_pickles(self):
+        mid = NameReader(index=True)
+        mid.transform(self._library())
+        assert(pickle.loads(pickle.dumps(mid))._index_lib is None)
+
+    @pytest.mark.parametrize("kwargs", [{"authors": False, "parts": False}, {API.ALLOW_PARALLEL_K: True}])
+    def test_bad_index_args(self, kwargs):
+        with pytest.raises(ValueError):
+            NameReader(index=True, **kwargs)
+
     @pytest.mark.skip
     def test_todo(self):
         pass
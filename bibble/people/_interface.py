@@ -25,6 +25,9 @@ import atexit # for @atexit.register
 import faulthandler
 # ##-- end stdlib imports
 
+from bibble.model import MetaBlock
+from bibble.util.name_parts import NameParts_d
+
 # ##-- types
 # isort: off
 import abc
@@ -47,6 +50,8 @@ if TYPE_CHECKING:
     from collections.abc import Iterable, Iterator, Callable, Generator
     from collections.abc import Sequence, Mapping, MutableMapping, Hashable
 
+    from bibtexparser.library import Library
+
 ##--|
 
 # isort: on
@@ -63,10 +68,93 @@ AUTHOR_K : Final[str] = "author"
 EDITOR_K : Final[str] = "editor"
 JOIN_STR : Final[str] = " and "
 
+CACHE_SIZE_K    : Final[str] = "cache_size"
+NAME_CACHE_SIZE : Final[int] = 8192
+
+INDEX_K         : Final[str]             = "index"
+INDEX_FIELDS    : Final[tuple[str, ...]] = (AUTHOR_K, EDITOR_K)
+INDEX_STRIP_RE  : Final[re.Pattern]      = re.compile(r"[{}]")
+INDEX_WS_RE     : Final[re.Pattern]      = re.compile(r"[\s~]+")
+
 NAME_WHITESPACE : Final[set] = set(" ~\r\n\t")
 
+SPLITTER_K       : Final[str]             = "splitter"
+SPLITTERS        : Final[tuple[str, ...]] = ("re", "fsm")
+# Escapes are transparent to splitting, so are removed before scanning
+NAME_ESCAPE_RE   : Final[re.Pattern]      = re.compile(r"\\[\s\S]?")
+# Braces, and 'and' between whitespace, followed by the start of the next name.
+# A close brace after the 'and' cancels it.
+NAME_SPLIT_RE    : Final[re.Pattern]      = re.compile(r"(?P<sep>[ ~\r\n\t]+[aA][nN][dD][ ~\r\n\t]+(?=[^ ~\r\n\t}]))|(?P<open>{)|(?P<close>})")
+
 # Body:
 
+class AuthorIndexBlock(MetaBlock):
+    """ A Block to store which entries people appear in, built by NameReader(index=True).
+
+    Maps normalized names (see AuthorIndexBlock.normalize) -> entry keys.
+    The keys are those of entries when they were indexed,
+    so if later middlewares change keys (eg: KeyLocker), or add or remove entries,
+    the index is stale (see AuthorIndexBlock.is_stale).
+    """
+
+    def __init__(self, *, fields:Iterable[str]=INDEX_FIELDS):
+        super().__init__()
+        self.fields : set[str]             = set(fields)
+        self.index  : dict[str, set[str]]  = {}
+        self.keys   : set[str]             = set()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, name:str|NameParts_d) -> bool:
+        return self._as_key(name) in self.index
+
+    @staticmethod
+    def normalize(name:NameParts_d) -> str:
+        """ 'von last, first', casefolded, without braces or repeated whitespace """
+        last  = " ".join([*name.von, *name.last])
+        match " ".join(name.first):
+            case "":
+                text = last
+            case first:
+                text = f"{last}, {first}"
+
+        text = INDEX_STRIP_RE.sub("", text)
+        return INDEX_WS_RE.sub(" ", text).strip().casefold()
+
+    def add(self, name:NameParts_d, key:str) -> None:
+        self.index.setdefault(self.normalize(name), set()).add(key)
+
+    def add_entry(self, key:str) -> None:
+        """ Record an indexed entry, whether or not it has any people """
+        self.keys.add(key)
+
+    def merge(self, other:AuthorIndexBlock) -> None:
+        """ Add the names and keys of another index (eg: of another file) to this one """
+        self.fields.update(other.fields)
+        self.keys.update(other.keys)
+        for name, keys in other.index.items():
+            self.index.setdefault(name, set()).update(keys)
+
+    def is_stale(self, library:Library) -> bool:
+        """ Test if the library's entry keys differ from those that were indexed """
+        return self.keys != {x.key for x in library.entries}
+
+    def lookup(self, name:str|NameParts_d) -> set[str]:
+        """ Get the keys of entries a name appears in.
+        Takes a NameParts_d, or an already normalized name.
+        """
+        return self.index.get(self._as_key(name), set())
+
+    def _as_key(self, name:str|NameParts_d) -> str:
+        match name:
+            case NameParts_d():
+                return self.normalize(name)
+            case str():
+                return name
+            case x:
+                raise TypeError(type(x))
+
 class NameSplitState_e(enum.IntEnum):
     start_ws  = enum.auto()
     end_ws    = enum.auto()
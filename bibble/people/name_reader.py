@@ -8,6 +8,7 @@ See EOF for license/metadata/notes as applicable
 from __future__ import annotations
 
 # ##-- stdlib imports
+import bisect
 import datetime
 import enum
 import functools as ftz
@@ -34,6 +35,7 @@ from jgdv import Mixin, Proto
 
 # ##-- 1st party imports
 import bibble._interface as API
+from bibble.util.cache import BoundedCache
 from bibble.util.mixins import FieldMatcher_m
 from bibble.util.middlecore import IdenBlockMiddleware
 from bibble.util.name_parts import NameParts_d
@@ -89,13 +91,79 @@ class _SplitAuthors_m:
     'and's within braces are returned un modified.
     eg: '{Simon and Schuster}' -> ['{Simon and Schuster}']
 
+    The splitter is selected by _splitter:
+    - re  : scans for braces and separators with a single regex (the default).
+    - fsm : steps through each character.
+    Both give the same results.
     """
+    _splitter : str = "re"
 
     def _build_split_parser(self) -> Parser:
         return pp.Literal("and")
 
     def _split_authors(self, val:str, *, strict=True) -> list[str]:
-        return self._split_authors_fsm(val, strict=strict)
+        match self._splitter:
+            case "re":
+                return self._split_authors_re(val, strict=strict)
+            case "fsm":
+                return self._split_authors_fsm(val, strict=strict)
+            case x:
+                raise ValueError("Unknown author splitter", x)
+
+    def _split_authors_re(self, val:str, *, strict=True) -> list[str]:
+        """ Split on the separators found by API_N.NAME_SPLIT_RE outside of braces.
+
+        As the fsm skips escapes without changing state,
+        they are removed before scanning, and positions are mapped back to the original string.
+        """
+        val = val.strip()
+        if not bool(val):
+            return []
+
+        if "\\" in val:
+            text, to_val = self._remove_escapes(val)
+        else:
+            text, to_val = val, None
+
+        bracelevel = 0
+        bounds     = [0]
+        for match in API_N.NAME_SPLIT_RE.finditer(text):
+            match match.lastgroup:
+                case "open":
+                    bracelevel += 1
+                case "close" if bracelevel:
+                    bracelevel -= 1
+                case "sep" if not bracelevel and to_val is None:
+                    bounds += [match.start(), match.end()]
+                case "sep" if not bracelevel:
+                    bounds += [to_val(match.start()), to_val(match.end())]
+                case _:
+                    pass
+        else:
+            bounds.append(None)
+            return [val[start:end] for start, end in zip(bounds[::2], bounds[1::2], strict=True)]
+
+    @staticmethod
+    def _remove_escapes(val:str) -> tuple[str, Callable[[int], int]]:
+        """ Remove escapes from val,
+        returning the remaining text and a function from its positions to positions of val
+        """
+        parts   = []
+        starts  = [0]
+        offsets = [0]
+        last    = 0
+        for esc in API_N.NAME_ESCAPE_RE.finditer(val):
+            parts.append(val[last:esc.start()])
+            last = esc.end()
+            starts.append(esc.start() - offsets[-1])
+            offsets.append(offsets[-1] + len(esc.group()))
+        else:
+            parts.append(val[last:])
+
+        def to_val(pos:int) -> int:
+            return pos + offsets[bisect.bisect_right(starts, pos) - 1]
+
+        return "".join(parts), to_val
 
     def _split_authors_pp(self, val:str, *, strict=True) -> list[str]:
         """
@@ -491,21 +559,53 @@ class _NameToParts_m:
 @Mixin(FieldMatcher_m, _SplitAuthors_m, _NameToParts_m)
 class NameReader(IdenBlockMiddleware):
     """ A Refactored version of bibtexparser's SplitNameParts and SeparateCoAuthors
+
+    Parsed fields and names are kept in bounded caches (of 'cache_size', default 8192),
+    as the same author strings repeat across a library.
+    Cached names are stored as immutable tuples, and fields are given copies of their NameParts_d.
+
+    With index=True, an AuthorIndexBlock of the authors and editors of entries
+    is appended to the library, like other MetaBlocks.
     """
     _whitelist = ("author", "editor", "translator")
 
-    def __init__(self, *, parts:bool=True, authors:bool=True,  **kwargs):
+    def __init__(self, *, parts:bool=True, authors:bool=True, index:bool=False, **kwargs):
+        cache_size = kwargs.pop(API_N.CACHE_SIZE_K, API_N.NAME_CACHE_SIZE)
+        splitter   = kwargs.pop(API_N.SPLITTER_K, self._splitter)
         super().__init__(**kwargs)
+        if splitter not in API_N.SPLITTERS:
+            raise ValueError("Unknown author splitter", splitter)
+
+        self._splitter      = splitter
         self._do_split_authors = authors
         self._do_name_parts = parts
+        self._do_index      = index
+        self._author_index  = None
+        self._index_lib     = None
+        self._field_cache   = BoundedCache(cache_size)
+        self._name_cache    = BoundedCache(cache_size)
         self.set_field_matchers(white=self._whitelist, black=[])
         if self._do_name_parts and not self._do_split_authors:
             raise ValueError("Can't generate name parts if you don't split authors")
+        if self._do_index and not self._do_split_authors:
+            raise ValueError("Can't index authors if you don't split authors")
+        if self._do_index and self.allow_parallel:
+            raise ValueError("Can't build an author index in parallel")
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        # A weakref, so can't be pickled
+        state['_index_lib'] = None
+        return state
 
     def on_read(self):
         Never()
 
-    def transform_Entry(self, entry:Entry, library:Library) -> list[Entry]:
+    def transform_Entry(self, entry:Entry, library:Library) -> list[Block]:
+        if self._do_index:
+            self._start_index(library)
+            self._author_index.add_entry(entry.key)
+
         match self.match_on_fields(entry, library):
             case model.Entry() as x:
                 return [x]
@@ -518,21 +618,80 @@ class NameReader(IdenBlockMiddleware):
         result = []
         match self._do_split_authors:
             case True:
-                authors = self._split_authors(field.value)
+                authors = self._field_cache.get_or_make(field.value, self._read_names)
             case False:
                 authors = field.value
             case x:
                 raise TypeError(type(x))
 
+        if self._do_index and field.key.lower() in self._author_index.fields:
+            self._index_names(self._author_index, authors, entry.key)
+
         match authors:
             case str():
                 pass
             case [*xs] if self._do_name_parts:
-                parts = [self._name_to_parts(x) for x in xs]
-                result.append(model.Field(field.key, parts))
+                result.append(model.Field(field.key, [x.copy() for x in xs]))
             case [*xs]:
                 result.append(model.Field(field.key, list(xs)))
             case x:
                 raise TypeError(type(x))
 
         return result
+
+    def _read_names(self, val:str) -> tuple[str|NameParts_d, ...]:
+        """ Split a field into its names, and those into their parts, for the field cache """
+        names = self._split_authors(val)
+        if not self._do_name_parts:
+            return tuple(names)
+
+        return tuple(self._name_cache.get_or_make(x, self._name_to_parts) for x in names)
+
+    def _start_index(self, library:Library) -> None:
+        """ Start a new index the first time an entry of a library is transformed,
+        and append it to the library.
+        The block loop iterates the library's blocks, so it reaches the index last,
+        and keeps it at the end.
+        """
+        match self._index_lib:
+            case weakref.ref() as lib_ref if lib_ref() is library:
+                pass
+            case _:
+                self._author_index = API_N.AuthorIndexBlock()
+                self._index_lib    = weakref.ref(library)
+                library.add(self._author_index)
+
+    def _index_names(self, index:API_N.AuthorIndexBlock, names:Iterable[str|NameParts_d], key:str) -> None:
+        for name in names:
+            match name:
+                case NameParts_d():
+                    index.add(name, key)
+                case str():
+                    index.add(self._name_cache.get_or_make(name, self._name_to_parts), key)
+                case x:
+                    raise TypeError(type(x))
+
+    def build_index(self, library:Library) -> API_N.AuthorIndexBlock:
+        """ Index the authors and editors of a library's entries, without changing them.
+        Their names can be unsplit, split, or NameParts_d.
+        """
+        index = API_N.AuthorIndexBlock()
+        for entry in library.entries:
+            index.add_entry(entry.key)
+            for field in entry.fields:
+                if field.key.lower() not in index.fields:
+                    continue
+
+                match field.value:
+                    case str() as val:
+                        self._index_names(index, self._field_cache.get_or_make(val, self._read_names), entry.key)
+                    case [*xs]:
+                        self._index_names(index, xs, entry.key)
+                    case x:
+                        raise TypeError(type(x))
+        else:
+            return index
+
+    def parse_stats(self) -> dict:
+        """ The hit/miss counts of the field and name caches """
+        return {"field_cache": self._field_cache.stats(), "name_cache": self._name_cache.stats()}
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# ruff: noqa: ANN201, ARG001, ANN001, ARG002, ANN202
+
+# Imports
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import warnings
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+# ##-- end 3rd party imports
+
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ..cache import BoundedCache
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+# from dataclasses import InitVar, dataclass, field
+# from pydantic import BaseModel, Field, model_validator, field_validator, ValidationError
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+
+
+# Body:
+
+class _YieldingKey:
+    """ A key which lets other threads run while it is hashed,
+    to widen the window for races in the cache
+    """
+
+    def __init__(self, val:int) -> None:
+        self.val = val
+
+    def __hash__(self) -> int:
+        time.sleep(0)
+        return hash(self.val)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _YieldingKey) and self.val == other.val
+
+
+class TestBoundedCache:
+
+    def test_sanity(self):
+        assert(True is not False) # noqa: PLR0133
+
+    def test_ctor(self):
+        match BoundedCache(10):
+            case BoundedCache() as x:
+                assert(x.maxsize == 10)
+                assert(len(x) == 0)
+            case x:
+                 assert(False), x
+
+    def test_miss_then_hit(self):
+        cache = BoundedCache(10)
+        calls = []
+        assert(cache.get_or_make("a", lambda x: calls.append(x) or x.upper()) == "A")
+        assert(cache.get_or_make("a", lambda x: calls.append(x) or x.upper()) == "A")
+        assert(calls == ["a"])
+        assert(cache.stats() == {"size": 1, "maxsize": 10, "hits": 1, "misses": 1})
+
+    def test_evicts_least_recent(self):
+        cache = BoundedCache(2)
+        cache.get_or_make("a", str.upper)
+        cache.get_or_make("b", str.upper)
+        cache.get_or_make("a", str.upper)
+        cache.get_or_make("c", str.upper)
+        assert("a" in cache)
+        assert("b" not in cache)
+        assert("c" in cache)
+
+    def test_errors_not_cached(self):
+        cache = BoundedCache(2)
+        match cache.get_or_make("a", ValueError):
+            case ValueError():
+                assert("a" not in cache)
+            case x:
+                 assert(False), x
+
+    def test_disabled(self):
+        cache = BoundedCache(0)
+        assert(cache.get_or_make("a", str.upper) == "A")
+        assert(len(cache) == 0)
+
+    def test_clear(self):
+        cache = BoundedCache(2)
+        cache.get_or_make("a", str.upper)
+        cache.clear()
+        assert(cache.stats() == {"size": 0, "maxsize": 2, "hits": 0, "misses": 0})
+
+    def test_pickle_keeps_size_only(self):
+        cache = BoundedCache(5)
+        cache.get_or_make("a", str.upper)
+        copied = pickle.loads(pickle.dumps(cache))
+        assert(copied.maxsize == 5)
+        assert(len(copied) == 0)
+
+    def test_items_and_update(self):
+        cache = BoundedCache(2)
+        cache.get_or_make("a", str.upper)
+        cache.get_or_make("b", str.upper)
+        other = BoundedCache(2)
+        other.update(cache.items())
+        assert(other.items() == [("a", "A"), ("b", "B")])
+        assert(other.stats()['misses'] == 0)
+        other.update([("c", "C")])
+        assert(other.items() == [("b", "B"), ("c", "C")])
+
+    def test_threaded(self):
+        cache   = BoundedCache(4)
+        calls   = 500
+        workers = 8
+        keys    = [_YieldingKey(x) for x in range(12)]
+
+        def hammer(offset:int) -> list[str]:
+            return [cache.get_or_make(keys[(i * 7 + offset) % len(keys)], str) for i in range(calls)]
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(hammer, range(workers)))
+
+        stats = cache.stats()
+        assert(all(len(x) == calls for x in results))
+        assert(stats['hits'] + stats['misses'] == calls * workers)
+        assert(len(cache) <= 4)
+
+    @pytest.mark.skip
+    def test_todo(self):
+        pass
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+A small bounded LRU cache, with hit/miss counters,
+for memoizing the string transforms of middlewares.
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import itertools as itz
+import logging as logmod
+import pathlib as pl
+import re
+import threading
+import time
+import types
+from collections import OrderedDict
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+DEFAULT_CACHE_SIZE : Final[int] = 4096
+# Body:
+
+class BoundedCache:
+    """ A least recently used cache of at most 'maxsize' values.
+
+    Use get_or_make(key, fn), which only calls fn(key) on a miss.
+    Results fn marks as uncacheable (ie: exceptions) are returned, but not stored.
+    A maxsize of 0 disables caching.
+
+    Caches are shared by the threads of thread pools, so access is locked.
+    fn is called outside of the lock, so threads can make values concurrently,
+    (and may both make the same value).
+    """
+    __slots__ = ("_data", "_lock", "maxsize", "hits", "misses")
+
+    _data   : OrderedDict
+    _lock   : threading.Lock
+    maxsize : int
+    hits    : int
+    misses  : int
+
+    def __init__(self, maxsize:int=DEFAULT_CACHE_SIZE) -> None:
+        self._data   = OrderedDict()
+        self._lock   = threading.Lock()
+        self.maxsize = maxsize
+        self.hits    = 0
+        self.misses  = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} : {len(self._data)}/{self.maxsize} : hits {self.hits}, misses {self.misses}>"
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key:Hashable) -> bool:
+        return key in self._data
+
+    def __getstate__(self) -> dict:
+        """ Pickled caches keep their size, but not their contents or counters """
+        return {"maxsize": self.maxsize}
+
+    def __setstate__(self, state:dict) -> None:
+        self.__init__(state['maxsize'])
+
+    def get_or_make(self, key:Hashable, fn:Callable[[Any], Any]) -> Any:
+        """ Get the cached value for key, or make, store and return it """
+        data = self._data
+        with self._lock:
+            try:
+                val = data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                data.move_to_end(key)
+                return val
+
+        match fn(key):
+            case Exception() as err:
+                return err
+            case val if 0 < self.maxsize:
+                with self._lock:
+                    data[key] = val
+                    data.move_to_end(key)
+                    while self.maxsize < len(data):
+                        data.popitem(last=False)
+                return val
+            case val:
+                return val
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        """ The cached (key, value) pairs, from least to most recently used """
+        with self._lock:
+            return list(self._data.items())
+
+    def update(self, items:Iterable[tuple[Hashable, Any]]) -> None:
+        """ Store (key, value) pairs, without counting them as misses """
+        data = self._data
+        with self._lock:
+            for key, val in items:
+                data[key] = val
+                data.move_to_end(key)
+            else:
+                while self.maxsize < len(data):
+                    data.popitem(last=False)
+
+    def clear(self) -> None:
+        """ Empty the cache and reset the counters """
+        with self._lock:
+            self._data.clear()
+            self.hits   = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
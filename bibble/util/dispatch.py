@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Flat block type -> handler tables,
+used by middlewares to find their transforms, and by writers to find their visitors.
+
+Handlers are resolved by a function, once per concrete block type,
+so dispatching a block is a single dict lookup.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import itertools as itz
+import logging as logmod
+import pathlib as pl
+import re
+import time
+import types
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+from bibtexparser import model
+from bibble.model import MetaBlock, FailedBlock, CowEntry
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+    type Block = model.Block
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+KNOWN_BLOCK_TYPES : Final[tuple[type, ...]] = (
+    model.Entry,
+    CowEntry,
+    model.String,
+    model.Preamble,
+    model.ExplicitComment,
+    model.ImplicitComment,
+    model.ParsingFailedBlock,
+    model.DuplicateBlockKeyBlock,
+    model.DuplicateFieldKeyBlock,
+    model.MiddlewareErrorBlock,
+    FailedBlock,
+    MetaBlock,
+)
+# Body:
+
+class DispatchTable(dict):
+    """ A dict of block type -> handler (or None).
+
+    The table is filled for the known block types on creation.
+    Other types are resolved the first time they are looked up,
+    so use as: table[type(block)]
+    """
+    __slots__ = ("_resolve",)
+
+    def __init__(self, resolve:Callable[[type], Maybe[Callable]], *, block_types:Iterable[type]=KNOWN_BLOCK_TYPES) -> None:
+        super().__init__()
+        self._resolve = resolve
+        for cls in block_types:
+            self[cls] = resolve(cls)
+
+    def __missing__(self, cls:type) -> Maybe[Callable]:
+        self[cls] = (handler:=self._resolve(cls))
+        return handler
+
+    def __reduce__(self) -> tuple:
+        """ Copies and unpickles are rebuilt from the resolver, instead of copying handlers """
+        return (type(self), (self._resolve,))
+
+##--|
+
+def resolve_by_mro(obj:Any, prefix:str, cls:type) -> Maybe[Callable]:
+    """ Find the first attribute of obj named {prefix}{Type},
+    for the types of cls's mro, from most -> least specific
+    """
+    for x in cls.mro():
+        match getattr(obj, f"{prefix}{x.__name__}", None):
+            case None:
+                continue
+            case handler:
+                return handler
+    else:
+        return None
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Executors for running middlewares over a library.
+
+The FusedExecutor takes a run of consecutive adaptive block middlewares,
+and pushes each block through all of them in a single pass,
+so the library only has to be rebuilt once for the whole run.
+
+The ParallelExecutor does the same for middlewares which allow parallel execution,
+but shards the library's blocks across a process (or thread) pool.
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import itertools as itz
+import logging as logmod
+import pathlib as pl
+import re
+import time
+import types
+import collections
+import contextlib
+import hashlib
+from copy import deepcopy
+from uuid import UUID, uuid1
+from weakref import ref
+import atexit # for @atexit.register
+import faulthandler
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+# ##-- end stdlib imports
+
+import tqdm
+import bibble._interface as API
+from bibtexparser.library import Library
+from bibtexparser import model
+from bibble.model import MetaBlock
+from .middlecore import _BaseMiddleware, IdenBlockMiddleware, IdenBidiMiddleware
+from .snapshot import snapshot_library
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+    type Block      = model.Block
+    type Middleware = API.Middleware
+    type BlockFn    = Callable[[Block, Library], list[Block]]
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+READ_DIR            : Final[str] = "read"
+WRITE_DIR           : Final[str] = "write"
+PROCESS_POOL        : Final[str] = "process"
+THREAD_POOL         : Final[str] = "thread"
+SHARDS_PER_WORKER   : Final[int] = 4
+PARALLEL_MIN_BLOCKS : Final[int] = 256
+
+_worker_state       : dict       = {}
+# Body:
+
+def _init_worker(middlewares:list[Middleware], direction:str, context:Library) -> None:
+    """ Process pool initializer.
+    Receives the middlewares and a context library once per worker,
+    the blocks are sent with each shard.
+    """
+    _worker_state['fused']   = FusedExecutor(middlewares, direction=direction)
+    _worker_state['library'] = context
+
+def _run_shard(shard:list[Block]) -> list[Block]:
+    """ Run a shard of blocks through the worker's fused middlewares """
+    fused   = _worker_state['fused']
+    library = _worker_state['library']
+    return [y for x in shard for y in fused.run_block(x, library)]
+
+##--|
+
+class FusedExecutor:
+    """ Runs consecutive block level middlewares as a single pass.
+
+    Each block is pushed through the chosen transform of every middleware in turn,
+    and the library is rebuilt once at the end, instead of once per middleware.
+
+    Only middlewares which use the default block loop can be fused,
+    (see FusedExecutor.can_fuse). Library level middlewares,
+    like EntrySorter or DuplicateKeyHandler, need to be run on their own.
+
+    Runners call every member's handle_meta_entry before the fused pass.
+    So a middleware with its own hook (see FusedExecutor.has_meta_hook), like PathWriter,
+    is only fused as the first of a run, where its hook still sees
+    the library as transformed by the middlewares before it.
+
+    'direction' is the direction bidirectional middlewares are run in,
+    ie: 'read' or 'write'.
+    """
+    _middlewares : list[Middleware]
+    _chain       : list[BlockFn]
+    _direction   : str
+
+    @staticmethod
+    def can_fuse(middleware:Middleware, *, direction:str) -> bool:
+        """ Test whether a middleware only relies on the default block loop,
+        and so can be run as part of a fused pass.
+        """
+        cls = type(middleware)
+        match middleware:
+            case IdenBlockMiddleware():
+                return cls.transform is IdenBlockMiddleware.transform
+            case IdenBidiMiddleware() if direction == READ_DIR:
+                return cls.read_transform is IdenBidiMiddleware.read_transform
+            case IdenBidiMiddleware() if direction == WRITE_DIR:
+                return cls.write_transform is IdenBidiMiddleware.write_transform
+            case _:
+                return False
+
+    @staticmethod
+    def has_meta_hook(middleware:Middleware) -> bool:
+        """ Test whether a middleware overrides handle_meta_entry,
+        or for bidirectional middlewares, whether its reader or writer does.
+        """
+        base = _BaseMiddleware.handle_meta_entry
+        match middleware:
+            case IdenBidiMiddleware() if type(middleware).handle_meta_entry is IdenBidiMiddleware.handle_meta_entry:
+                parts = [x for x in (middleware._reader, middleware._writer) if x is not None]
+                return any(FusedExecutor.has_meta_hook(x) for x in parts)
+            case _:
+                return getattr(type(middleware), "handle_meta_entry", base) is not base
+
+    def __init__(self, middlewares:list[Middleware], *, direction:str) -> None:
+        if not all(self.can_fuse(x, direction=direction) for x in middlewares):
+            raise TypeError("Tried to fuse middlewares which can't be fused", middlewares)
+
+        self._middlewares = middlewares
+        self._direction   = direction
+        self._chain       = []
+        for mw in middlewares:
+            match mw:
+                case IdenBlockMiddleware():
+                    self._chain.append(mw._run_block)
+                case IdenBidiMiddleware():
+                    self._chain.append(ftz.partial(mw._run_dispatch, mw._dispatch[direction]))
+
+    def __len__(self) -> int:
+        return len(self._middlewares)
+
+    def run(self, library:Library) -> Library:
+        """ Run all the fused middlewares over the library in one pass """
+        library, iterator = self._get_lib_iterator(library)
+        blocks = []
+        for _, block in iterator:
+            blocks += self.run_block(block, library)
+        else:
+            # Remove the old blocks
+            library.remove(library.blocks[:])
+            # Add the new blocks
+            library.add(blocks)
+            return library
+
+    def run_block(self, block:Block, library:Library) -> list[Block]:
+        """ Push a single block through the chain of middlewares,
+        returning the resulting blocks
+        """
+        current = [block]
+        for fn in self._chain:
+            match current:
+                case []: # The block has been removed
+                    return current
+                case [x]:
+                    current = fn(x, library)
+                case [*xs]:
+                    current = [y for x in xs for y in fn(x, library)]
+        else:
+            return current
+
+    def _get_lib_iterator(self, library:Library) -> tuple[Library, Iterator[tuple[int, Block]]]:
+        """ Copy the library if any of the middlewares disallow inplace modification,
+        and wrap the block loop in a progress bar if any of them ask for it.
+        """
+        if not all(x.allow_inplace for x in self._middlewares):
+            library = snapshot_library(library)
+
+        match [x for x in self._middlewares if x._extra.get("tqdm", False)]:
+            case [_, *_] if sys.stdout.isatty():
+                names    = ", ".join(type(x).__name__ for x in self._middlewares)
+                iterator = tqdm.tqdm(enumerate(library.blocks),
+                                     desc=f"Fused[{names}]",
+                                     total=len(library.blocks),
+                                     ncols=API.TQDM_WIDTH)
+            case _:
+                iterator = enumerate(library.blocks)
+
+        return library, iterator
+
+class ParallelExecutor:
+    """ Runs block level middlewares which allow parallel execution
+    (ie: were passed API.ALLOW_PARALLEL_K=True) over shards of the library's blocks.
+
+    The blocks are split into ordered shards, each shard is pushed through
+    the middlewares as a FusedExecutor would, in a worker pool,
+    and the results are merged back in the original order.
+    Blocks a middleware doesn't transform (eg: failed blocks) pass through unchanged.
+
+    The pool is either a 'process' pool (the default, for cpu bound middlewares),
+    or a 'thread' pool (for io bound middlewares),
+    chosen by a middleware's API.PARALLEL_POOL_K kwarg.
+    The number of workers defaults to os.cpu_count, or API.PARALLEL_WORKERS_K.
+
+    Each job is a shard of 'shard_size' (or API.PARALLEL_SHARD_K) blocks,
+    which defaults to splitting the library into SHARDS_PER_WORKER shards for each worker.
+
+    In a process pool, middlewares are copies,
+    so any state a middleware accumulates while transforming is not sent back.
+    Each worker is only sent its shards, and transforms them against a context library
+    of the library's strings and metablocks, not the full library.
+    Libraries smaller than 'min_blocks' are run in the current process.
+
+    A thread pool is for middlewares which wait on io (eg: subprocesses),
+    so any library of more than one block uses the pool.
+    Pass a small 'shard_size' to spread slow blocks across its workers.
+    """
+    _fused      : FusedExecutor
+    _pool       : str
+    _workers    : int
+    _min_blocks : int
+    _shard_size : Maybe[int]
+
+    @staticmethod
+    def can_parallelize(middleware:Middleware, *, direction:str) -> bool:
+        """ Test whether a middleware can be run by a ParallelExecutor """
+        return bool(middleware.allow_parallel) and FusedExecutor.can_fuse(middleware, direction=direction)
+
+    @staticmethod
+    def pool_kind(middleware:Middleware) -> str:
+        """ Get the kind of pool a middleware wants to run in """
+        match middleware._extra.get(API.PARALLEL_POOL_K, PROCESS_POOL):
+            case str() as x if x in (PROCESS_POOL, THREAD_POOL):
+                return x
+            case x:
+                raise ValueError("Unknown parallel pool kind", x)
+
+    def __init__(self, middlewares:list[Middleware], *, direction:str, workers:Maybe[int]=None, min_blocks:int=PARALLEL_MIN_BLOCKS, shard_size:Maybe[int]=None) -> None:
+        if not all(self.can_parallelize(x, direction=direction) for x in middlewares):
+            raise TypeError("Tried to parallelize middlewares which don't allow it", middlewares)
+
+        match list({self.pool_kind(x) for x in middlewares}):
+            case [x]:
+                self._pool = x
+            case []:
+                self._pool = PROCESS_POOL
+            case xs:
+                raise ValueError("Parallel middlewares disagree on the pool to use", xs)
+
+        requested        = [x._extra[API.PARALLEL_WORKERS_K] for x in middlewares if API.PARALLEL_WORKERS_K in x._extra]
+        self._fused      = FusedExecutor(middlewares, direction=direction)
+        self._workers    = max(1, workers or min(requested, default=None) or os.cpu_count() or 1)
+        self._min_blocks = min_blocks
+        sizes            = [x._extra[API.PARALLEL_SHARD_K] for x in middlewares if API.PARALLEL_SHARD_K in x._extra]
+        self._shard_size = min(sizes, default=None) if shard_size is None else shard_size
+        if self._shard_size is not None and self._shard_size < 1:
+            raise ValueError("Parallel shards need at least one block", self._shard_size)
+
+    def __len__(self) -> int:
+        return len(self._fused)
+
+    @property
+    def _middlewares(self) -> list[Middleware]:
+        return self._fused._middlewares
+
+    @property
+    def _direction(self) -> str:
+        return self._fused._direction
+
+    def run(self, library:Library) -> Library:
+        """ Run the middlewares over shards of the library in a pool,
+        then rebuild the library once, in the original block order.
+        """
+        match len(library.blocks):
+            case _ if self._workers < 2:
+                return self._fused.run(library)
+            case x if x < 2:
+                return self._fused.run(library)
+            case x if self._pool == PROCESS_POOL and x < self._min_blocks:
+                return self._fused.run(library)
+            case _:
+                pass
+
+        if not all(x.allow_inplace for x in self._middlewares):
+            library = snapshot_library(library)
+
+        shards = self._shard(library.blocks)
+        match self._pool:
+            case "process":
+                pool = ProcessPoolExecutor(max_workers=self._workers,
+                                           initializer=_init_worker,
+                                           initargs=(self._middlewares, self._direction, self._context(library)))
+                fn   = _run_shard
+            case "thread":
+                pool = ThreadPoolExecutor(max_workers=self._workers)
+                fn   = ftz.partial(self._run_shard_local, library=library)
+            case x:
+                raise ValueError("Unknown parallel pool kind", x)
+
+        with pool:
+            results = self._wrap_progress(pool.map(fn, shards), total=len(shards))
+            blocks  = [y for shard in results for y in shard]
+
+        # Remove the old blocks
+        library.remove(library.blocks[:])
+        # Add the new blocks
+        library.add(blocks)
+        return library
+
+    def _shard(self, blocks:list[Block]) -> list[list[Block]]:
+        """ Split blocks into ordered shards of 'shard_size' blocks,
+        or into roughly equal shards, SHARDS_PER_WORKER for each worker.
+        """
+        match self._shard_size:
+            case int() as size:
+                pass
+            case None:
+                count = min(len(blocks), self._workers * SHARDS_PER_WORKER)
+                size  = -(-len(blocks) // count)
+
+        return [blocks[i:i+size] for i in range(0, len(blocks), size)]
+
+    def _context(self, library:Library) -> Library:
+        """ Build the library process pool workers transform their shards against.
+        Holds the library's strings and metablocks, but not its entries,
+        so the library isn't copied to every worker.
+        """
+        return Library([x for x in library.blocks if isinstance(x, model.String|MetaBlock)])
+
+    def _run_shard_local(self, shard:list[Block], *, library:Library) -> list[Block]:
+        return [y for x in shard for y in self._fused.run_block(x, library)]
+
+    def _wrap_progress(self, results:Iterator[list[Block]], *, total:int) -> Iterator[list[Block]]:
+        match [x for x in self._middlewares if x._extra.get("tqdm", False)]:
+            case [_, *_] if sys.stdout.isatty():
+                names = ", ".join(type(x).__name__ for x in self._middlewares)
+                return tqdm.tqdm(results,
+                                 desc=f"Parallel[{names}]",
+                                 total=total,
+                                 ncols=API.TQDM_WIDTH)
+            case _:
+                return results
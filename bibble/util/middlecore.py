@@ -24,12 +24,15 @@ from uuid import UUID, uuid1
 from weakref import ref
 import atexit # for @atexit.register
 import faulthandler
+import importlib
 import sys
 # ##-- end stdlib imports
 
 import tqdm
 import bibble._interface as API
 from bibble.model import MetaBlock
+from bibble.util.snapshot import snapshot_library
+from bibble.util.dispatch import DispatchTable, resolve_by_mro
 import jgdv
 from jgdv._abstract.protocols.general import DILogger_p
 from jgdv import Proto
@@ -57,6 +60,7 @@ if TYPE_CHECKING:
     from collections.abc import Sequence, Mapping, MutableMapping, Hashable
 
     type Logger          = logmod.Logger
+    type Middleware      = API.Middleware
     type Block           = model.Block
     type Entry           = model.Entry
     type String          = model.String
@@ -73,9 +77,14 @@ logging = logmod.getLogger(__name__)
 ##-- end logging
 
 # Vars:
-
+GEN_CLASS_RE : Final[re.Pattern] = re.compile(r"<.+>$")
 # Body:
 
+def _rebuild_middleware(module:str, name:str) -> Middleware:
+    """ Unpickling helper for middlewares, see _BaseMiddleware.__reduce__ """
+    cls = getattr(importlib.import_module(module), name)
+    return cls.__new__(cls)
+
 @Proto(DILogger_p)
 class _BaseMiddleware:
     """
@@ -84,10 +93,12 @@ class _BaseMiddleware:
     stores allow_inplace and allow_parallel
     and can have an injected logger.
 
-    Any extra init kwargs are stored in _extra
+    Any extra init kwargs are stored in _extra,
+    and the constructor's args are recorded as its config (see cache_config)
     """
     allow_inplace : bool
     allow_parallel : bool
+    _ctor_config   : tuple[tuple, dict]
 
     @classmethod
     def metadata_key(cls) -> str:
@@ -96,6 +107,12 @@ class _BaseMiddleware:
         """
         return f"bibble-{cls.__name__}"
 
+    def __new__(cls, *args:Any, **kwargs:Any) -> Self:
+        """ Records the constructor's args, see cache_config """
+        obj = super().__new__(cls)
+        obj._ctor_config = (args, {k:v for k,v in kwargs.items() if k != API.LOGGER_K})
+        return obj
+
     def __init__(self, **kwargs):
         """
 
@@ -107,15 +124,55 @@ class _BaseMiddleware:
         self._logger        = kwargs.pop(API.LOGGER_K, logmod.getLogger(fallback_name))
         self._extra         = kwargs
 
+    def __reduce__(self) -> tuple:
+        """ Middlewares are pickled by the name their class is bound to in its module,
+        as mixed in classes (eg: 'LatexReader<+M>') can't be found by their qualname.
+
+        Needed to send middlewares to process pools. See ParallelExecutor
+        """
+        cls  = type(self)
+        name = GEN_CLASS_RE.sub("", cls.__qualname__)
+        return (_rebuild_middleware, (cls.__module__, name), self.__getstate__())
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        if "_transform_cache" in state:
+            # Holds bound methods, so is rebuilt on demand instead
+            state['_transform_cache'] = dict()
+        if "_dispatch" in state:
+            # Also holds bound methods, so is rebuilt on unpickling
+            del state['_dispatch']
+
+        return state
+
+    def __setstate__(self, state:dict) -> None:
+        self.__dict__.update(state)
+        self._build_dispatch()
+
+    def _build_dispatch(self) -> None:
+        """ Build the block type -> transform tables, if the middleware dispatches by type """
+        pass
+
     def logger(self) -> Logger:
         return self._logger
 
+    def cache_config(self) -> dict:
+        """ The configuration that determines the middleware's results,
+        for keying cached results. See bibble.io.read_cache.stack_fingerprint.
+
+        This is the args the middleware was constructed with,
+        not its runtime state (eg: caches and indices), which changes as it runs.
+        Middlewares configured after construction should extend this.
+        """
+        args, kwargs = getattr(self, "_ctor_config", ((), {}))
+        return {"args": args, "kwargs": kwargs}
+
     def _get_lib_iterator(self, library:Library) -> tuple[Library, Iterator[Block]]:
         match self.allow_inplace:
             case True:
                 library = library
             case False:
-                library = deepcopy(library)
+                library = snapshot_library(library)
             case x:
                 raise TypeError(type(x))
 
@@ -145,7 +202,7 @@ class IdenLibraryMiddleware(_BaseMiddleware):
             case Library() if self.allow_inplace:
                 return library
             case Library():
-                return deepcopy(library)
+                return snapshot_library(library)
 
 @Proto(API.AdaptiveMiddleware_p, API.Middleware_p)
 class IdenBlockMiddleware(_BaseMiddleware):
@@ -153,10 +210,16 @@ class IdenBlockMiddleware(_BaseMiddleware):
     If passed 'tqdm'=True uses tqdm around the block level loop
     """
     _transform_cache : dict[type, list[Callable]]
+    _dispatch        : DispatchTable
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._transform_cache = dict()
+        self._build_dispatch()
+
+    def _build_dispatch(self) -> None:
+        """ Resolve the first transform_{Type} for each block type, once """
+        self._dispatch = DispatchTable(ftz.partial(resolve_by_mro, self, "transform_"))
 
     def get_transforms_for(self, block:Block, *, direction:Maybe[str]=None) -> list[Callable]:
         """ Get all transforms of the form transform_{Type},
@@ -174,24 +237,8 @@ class IdenBlockMiddleware(_BaseMiddleware):
     def transform(self, library:Library) -> Library:
         library, iterator = self._get_lib_iterator(library)
         blocks = []
-        for i,block in iterator:
-            match self.get_transforms_for(block):
-                case [x, *_]: # Use the first found transform,
-                    transform = x
-                case _: # No transforms for this block type, do nothing
-                    blocks.append(block)
-                    continue
-
-            match transform(block, library):
-                case None: # remove block
-                    continue
-                case []: # Keep original (it might have been modified)
-                    blocks.append(block)
-                case [*xs]: # new blocks
-                    blocks += xs
-                case x:
-                    raise TypeError(type(x), i, block)
-
+        for _, block in iterator:
+            blocks += self._run_block(block, library)
         else:
             # Remove the old blocks
             library.remove(library.blocks[:])
@@ -199,18 +246,46 @@ class IdenBlockMiddleware(_BaseMiddleware):
             library.add(blocks)
             return library
 
+    def _run_block(self, block:Block, library:Library) -> list[Block]:
+        """ Run the first found transform on a single block,
+        returning the blocks to put in its place.
+        An empty list means the block is removed.
+        """
+        if (transform:=self._dispatch[type(block)]) is None:
+            # No transforms for this block type, do nothing
+            return [block]
+
+        match transform(block, library):
+            case None: # remove block
+                return []
+            case []: # Keep original (it might have been modified)
+                return [block]
+            case [*xs]: # new blocks
+                return xs
+            case x:
+                raise TypeError(type(x), block)
+
 @Proto(API.AdaptiveMiddleware_p, API.BidirectionalMiddleware_p)
 class IdenBidiMiddleware(_BaseMiddleware):
 
-    _transform_cache : dict[str, list[Callable]]
-    _reader : Maybe[API.Middleware]
-    _writer : Maybe[API.Middleware]
+    _transform_cache : dict[tuple[str, type], list[Callable]]
+    _dispatch        : dict[str, DispatchTable]
+    _reader          : Maybe[API.Middleware]
+    _writer          : Maybe[API.Middleware]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._reader          = None
         self._writer          = None
         self._transform_cache = dict()
+        self._build_dispatch()
+
+    def _build_dispatch(self) -> None:
+        """ Resolve the first {direction}_transform_{Type} for each block type and direction, once """
+        self._dispatch = {
+            "read"  : DispatchTable(ftz.partial(resolve_by_mro, self, "read_transform_")),
+            "write" : DispatchTable(ftz.partial(resolve_by_mro, self, "write_transform_")),
+        }
 
 
     def handle_meta_entry(self, library:Library) -> None:
@@ -235,7 +310,7 @@ class IdenBidiMiddleware(_BaseMiddleware):
         """ Get all transforms of the form {direction}_transform_{Type},
         by mro, from most -> least specific
         """
-        cache_key = f"{direction}_{type(block).__name__}"
+        cache_key = (direction, type(block))
         if cache_key not in self._transform_cache:
             mro       = type(block).mro()
             formatted = [f"{direction}_transform_{x.__name__}" for x in mro]
@@ -248,22 +323,8 @@ class IdenBidiMiddleware(_BaseMiddleware):
     def read_transform(self, library:Library) -> Library:
         library, iterator = self._get_lib_iterator(library)
         blocks   = []
-        for i,block in iterator:
-            match self.get_transforms_for(block, direction="read"):
-                case [x, *_]: # Use the first found transform,
-                    transform = x
-                case _:
-                    blocks.append(block)
-                    continue
-
-            match transform(block, library):
-                case [] | None: # Transform gave nothing, so keep the original block.
-                    blocks.append(block)
-                case [*xs]:
-                    # new blocks
-                    blocks += xs
-                case x:
-                    raise TypeError(type(x), i, block)
+        for _, block in iterator:
+            blocks += self._run_block(block, library, direction="read")
         else:
             # Remove the old blocks
             library.remove(library.blocks[:])
@@ -275,24 +336,32 @@ class IdenBidiMiddleware(_BaseMiddleware):
     def write_transform(self, library:Library) -> Library:
         library, iterator = self._get_lib_iterator(library)
         blocks = []
-        for i,block in iterator:
-            match self.get_transforms_for(block, direction="write"):
-                case [x, *_]: # Use the first found transform,
-                    transform = x
-                case _:
-                    blocks.append(block)
-                    continue
-
-            match transform(block, library):
-                case [] | None: # Transform gave nothing, so keep the original block.
-                    blocks.append(block)
-                case [*xs]: # new blocks
-                    blocks += xs
-                case x:
-                    raise TypeError(type(x), i, block)
+        for _, block in iterator:
+            blocks += self._run_block(block, library, direction="write")
         else:
             # Remove the old blocks
             library.remove(library.blocks[:])
             # Add the new blocks
             library.add(blocks)
             return library
+
+    def _run_block(self, block:Block, library:Library, *, direction:str) -> list[Block]:
+        """ Run the first found {direction} transform on a single block,
+        returning the blocks to put in its place.
+        """
+        return self._run_dispatch(self._dispatch[direction], block, library)
+
+    def _run_dispatch(self, table:DispatchTable, block:Block, library:Library) -> list[Block]:
+        """ Run a block through the transform a direction's table gives for it.
+        Lets executors bind the table once, instead of looking it up per block.
+        """
+        if (transform:=table[type(block)]) is None:
+            return [block]
+
+        match transform(block, library):
+            case [] | None: # Transform gave nothing, so keep the original block.
+                return [block]
+            case [*xs]: # new blocks
+                return xs
+            case x:
+                raise TypeError(type(x), block)
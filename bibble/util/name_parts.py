@@ -116,3 +116,7 @@ class NameParts_d:
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__} : {self.merge()}>"
+
+    def copy(self) -> NameParts_d:
+        """ A copy with its own part lists """
+        return NameParts_d(first=self.first[:], von=self.von[:], last=self.last[:], jr=self.jr[:])
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Per-middleware profiling of read and write stacks.
+
+A Profiler measures each group of middlewares a Runner runs,
+and for fused groups, each member's share of the block loop.
+The records are stored in the library's MetaBlock,
+as '{direction}_profile', next to the '{direction}_transforms' chain.
+
+"""
+
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import itertools as itz
+import json
+import logging as logmod
+import pathlib as pl
+import re
+import resource
+import sys
+import time
+import tracemalloc
+import types
+import collections
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+from bibtexparser import model
+from bibtexparser.library import Library
+import bibble._interface as API
+from bibble.model import MetaBlock
+from .executors import FusedExecutor, ParallelExecutor
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+    type Block      = model.Block
+    type Middleware = API.Middleware
+    type BlockFn    = Callable[[Block, Library], list[Block]]
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+FAILURE_TYPES : Final[tuple[type, ...]] = (model.ParsingFailedBlock, model.MiddlewareErrorBlock)
+# Body:
+
+def block_fingerprint(block:Block) -> int:
+    """ A hash of a block's content, for detecting changed blocks """
+    match block:
+        case model.Entry():
+            fields = tuple((x.key, repr(x.value)) for x in block.fields)
+            return hash((type(block).__name__, block.entry_type, block.key, fields))
+        case model.String():
+            return hash((type(block).__name__, block.key, repr(block.value)))
+        case MetaBlock():
+            return hash((type(block).__name__, id(block)))
+        case _:
+            return hash((type(block).__name__, repr(vars(block))))
+
+def peak_memory() -> int:
+    """ The peak memory, in bytes.
+    Uses tracemalloc if it is tracing, otherwise the process' max rss
+    """
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[1]
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    match sys.platform:
+        case "darwin":
+            # ru_maxrss is in bytes on macos
+            return maxrss
+        case _:
+            # and in kilobytes on linux and the bsds
+            return maxrss * 1024
+
+##--|
+
+class MiddlewareProfile_d:
+    """ The measurements of a single middleware, in a single run of a stack.
+
+    For middlewares run as part of a group (a fused or parallel pass),
+    'group' names the group, and peak_mem_delta and failures are of the whole group.
+    Parallel groups only measure the group as a whole,
+    and their cpu time doesn't include worker processes.
+    """
+    __slots__ = ("name", "group", "direction", "wall_s", "cpu_s", "blocks_in", "blocks_out", "changed", "failures", "peak_mem_delta")
+
+    name           : str
+    group          : str
+    direction      : str
+    wall_s         : float
+    cpu_s          : float
+    blocks_in      : int
+    blocks_out     : int
+    changed        : int
+    failures       : int
+    peak_mem_delta : int
+
+    def __init__(self, *, name:str, group:str, direction:str) -> None:
+        self.name           = name
+        self.group          = group
+        self.direction      = direction
+        self.wall_s         = 0.0
+        self.cpu_s          = 0.0
+        self.blocks_in      = 0
+        self.blocks_out     = 0
+        self.changed        = 0
+        self.failures       = 0
+        self.peak_mem_delta = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} : {self.name} : {self.wall_s:.4f}s>"
+
+    def to_dict(self) -> dict:
+        return {x:getattr(self, x) for x in self.__slots__}
+
+class Profiler:
+    """ Measures the groups of middlewares a Runner runs.
+
+    Use Profiler.run to run a group, then Profiler.record to store the results
+    in the library's MetaBlock.
+    """
+    _direction : str
+    records    : list[MiddlewareProfile_d]
+
+    def __init__(self, *, direction:str) -> None:
+        self._direction = direction
+        self.records    = []
+
+    def run(self, group:FusedExecutor|ParallelExecutor|Middleware, library:Library, *, fn:Callable[[Any, Library], Library]) -> Library:
+        """ Run fn(group, library), measuring it """
+        match group:
+            case FusedExecutor() | ParallelExecutor():
+                members = group._middlewares
+                name    = f"{type(group).__name__}[{', '.join(x.metadata_key() for x in members)}]"
+            case x:
+                members = [x]
+                name    = x.metadata_key()
+
+        records      = [MiddlewareProfile_d(name=x.metadata_key(), group=name, direction=self._direction) for x in members]
+        before       = collections.Counter(block_fingerprint(x) for x in library.blocks)
+        blocks_in    = len(library.blocks)
+        fails_before = len(library.failed_blocks)
+        mem_before   = peak_memory()
+        wall, cpu    = time.perf_counter(), time.process_time()
+        match group:
+            case FusedExecutor():
+                library = self._run_fused(group, library, records, fn=fn)
+            case _:
+                library = fn(group, library)
+
+        wall, cpu    = time.perf_counter() - wall, time.process_time() - cpu
+        mem_delta    = peak_memory() - mem_before
+        failures     = len(library.failed_blocks) - fails_before
+        for record in records:
+            record.failures       = failures
+            record.peak_mem_delta = mem_delta
+
+        match group:
+            case FusedExecutor():
+                pass
+            case _:
+                # Measured as a whole
+                changed = collections.Counter(block_fingerprint(x) for x in library.blocks) - before
+                for record in records:
+                    record.wall_s     = wall
+                    record.cpu_s      = cpu
+                    record.blocks_in  = blocks_in
+                    record.blocks_out = len(library.blocks)
+                    record.changed    = changed.total()
+
+        self.records += records
+        return library
+
+    def _run_fused(self, group:FusedExecutor, library:Library, records:list[MiddlewareProfile_d], *, fn:Callable) -> Library:
+        """ Wrap each step of the fused chain, to measure each member separately """
+        original = group._chain
+        try:
+            group._chain = [self._wrap_step(step, record) for step, record in zip(original, records, strict=True)]
+            return fn(group, library)
+        finally:
+            group._chain = original
+
+    def _wrap_step(self, step:BlockFn, record:MiddlewareProfile_d) -> BlockFn:
+
+        def measured(block:Block, library:Library) -> list[Block]:
+            fingerprint = block_fingerprint(block)
+            wall, cpu   = time.perf_counter(), time.process_time()
+            result      = step(block, library)
+            record.wall_s     += time.perf_counter() - wall
+            record.cpu_s      += time.process_time() - cpu
+            record.blocks_in  += 1
+            record.blocks_out += len(result)
+            match result:
+                case [x] if block_fingerprint(x) == fingerprint:
+                    pass
+                case _:
+                    record.changed += 1
+
+            return result
+
+        return measured
+
+    def to_dicts(self) -> list[dict]:
+        return [x.to_dict() for x in self.records]
+
+    def record(self, library:Library, *, meta_key:str) -> None:
+        """ Add the records to the library's MetaBlock, under meta_key """
+        match MetaBlock.find_in(library):
+            case None:
+                library.add(MetaBlock(**{meta_key : self.to_dicts()}))
+            case MetaBlock() as mb if meta_key in mb.data:
+                mb.data[meta_key] += self.to_dicts()
+            case MetaBlock() as mb:
+                mb.data[meta_key] = self.to_dicts()
+            case x:
+                raise TypeError(type(x))
+
+    def dump(self, target:pl.Path) -> None:
+        """ Write the records as json """
+        target.write_text(json.dumps(self.to_dicts(), indent=4))
@@ -25,6 +25,7 @@ from uuid import UUID, uuid1
 # ##-- 3rd party imports
 import bibtexparser
 import bibtexparser.model as model
+from bibtexparser import Library
 from bibtexparser import middlewares as ms
 from bibtexparser.middlewares.middleware import (BlockMiddleware,
                                                  LibraryMiddleware)
@@ -33,6 +34,9 @@ from bibtexparser.middlewares.names import (NameParts,
 
 # ##-- end 3rd party imports
 
+from bibble.people import NameReader
+from bibble.people._interface import AuthorIndexBlock
+
 # ##-- types
 # isort: off
 import abc
@@ -53,8 +57,6 @@ if TYPE_CHECKING:
     from collections.abc import Iterable, Iterator, Callable, Generator
     from collections.abc import Sequence, Mapping, MutableMapping, Hashable
 
-    from bibtexparser.libary import Library
-
 ##--|
 
 # isort: on
@@ -102,15 +104,26 @@ class SelectTags(LibraryMiddleware):
         return Library(chosen)
 
 class SelectAuthor(LibraryMiddleware):
-    """ TODO select entries by a set of authors
+    """ Select entries with any of a set of authors or editors.
 
-    should run name split on them
+    Names are looked up in the library's AuthorIndexBlock (see NameReader(index=True)),
+    or, if it doesn't have one, or its keys are stale, an index built from its entries.
+    So 'Russell, Stuart' and 'Stuart Russell' select the same entries.
     """
     _targets : set[str]
 
     def __init__(self, *, authors:Iterable[str]):
         super().__init__()
-        self._targets = set(authors)
+        reader        = NameReader()
+        self._targets = {AuthorIndexBlock.normalize(reader._name_to_parts(x)) for x in authors}
 
-    def transform(self, library):
-        raise NotImplementedError()
+    def transform(self, library:Library) -> Library:
+        match AuthorIndexBlock.find_in(library):
+            case AuthorIndexBlock() as index if not index.is_stale(library):
+                pass
+            case _:
+                index = NameReader().build_index(library)
+
+        keys   = set().union(*(index.lookup(x) for x in self._targets))
+        chosen = [x for x in library.entries if x.key in keys]
+        return Library(chosen)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Copy-on-Write snapshots of libraries.
+
+Used instead of deepcopy when a middleware doesn't allow inplace modification,
+so the cost of the copy is proportional to what the middleware changes.
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import itertools as itz
+import logging as logmod
+import pathlib as pl
+import re
+import time
+import types
+import collections
+import contextlib
+import hashlib
+from copy import copy, deepcopy
+from uuid import UUID, uuid1
+from weakref import ref
+import atexit # for @atexit.register
+import faulthandler
+import sys
+# ##-- end stdlib imports
+
+from bibtexparser.library import Library
+from bibtexparser import model
+from bibble.model import CowEntry, MetaBlock
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+    type Block = model.Block
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+BLOCK_CONTAINERS : Final[tuple[str, ...]] = ("_blocks", "_entries_by_key", "_strings_by_key", "_meta_index")
+# Body:
+
+def snapshot_library(library:Library) -> Library:
+    """ Make a copy-on-write snapshot of a library,
+    for middlewares that don't allow inplace modification.
+
+    The snapshot has its own block list, and its own block objects,
+    so adding, removing, and replacing blocks, or setting their attributes,
+    does not affect the original.
+    But entries are CowEntry views, which share their fields with the original
+    until they are modified, so a snapshot costs roughly a shallow copy of each block.
+
+    MetaBlocks and error blocks hold nested mutable data, so are deep copied.
+    Other attributes of the library (eg: BibbleLib.source_files) are shallow copied.
+    """
+    snap = copy(library)
+    for key, val in vars(library).items():
+        match val:
+            case _ if key in BLOCK_CONTAINERS:
+                # Emptied, to be refilled by snap.add
+                empty = copy(val)
+                empty.clear()
+                setattr(snap, key, empty)
+            case list() | dict() | set():
+                setattr(snap, key, copy(val))
+            case _:
+                pass
+
+    snap.add([snapshot_block(x) for x in library.blocks])
+    return snap
+
+def snapshot_block(block:Block) -> Block:
+    """ Copy a single block for a snapshot """
+    match block:
+        case model.Entry():
+            return CowEntry.of(block)
+        case MetaBlock() | model.ParsingFailedBlock() | model.MiddlewareErrorBlock():
+            return deepcopy(block)
+        case _:
+            copied                  = copy(block)
+            copied._parser_metadata = block._parser_metadata.copy()
+            return copied
@@ -18,6 +18,7 @@ import time
 import types
 import weakref
 from uuid import UUID, uuid1
+from copy import copy
 
 # ##-- end stdlib imports
 
@@ -93,6 +94,8 @@ class StringTransform_m:
             return res
 
     def _transform_nameparts(self, parts:NameParts) -> Result[NameParts, ValueError]:
+        # copied, as the parts may be shared with a library snapshot
+        parts       = copy(parts)
         parts.first = self._transform_all_strings(parts.first)
         parts.last  = self._transform_all_strings(parts.last)
         parts.von   = self._transform_all_strings(parts.von)